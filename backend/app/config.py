@@ -1,11 +1,37 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import json
 import os
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Motor asíncrono (asyncpg) para las rutas de lectura más usadas.
+    # Si ASYNC_DATABASE_URL no se define, se deriva de DATABASE_URL.
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Pool de conexiones
+    # DB_POOL_CLASS: "queue" (pool propio, modo sesión de Supabase) o
+    # "null" (sin pool propio, para pgbouncer en modo transaction)
+    DB_POOL_CLASS: str = "queue"
+    DB_POOL_SIZE: int = 2
+    DB_MAX_OVERFLOW: int = 3
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Qué hacer con la transacción al devolver la conexión: "commit", "rollback" o "none"
+    DB_POOL_RESET_ON_RETURN: str = "commit"
+    DB_CONNECT_TIMEOUT: int = 10
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    
+    # Réplicas de lectura para reportes y exportaciones: una URL o una lista
+    # JSON de URLs. Vacío: todo va al primario (DATABASE_URL)
+    DATABASE_READ_URLS: str = ""
+    # Después de una escritura, el mismo cliente lee del primario durante
+    # esta ventana (cookie), para ver sus propios cambios pese al retraso
+    READ_AFTER_WRITE_SECONDS: int = 10
+    READ_AFTER_WRITE_COOKIE: str = "cine_primario"
     
     # JWT
     SECRET_KEY: str
@@ -25,6 +51,84 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Cinema REST API"
     DEBUG: bool = True
     
+    # Cache en proceso del catálogo (películas, salas, funciones)
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 512
+    
+    # Cache de los reportes agregados (pueden atrasarse hasta este TTL)
+    REPORTES_CACHE_TTL_SECONDS: int = 60
+    # Resúmenes diarios: cada cuánto se actualizan y cuántos días hacia atrás
+    # de la marca de agua se recalculan (reservas o facturas cargadas tarde)
+    RESUMENES_INTERVALO_SECONDS: int = 300
+    RESUMENES_DIAS_REVISION: int = 1
+    
+    # Hash de contraseñas: esquema de passlib, costo y pool de hilos dedicado
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_ROUNDS: Optional[int] = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    
+    # Cache del usuario autenticado por token (evita una consulta por request protegido)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Presupuesto de SQL por request: "off", "log" (warning) o "raise" (falla el request)
+    SQL_BUDGET_MODE: str = "log"
+    SQL_QUERY_BUDGET: Optional[int] = 15
+    # Misma consulta repetida en un request (patrón N+1)
+    SQL_REPEAT_THRESHOLD: Optional[int] = 5
+    # Header Server-Timing con el tiempo de base de datos y de la aplicación
+    SERVER_TIMING_ENABLED: bool = True
+    
+    # Serialización rápida: ORJSONResponse por defecto y listas validadas una
+    # sola vez y serializadas directo a bytes (requiere orjson)
+    FAST_JSON_ENABLED: bool = False
+    
+    # Filas por lote al leer del cursor del servidor en las exportaciones
+    EXPORT_CHUNK_SIZE: int = 1000
+    
+    # Máximo de filas por request en los endpoints /lote
+    BULK_MAX_ITEMS: int = 5000
+    
+    # Retención temporal de asientos (entre elegir asientos y pagar)
+    SEAT_HOLD_TTL_SECONDS: int = 600
+    SEAT_HOLD_SWEEP_INTERVAL_SECONDS: int = 30
+    
+    # Mapa de asientos en vivo (SSE): keepalive y eventos pendientes por conexión
+    SSE_KEEPALIVE_SECONDS: int = 15
+    SSE_QUEUE_MAX_EVENTS: int = 100
+    
+    # Feed de cambios entre workers con LISTEN/NOTIFY (solo PostgreSQL)
+    CHANGE_FEED_ENABLED: bool = False
+    CHANGE_FEED_CHANNEL: str = "cine_cambios"
+    CHANGE_FEED_PING_SECONDS: int = 30
+    CHANGE_FEED_RECONNECT_SECONDS: int = 5
+    CHANGE_FEED_MAX_PENDIENTES: int = 10000
+    # Workers del servidor (uvicorn y gunicorn leen la misma variable).
+    # Con más de uno, los ETag requieren el feed de cambios
+    WEB_CONCURRENCY: int = 1
+    
+    @property
+    def async_database_url(self) -> str:
+        """URL del motor asíncrono (driver asyncpg)"""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        
+        for prefijo in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if self.DATABASE_URL.startswith(prefijo):
+                return "postgresql+asyncpg://" + self.DATABASE_URL[len(prefijo):]
+        return self.DATABASE_URL
+    
+    @property
+    def read_database_urls(self) -> List[str]:
+        """URLs de las réplicas de lectura"""
+        valor = self.DATABASE_READ_URLS.strip()
+        if not valor:
+            return []
+        if valor.startswith("["):
+            return [url for url in json.loads(valor) if url]
+        return [valor]
+    
     @property
     def origins_list(self) -> List[str]:
         """Convierte string JSON a lista de origenes permitidos"""
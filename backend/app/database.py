@@ -1,72 +1,172 @@
+from fastapi import Request
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, NullPool, AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.utils.metrics import Counter, Gauge, Histogram
+from app.utils.lecturas import primario_reciente
+from app.utils.observability import instrumentar_sql
+import itertools
 import logging
+import time
+import traceback
 
 # Configurar logging para conexiones
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# Crear engine de SQLAlchemy
-# Configuración optimizada para Supabase (modo sesión tiene límite muy bajo)
-# IMPORTANTE: Si usas Supabase pooler, considera cambiar a modo transaction
-# agregando ?pgbouncer=true&pool_mode=transaction a la URL
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,      # Verifica conexiones antes de usarlas
-    pool_size=2,             # Número de conexiones en el pool (muy reducido para Supabase)
-    max_overflow=3,          # Conexiones adicionales permitidas (máximo 5 total)
-    pool_recycle=1800,       # Recicla conexiones después de 30 minutos
-    pool_reset_on_return='commit',  # Resetea la conexión al devolverla al pool
-    pool_timeout=30,         # Timeout para obtener conexión del pool (30 segundos)
-    connect_args={
-        "connect_timeout": 10,  # Timeout de conexión inicial (10 segundos)
-        "options": "-c statement_timeout=30000"  # Timeout de queries (30 segundos)
-    },
-    echo=False               # Desactivar logs SQL en producción
+# Telemetría del pool de conexiones (reemplaza los logs INFO por evento)
+POOL_CONNECTIONS_CREATED = Counter(
+    "db_pool_connections_created_total", "Conexiones nuevas abiertas por el pool", ("pool",)
+)
+POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Conexiones entregadas por el pool", ("pool",)
+)
+POOL_INVALIDATED = Counter(
+    "db_pool_connections_invalidated_total", "Conexiones descartadas por error o reciclaje", ("pool",)
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Tiempo hasta obtener una conexión del pool", ("pool",)
 )
+POOL_SIZE = Gauge("db_pool_size", "Tamaño configurado del pool", ("pool",))
+POOL_IN_USE = Gauge("db_pool_connections_in_use", "Conexiones prestadas en este momento", ("pool",))
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Conexiones abiertas por encima de pool_size", ("pool",))
 
-# Event listeners para monitorear el pool de conexiones
-@event.listens_for(engine, "connect")
-def receive_connect(dbapi_conn, connection_record):
-    """Se ejecuta cuando se crea una nueva conexión"""
-    pool = engine.pool
-    try:
-        logger.info(
-            f"[DB POOL] Nueva conexión creada. Pool size: {pool.size()}, "
-            f"Checked out: {pool.checkedout()}, Checked in: {pool.checkedin()}"
-        )
-    except Exception:
-        logger.info("[DB POOL] Nueva conexión creada")
+POOL_CLASSES = {"queue": QueuePool, "null": NullPool}
 
-@event.listens_for(engine, "checkout")
-def receive_checkout(dbapi_conn, connection_record, connection_proxy):
-    """Se ejecuta cuando se obtiene una conexión del pool"""
-    pool = engine.pool
-    try:
-        logger.info(
-            f"[DB POOL] Conexión obtenida. Pool size: {pool.size()}, "
-            f"Checked out: {pool.checkedout()}, Checked in: {pool.checkedin()}"
+
+def _pool_medido(pool_cls, nombre: str):
+    """Subclase del pool que mide la espera de cada checkout"""
+    class PoolMedido(pool_cls):
+        def connect(self):
+            inicio = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                POOL_CHECKOUT_WAIT.observe(time.perf_counter() - inicio, pool=nombre)
+    
+    PoolMedido.__name__ = f"Medido{pool_cls.__name__}"
+    return PoolMedido
+
+
+def engine_options(url: str, nombre: str, asincrono: bool = False) -> dict:
+    """
+    Opciones de create_engine según Settings.
+    
+    DB_POOL_CLASS="queue" mantiene un pool propio (modo sesión de Supabase);
+    "null" abre y cierra una conexión por uso, para cuando pgbouncer en modo
+    transacción ya hace el pooling.
+    """
+    pool_cls = POOL_CLASSES.get(settings.DB_POOL_CLASS.lower())
+    if pool_cls is None:
+        raise ValueError(f"DB_POOL_CLASS no válido: {settings.DB_POOL_CLASS}")
+    if asincrono and pool_cls is QueuePool:
+        pool_cls = AsyncAdaptedQueuePool
+    reset_on_return = settings.DB_POOL_RESET_ON_RETURN.lower()
+    if reset_on_return not in ("commit", "rollback", "none"):
+        raise ValueError(f"DB_POOL_RESET_ON_RETURN no válido: {settings.DB_POOL_RESET_ON_RETURN}")
+    if reset_on_return == "none":
+        reset_on_return = None
+    
+    options = {
+        "poolclass": _pool_medido(pool_cls, nombre),
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,  # Verifica conexiones antes de usarlas
+        "pool_reset_on_return": reset_on_return,       # Resetea la conexión al devolverla al pool
+        "echo": False                                  # Desactivar logs SQL en producción
+    }
+    if pool_cls is not NullPool:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,            # Conexiones permanentes del pool
+            max_overflow=settings.DB_MAX_OVERFLOW,      # Conexiones adicionales permitidas
+            pool_timeout=settings.DB_POOL_TIMEOUT,      # Timeout para obtener conexión del pool
+            pool_recycle=settings.DB_POOL_RECYCLE,      # Recicla conexiones viejas
         )
-    except Exception:
-        logger.info("[DB POOL] Conexión obtenida")
+    
+    # Timeouts de conexión y de consulta según el driver
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    elif asincrono:
+        options["connect_args"] = {
+            "timeout": settings.DB_CONNECT_TIMEOUT,
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+    else:
+        options["connect_args"] = {
+            "connect_timeout": settings.DB_CONNECT_TIMEOUT,
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
 
-@event.listens_for(engine, "checkin")
-def receive_checkin(dbapi_conn, connection_record):
-    """Se ejecuta cuando se devuelve una conexión al pool"""
-    pool = engine.pool
-    try:
-        logger.info(
-            f"[DB POOL] Conexión devuelta. Pool size: {pool.size()}, "
-            f"Checked out: {pool.checkedout()}, Checked in: {pool.checkedin()}"
+
+def instrumentar_pool(engine, nombre: str):
+    """Registra los contadores y gauges del pool de un engine"""
+    pool_engine = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+    
+    @event.listens_for(pool_engine, "connect")
+    def receive_connect(dbapi_conn, connection_record):
+        """Se ejecuta cuando se crea una nueva conexión"""
+        POOL_CONNECTIONS_CREATED.inc(pool=nombre)
+    
+    @event.listens_for(pool_engine, "checkout")
+    def receive_checkout(dbapi_conn, connection_record, connection_proxy):
+        """Se ejecuta cuando se obtiene una conexión del pool"""
+        POOL_CHECKOUTS.inc(pool=nombre)
+    
+    @event.listens_for(pool_engine, "invalidate")
+    def receive_invalidate(dbapi_conn, connection_record, exception):
+        """Se ejecuta cuando una conexión se descarta"""
+        POOL_INVALIDATED.inc(pool=nombre)
+    
+    # Los gauges se calculan al leerlos, sin costo por request
+    def _leer(atributo):
+        def leer():
+            metodo = getattr(pool_engine.pool, atributo, None)
+            return metodo() if metodo else 0
+        return leer
+    
+    POOL_SIZE.set_function(_leer("size"), pool=nombre)
+    POOL_IN_USE.set_function(_leer("checkedout"), pool=nombre)
+    POOL_OVERFLOW.set_function(_leer("overflow"), pool=nombre)
+
+
+def pool_status(nombre: str) -> dict:
+    """Resumen del pool para el health check"""
+    espera = POOL_CHECKOUT_WAIT.snapshot(pool=nombre) or {"count": 0, "sum": 0.0}
+    return {
+        "size": POOL_SIZE.value(pool=nombre),
+        "in_use": POOL_IN_USE.value(pool=nombre),
+        "overflow": POOL_OVERFLOW.value(pool=nombre),
+        "connections_created": POOL_CONNECTIONS_CREATED.value(pool=nombre),
+        "checkouts": POOL_CHECKOUTS.value(pool=nombre),
+        "invalidated": POOL_INVALIDATED.value(pool=nombre),
+        "checkout_wait_avg_ms": (
+            espera["sum"] / espera["count"] * 1000 if espera["count"] else 0.0
         )
-    except Exception:
-        logger.info("[DB POOL] Conexión devuelta")
+    }
+
+
+# Crear engine de SQLAlchemy
+# El tamaño y la clase del pool se configuran en Settings (DB_POOL_*).
+# IMPORTANTE: Si usas Supabase pooler en modo transaction, usa DB_POOL_CLASS=null
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, "primary"))
+instrumentar_pool(engine, "primary")
+instrumentar_sql(engine, "primary")
 
 # Session local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Réplicas de lectura (DATABASE_READ_URLS), usadas por turnos desde get_read_db
+read_engines = []
+for numero, url in enumerate(settings.read_database_urls):
+    nombre = f"replica{numero}"
+    replica = create_engine(url, **engine_options(url, nombre))
+    instrumentar_pool(replica, nombre)
+    instrumentar_sql(replica, nombre)
+    read_engines.append(replica)
+_turno_lectura = itertools.count()
+
 # Base para modelos
 Base = declarative_base()
 
@@ -77,17 +177,7 @@ def get_db():
     Se cierra automáticamente después de cada request.
     Asegura que la conexión se devuelva al pool correctamente.
     """
-    import traceback
     db = SessionLocal()
-    pool = engine.pool
-    try:
-        logger.info(
-            f"[DB SESSION] Sesión creada. Pool activas: {pool.checkedout()}, "
-            f"disponibles: {pool.checkedin()}"
-        )
-    except Exception:
-        logger.info("[DB SESSION] Sesión creada")
-    
     try:
         yield db
     except Exception as e:
@@ -101,10 +191,79 @@ def get_db():
         # Esto es crítico para liberar conexiones en Supabase
         # Las rutas hacen commit manualmente cuando es necesario
         db.close()
-        try:
-            logger.info(
-                f"[DB SESSION] Sesión cerrada. Pool activas: {pool.checkedout()}, "
-                f"disponibles: {pool.checkedin()}"
-            )
-        except Exception:
-            logger.info("[DB SESSION] Sesión cerrada")
\ No newline at end of file
+
+def motor_lectura(request: Request = None):
+    """
+    Engine para una lectura: una réplica por turnos, o el primario si no hay
+    réplicas o si el cliente escribió hace poco (ver app.utils.lecturas).
+    """
+    if not read_engines or (request is not None and primario_reciente(request)):
+        return engine
+    return read_engines[next(_turno_lectura) % len(read_engines)]
+
+# Dependency para lecturas que toleran el retraso de una réplica
+def get_read_db(request: Request):
+    """
+    Como get_db, pero la sesión apunta a motor_lectura(). Solo para handlers
+    que no escriben y toleran datos atrasados (reportes, exportaciones). Las
+    rutas con ETag o cache del catálogo siguen en el primario: una réplica
+    atrasada dejaría guardado el estado anterior con la versión nueva.
+    """
+    db = SessionLocal(bind=motor_lectura(request))
+    try:
+        yield db
+    except Exception as e:
+        logger.error(f"[DB SESSION] Error en sesión de lectura: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+# Motor asíncrono opcional (ASYNC_DB_ENABLED) para las rutas de lectura más usadas.
+# Se crea solo si está activado, así asyncpg no es obligatorio.
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        **engine_options(settings.async_database_url, "async", asincrono=True)
+    )
+    instrumentar_pool(async_engine, "async")
+    instrumentar_sql(async_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+class ThreadpoolSession:
+    """
+    Adapta una Session síncrona a la interfaz await-able de AsyncSession.
+    Cada llamada se ejecuta en el threadpool, así no bloquea el event loop
+    cuando el motor asíncrono está desactivado.
+    """
+    def __init__(self, session):
+        self.session = session
+    
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.session.execute, statement, *args, **kwargs)
+    
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.session.scalar, statement, *args, **kwargs)
+
+# Dependency para obtener una sesión asíncrona
+async def get_async_db():
+    """
+    Dependencia para handlers async def.
+    Entrega una AsyncSession si ASYNC_DB_ENABLED está activo; si no, una
+    Session síncrona envuelta en ThreadpoolSession. En ambos casos las
+    consultas se esperan con await y no bloquean el event loop.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+    
+    db = SessionLocal()
+    try:
+        yield ThreadpoolSession(db)
+    finally:
+        await run_in_threadpool(db.close)
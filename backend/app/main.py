@@ -1,6 +1,19 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
+from app.database import async_engine, read_engines, pool_status
+from app.services.tareas import barrer_retenciones_periodicamente, actualizar_resumenes_periodicamente
+from app.utils.cache import catalog_cache, reportes_cache
+from app.utils.eventos import estado_eventos
+from app.utils.etag import usar_feed
+from app.utils.feed_cambios import iniciar_feed, detener_feed, estado_feed
+from app.utils.lecturas import PrimarioTrasEscritura
+from app.utils.metrics import REGISTRY
+from app.utils.observability import MetricsMiddleware
+from app.utils.serializacion import clase_respuesta
 from app.routes import (
     auth,
     usuarios,
@@ -11,11 +24,30 @@ from app.routes import (
     reservas,
     reserva_asiento,
     facturas,
-    incidencias
+    incidencias,
+    reportes,
+    exportaciones
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranca y detiene las tareas de fondo de la aplicación"""
+    # Con varios workers los ETag dependen de que el feed esté activo
+    usar_feed(iniciar_feed())
+    tareas = [
+        asyncio.create_task(barrer_retenciones_periodicamente()),
+        asyncio.create_task(actualizar_resumenes_periodicamente())
+    ]
+    yield
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
+    detener_feed()
+
 # Crear aplicación FastAPI
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=clase_respuesta(),
     title=settings.PROJECT_NAME,
     description="API REST para sistema de gestión de cine",
     version="1.0.0",
@@ -46,6 +78,13 @@ else:
         allow_headers=["*"],
     )
 
+# Con réplicas, quien escribe lee del primario durante READ_AFTER_WRITE_SECONDS
+if read_engines:
+    app.add_middleware(PrimarioTrasEscritura)
+
+# Métricas por ruta (se agrega al final para que envuelva a todo lo demás)
+app.add_middleware(MetricsMiddleware)
+
 # Incluir routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX, tags=["Autenticación"])
 app.include_router(usuarios.router, prefix=settings.API_V1_PREFIX, tags=["Usuarios"])
@@ -57,6 +96,8 @@ app.include_router(reservas.router, prefix=settings.API_V1_PREFIX, tags=["Reserv
 app.include_router(reserva_asiento.router, prefix=settings.API_V1_PREFIX, tags=["Reservas - Asientos"])
 app.include_router(facturas.router, prefix=settings.API_V1_PREFIX, tags=["Facturas"])
 app.include_router(incidencias.router, prefix=settings.API_V1_PREFIX, tags=["Incidencias"])
+app.include_router(reportes.router, prefix=settings.API_V1_PREFIX, tags=["Reportes"])
+app.include_router(exportaciones.router, prefix=settings.API_V1_PREFIX, tags=["Exportaciones"])
 
 # Ruta raíz
 @app.get("/")
@@ -70,4 +111,32 @@ async def root():
 # Health check
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+# Estado del pool de conexiones
+@app.get("/health/db")
+async def health_db():
+    pools = {"primary": pool_status("primary")}
+    if async_engine is not None:
+        pools["async"] = pool_status("async")
+    for numero in range(len(read_engines)):
+        pools[f"replica{numero}"] = pool_status(f"replica{numero}")
+    return {"status": "healthy", "pools": pools}
+
+# Estadísticas del cache del catálogo
+@app.get("/health/cache")
+async def health_cache():
+    return {
+        "status": "healthy",
+        "caches": {"catalogo": catalog_cache.stats(), "reportes": reportes_cache.stats()}
+    }
+
+# Conexiones abiertas a los mapas de asientos en vivo y feed de cambios
+@app.get("/health/eventos")
+async def health_eventos():
+    return {"status": "healthy", "eventos": estado_eventos(), "feed": estado_feed()}
+
+# Métricas en formato Prometheus
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
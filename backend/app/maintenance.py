@@ -0,0 +1,37 @@
+"""
+Comandos de mantenimiento.
+
+    python -m app.maintenance actualizar-resumenes    # incremental, desde la marca de agua
+    python -m app.maintenance reconstruir-resumenes   # recalcula todos los días
+"""
+import argparse
+from app.database import SessionLocal
+from app.services.resumenes_service import actualizar_resumenes
+
+
+def _resumenes(completo: bool):
+    db = SessionLocal()
+    try:
+        resultado = actualizar_resumenes(db, completo=completo)
+    finally:
+        db.close()
+    for nombre, datos in resultado.items():
+        desde = datos["desde"] or "el inicio"
+        print(f"{nombre}: {datos['filas']} filas recalculadas desde {desde}")
+
+
+COMANDOS = {
+    "actualizar-resumenes": lambda: _resumenes(completo=False),
+    "reconstruir-resumenes": lambda: _resumenes(completo=True),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=sorted(COMANDOS))
+    args = parser.parse_args()
+    COMANDOS[args.comando]()
+
+
+if __name__ == "__main__":
+    main()
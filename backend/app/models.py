@@ -1,4 +1,7 @@
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, Text, Integer
+from sqlalchemy import (
+    Column, String, Numeric, Date, DateTime, ForeignKey, ForeignKeyConstraint, Text, Integer, Index,
+    UniqueConstraint
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -9,7 +12,7 @@ class Usuario(Base):
     
     id_usuario = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nombre = Column(Text, nullable=False)
-    correo = Column(Text, nullable=True)
+    correo = Column(Text, nullable=True, unique=True, index=True)
     password = Column(Text, nullable=True)
     rol = Column(Text, nullable=True)
     
@@ -55,7 +58,7 @@ class Funcion(Base):
     id_funcion = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     fecha_hora = Column(DateTime, nullable=False)
     precio = Column(Numeric(10, 2), nullable=True)
-    id_pelicula = Column(UUID(as_uuid=True), ForeignKey("pelicula.id_pelicula"), nullable=True)
+    id_pelicula = Column(UUID(as_uuid=True), ForeignKey("pelicula.id_pelicula"), nullable=True, index=True)
     id_sala = Column(UUID(as_uuid=True), ForeignKey("sala.id_sala"), nullable=True)
     
     # Relaciones
@@ -70,7 +73,7 @@ class Asiento(Base):
     id_asiento = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     numero = Column(Text, nullable=False)
     estado = Column(Text, nullable=True)
-    id_sala = Column(UUID(as_uuid=True), ForeignKey("sala.id_sala"), nullable=True)
+    id_sala = Column(UUID(as_uuid=True), ForeignKey("sala.id_sala"), nullable=True, index=True)
     
     # Relaciones
     sala = relationship("Sala", back_populates="asientos")
@@ -79,6 +82,14 @@ class Asiento(Base):
 
 class Reserva(Base):
     __tablename__ = "reserva"
+    __table_args__ = (
+        # Cubre función → reservas sin leer la tabla (también sirve para filtrar por id_funcion)
+        Index("ix_reserva_id_funcion_id_reserva", "id_funcion", "id_reserva"),
+        # Actualización incremental de los resúmenes diarios
+        Index("ix_reserva_fecha_reserva", "fecha_reserva"),
+        # Destino de la clave foránea compuesta de reserva_asiento
+        UniqueConstraint("id_reserva", "id_funcion", name="uq_reserva_id_reserva_id_funcion"),
+    )
     
     id_reserva = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     cantidad_asientos = Column(Numeric(10, 2), nullable=False)
@@ -91,26 +102,59 @@ class Reserva(Base):
     # Relaciones
     funcion = relationship("Funcion", back_populates="reservas")
     usuario = relationship("Usuario", back_populates="reservas")
-    reserva_asientos = relationship("ReservaAsiento", back_populates="reserva")
+    reserva_asientos = relationship(
+        "ReservaAsiento", back_populates="reserva", foreign_keys="ReservaAsiento.id_reserva"
+    )
     facturas = relationship("Factura", back_populates="reserva")
+    # Asientos a través de reserva_asiento, solo lectura (expand=asientos)
+    asientos = relationship(
+        "Asiento",
+        secondary="reserva_asiento",
+        primaryjoin="Reserva.id_reserva == ReservaAsiento.id_reserva",
+        secondaryjoin="Asiento.id_asiento == ReservaAsiento.id_asiento",
+        viewonly=True
+    )
 
 
 class ReservaAsiento(Base):
     __tablename__ = "reserva_asiento"
+    __table_args__ = (
+        # La PK empieza por id_reserva; este índice cubre asiento → reservas
+        Index("ix_reserva_asiento_id_asiento_id_reserva", "id_asiento", "id_reserva"),
+        # Un asiento se reserva una sola vez por función, sin importar quién escriba
+        UniqueConstraint("id_funcion", "id_asiento", name="uq_reserva_asiento_id_funcion_id_asiento"),
+        # id_funcion es la de la reserva: la reserva no puede cambiar de función con asientos
+        ForeignKeyConstraint(
+            ["id_reserva", "id_funcion"], ["reserva.id_reserva", "reserva.id_funcion"],
+            name="fk_reserva_asiento_reserva_funcion"
+        ),
+    )
     
     id_reserva = Column(UUID(as_uuid=True), ForeignKey("reserva.id_reserva"), primary_key=True)
     id_asiento = Column(UUID(as_uuid=True), ForeignKey("asiento.id_asiento"), primary_key=True)
+    id_funcion = Column(UUID(as_uuid=True), nullable=True)
     
     # Relaciones
-    reserva = relationship("Reserva", back_populates="reserva_asientos")
+    reserva = relationship("Reserva", back_populates="reserva_asientos", foreign_keys=[id_reserva])
     asiento = relationship("Asiento", back_populates="reserva_asientos")
 
 
+class RetencionAsiento(Base):
+    """Retención temporal de un asiento para una función mientras se completa el pago"""
+    __tablename__ = "retencion_asiento"
+    
+    id_funcion = Column(UUID(as_uuid=True), ForeignKey("funcion.id_funcion"), primary_key=True)
+    id_asiento = Column(UUID(as_uuid=True), ForeignKey("asiento.id_asiento"), primary_key=True)
+    id_retencion = Column(UUID(as_uuid=True), nullable=False, index=True)
+    id_usuario = Column(UUID(as_uuid=True), ForeignKey("usuario.id_usuario"), nullable=True)
+    expira_en = Column(DateTime, nullable=False, index=True)
+
+
 class Factura(Base):
     __tablename__ = "factura"
     
     id_factura = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    fecha_emision = Column(DateTime, nullable=False)
+    fecha_emision = Column(DateTime, nullable=False, index=True)
     total = Column(Numeric(10, 2), nullable=True)
     metodo_pago = Column(Text, nullable=True)
     id_reserva = Column(UUID(as_uuid=True), ForeignKey("reserva.id_reserva"), nullable=True)
@@ -127,4 +171,37 @@ class Incidencia(Base):
     id_usuario = Column(UUID(as_uuid=True), ForeignKey("usuario.id_usuario"), nullable=True)
     
     # Relaciones
-    usuario = relationship("Usuario", back_populates="incidencias")
\ No newline at end of file
+    usuario = relationship("Usuario", back_populates="incidencias")
+
+
+class ResumenVentaDiaria(Base):
+    """Ventas agregadas por día de reserva y función (rollup para reportes)"""
+    __tablename__ = "resumen_venta_diaria"
+    
+    dia = Column(Date, primary_key=True)
+    id_funcion = Column(UUID(as_uuid=True), primary_key=True)
+    id_pelicula = Column(UUID(as_uuid=True), nullable=True, index=True)
+    id_sala = Column(UUID(as_uuid=True), nullable=True, index=True)
+    reservas = Column(Integer, nullable=False, default=0)
+    asientos = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class ResumenFacturacionDiaria(Base):
+    """Facturación agregada por día de emisión y método de pago (rollup para reportes)"""
+    __tablename__ = "resumen_facturacion_diaria"
+    
+    dia = Column(Date, primary_key=True)
+    # '' cuando la factura no tiene método de pago (no puede ser NULL en la PK)
+    metodo_pago = Column(Text, primary_key=True)
+    facturas = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class MarcaResumen(Base):
+    """Marca de agua de cada rollup: hasta qué fecha de origen está agregado"""
+    __tablename__ = "marca_resumen"
+    
+    nombre = Column(Text, primary_key=True)
+    hasta = Column(DateTime, nullable=True)
+    actualizado_en = Column(DateTime, nullable=True)
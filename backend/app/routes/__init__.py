@@ -7,7 +7,9 @@ from . import (
     asientos,
     reservas,
     facturas,
-    incidencias
+    incidencias,
+    reportes,
+    exportaciones
 )
 
 __all__ = [
@@ -19,5 +21,7 @@ __all__ = [
     "asientos",
     "reservas",
     "facturas",
-    "incidencias"
+    "incidencias",
+    "reportes",
+    "exportaciones"
 ]
\ No newline at end of file
@@ -1,13 +1,25 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from app.database import get_db
 from app.models import Asiento
 from app.schemas import AsientoCreate, AsientoUpdate, AsientoResponse
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
 from app.utils.dependencies import get_or_404
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_CATALOGO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_ASIENTOS = (Asiento.id_asiento,)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("asiento", cache_control=CACHE_CATALOGO)
+
 @router.post("/asientos", response_model=AsientoResponse, status_code=status.HTTP_201_CREATED)
 def create_asiento(asiento: AsientoCreate, db: Session = Depends(get_db)):
     """Crear un nuevo asiento"""
@@ -15,15 +27,16 @@ def create_asiento(asiento: AsientoCreate, db: Session = Depends(get_db)):
     db.add(db_asiento)
     db.commit()
     db.refresh(db_asiento)
+    notificar_cambio("asiento", db_asiento.id_asiento)
     return db_asiento
 
-@router.get("/asientos", response_model=List[AsientoResponse])
-def get_asientos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/asientos", response_model=Union[List[AsientoResponse], Pagina[AsientoResponse]], dependencies=[Depends(sin_cambios)])
+def get_asientos(paginacion: Paginacion = Depends(), db: Session = Depends(get_db)):
     """Obtener lista de asientos"""
-    asientos = db.query(Asiento).offset(skip).limit(limit).all()
-    return asientos
+    query = consulta_ligera(db, Asiento, AsientoResponse)
+    return respuesta_json(paginar(query, paginacion, ORDEN_ASIENTOS, AsientoResponse), paginacion.response)
 
-@router.get("/asientos/{id_asiento}", response_model=AsientoResponse)
+@router.get("/asientos/{id_asiento}", response_model=AsientoResponse, dependencies=[Depends(sin_cambios)])
 def get_asiento(id_asiento: str, db: Session = Depends(get_db)):
     """Obtener un asiento por ID"""
     asiento = get_or_404(db, Asiento, Asiento.id_asiento, id_asiento, "asiento")
@@ -44,6 +57,7 @@ def update_asiento(
     
     db.commit()
     db.refresh(asiento)
+    notificar_cambio("asiento", asiento.id_asiento)
     return asiento
 
 @router.delete("/asientos/{id_asiento}", status_code=status.HTTP_204_NO_CONTENT)
@@ -52,4 +66,17 @@ def delete_asiento(id_asiento: str, db: Session = Depends(get_db)):
     asiento = get_or_404(db, Asiento, Asiento.id_asiento, id_asiento, "asiento")
     db.delete(asiento)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("asiento", id_asiento)
+    return None
+
+# Escrituras en lote: POST/PATCH /asientos/lote y POST /asientos/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="asientos",
+    model=Asiento,
+    pk=Asiento.id_asiento,
+    create_schema=AsientoCreate,
+    update_schema=AsientoUpdate,
+    response_schema=AsientoResponse,
+    tabla="asiento"
+)
\ No newline at end of file
@@ -2,16 +2,18 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from app.database import get_db
 from app.models import Usuario
 from app.schemas import UsuarioCreate, UsuarioResponse, UsuarioLogin, Token
 from app.services.auth_service import (
-    authenticate_user,
-    create_access_token,
-    get_password_hash
+    authenticate_user_async,
+    create_access_token
 )
+from app.services.password_service import get_password_hash_async
 from app.config import settings
+from app.utils.cambios import notificar_cambio
 
 router = APIRouter()
 
@@ -22,25 +24,22 @@ class LoginResponse(BaseModel):
     user: UsuarioResponse
 
 @router.post("/auth/register", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
-def register(usuario: UsuarioCreate, db: Session = Depends(get_db)):
+async def register(usuario: UsuarioCreate, db: Session = Depends(get_db)):
     """Registrar un nuevo usuario"""
     try:
-        print(f"Registering user with email: {usuario.correo}")
-        
         # Verificar si el correo ya existe
-        db_usuario = db.query(Usuario).filter(Usuario.correo == usuario.correo).first()
+        db_usuario = await run_in_threadpool(
+            lambda: db.query(Usuario).filter(Usuario.correo == usuario.correo).first()
+        )
         if db_usuario:
-            print(f"Email {usuario.correo} already exists")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El correo ya está registrado"
             )
         
-        # Crear nuevo usuario con password hasheado
-        print("Hashing password...")
-        hashed_password = get_password_hash(usuario.password)
+        # Crear nuevo usuario con password hasheado (en el pool de hash)
+        hashed_password = await get_password_hash_async(usuario.password)
         
-        print("Creating user object...")
         db_usuario = Usuario(
             nombre=usuario.nombre,
             correo=usuario.correo,
@@ -48,12 +47,14 @@ def register(usuario: UsuarioCreate, db: Session = Depends(get_db)):
             rol=usuario.rol or "cliente"
         )
         
-        print("Adding user to database...")
-        db.add(db_usuario)
-        db.commit()
-        db.refresh(db_usuario)
+        def guardar():
+            db.add(db_usuario)
+            db.commit()
+            db.refresh(db_usuario)
+        
+        await run_in_threadpool(guardar)
+        notificar_cambio("usuario", db_usuario.id_usuario)
         
-        print(f"User created successfully with ID: {db_usuario.id_usuario}")
         return db_usuario
         
     except HTTPException as he:
@@ -67,9 +68,9 @@ def register(usuario: UsuarioCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/auth/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Iniciar sesión y obtener token JWT"""
-    usuario = authenticate_user(db, form_data.username, form_data.password)
+    usuario = await authenticate_user_async(db, form_data.username, form_data.password)
     
     if not usuario:
         raise HTTPException(
@@ -86,9 +87,9 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/auth/login-json", response_model=LoginResponse)
-def login_json(usuario: UsuarioLogin, db: Session = Depends(get_db)):
+async def login_json(usuario: UsuarioLogin, db: Session = Depends(get_db)):
     """Login alternativo que acepta JSON en lugar de form-data y retorna datos del usuario"""
-    usuario_db = authenticate_user(db, usuario.correo, usuario.password)
+    usuario_db = await authenticate_user_async(db, usuario.correo, usuario.password)
     
     if not usuario_db:
         raise HTTPException(
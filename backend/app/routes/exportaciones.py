@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from app.models import Asiento, Reserva, ReservaAsiento, Factura
+from app.services.reportes_service import en_rango
+from app.utils.dependencies import RangoFechas
+from app.utils.exportacion import exportar
+
+router = APIRouter()
+
+FORMATO = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (una fila JSON por línea) o csv")
+
+
+@router.get("/exportaciones/facturas")
+def exportar_facturas(request: Request, rango: RangoFechas = Depends(), formato: str = FORMATO):
+    """Exportar facturas en streaming, filtradas por fecha de emisión"""
+    stmt = (
+        select(
+            Factura.id_factura,
+            Factura.fecha_emision,
+            Factura.total,
+            Factura.metodo_pago,
+            Factura.id_reserva
+        )
+        .where(*en_rango(Factura.fecha_emision, rango.desde, rango.hasta))
+        .order_by(Factura.fecha_emision, Factura.id_factura)
+    )
+    return exportar(stmt, formato, "facturas", request)
+
+
+@router.get("/exportaciones/reservas")
+def exportar_reservas(request: Request, rango: RangoFechas = Depends(), formato: str = FORMATO):
+    """Exportar reservas en streaming, filtradas por fecha de reserva"""
+    stmt = (
+        select(
+            Reserva.id_reserva,
+            Reserva.fecha_reserva,
+            Reserva.estado,
+            Reserva.cantidad_asientos,
+            Reserva.total,
+            Reserva.id_funcion,
+            Reserva.id_usuario
+        )
+        .where(*en_rango(Reserva.fecha_reserva, rango.desde, rango.hasta))
+        .order_by(Reserva.fecha_reserva, Reserva.id_reserva)
+    )
+    return exportar(stmt, formato, "reservas", request)
+
+
+@router.get("/exportaciones/reserva-asientos")
+def exportar_reserva_asientos(request: Request, rango: RangoFechas = Depends(), formato: str = FORMATO):
+    """Exportar los asientos reservados en streaming, filtrados por fecha de reserva"""
+    stmt = (
+        select(
+            ReservaAsiento.id_reserva,
+            ReservaAsiento.id_asiento,
+            Asiento.numero.label("numero_asiento"),
+            Reserva.id_funcion,
+            Reserva.fecha_reserva
+        )
+        .join(Reserva, Reserva.id_reserva == ReservaAsiento.id_reserva)
+        .outerjoin(Asiento, Asiento.id_asiento == ReservaAsiento.id_asiento)
+        .where(*en_rango(Reserva.fecha_reserva, rango.desde, rango.hasta))
+        .order_by(Reserva.fecha_reserva, ReservaAsiento.id_reserva, ReservaAsiento.id_asiento)
+    )
+    return exportar(stmt, formato, "reserva_asientos", request)
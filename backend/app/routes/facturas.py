@@ -1,13 +1,30 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from app.database import get_db
 from app.models import Factura
 from app.schemas import FacturaCreate, FacturaUpdate, FacturaResponse
-from app.utils.dependencies import get_or_404
+from app.schemas.detalle import FacturaDetalleResponse
+from app.services.detalle_service import EXPANSIONES_FACTURA, TABLAS_FACTURA
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
+from app.utils.dependencies import get_or_404, validate_uuid
+from app.utils.expansion import detalle_expandido, parametro_expand
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_PRIVADO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_FACTURAS = (Factura.fecha_emision, Factura.id_factura)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("factura", cache_control=CACHE_PRIVADO)
+# El detalle puede incluir la reserva y sus relaciones (expand=)
+sin_cambios_detalle = condicional(*TABLAS_FACTURA, cache_control=CACHE_PRIVADO)
+
 @router.post("/facturas", response_model=FacturaResponse, status_code=status.HTTP_201_CREATED)
 def create_factura(factura: FacturaCreate, db: Session = Depends(get_db)):
     """Crear una nueva factura"""
@@ -15,19 +32,31 @@ def create_factura(factura: FacturaCreate, db: Session = Depends(get_db)):
     db.add(db_factura)
     db.commit()
     db.refresh(db_factura)
+    notificar_cambio("factura", db_factura.id_factura)
     return db_factura
 
-@router.get("/facturas", response_model=List[FacturaResponse])
-def get_facturas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/facturas", response_model=Union[List[FacturaResponse], Pagina[FacturaResponse]], dependencies=[Depends(sin_cambios)])
+def get_facturas(paginacion: Paginacion = Depends(), db: Session = Depends(get_db)):
     """Obtener lista de facturas"""
-    facturas = db.query(Factura).offset(skip).limit(limit).all()
-    return facturas
+    query = consulta_ligera(db, Factura, FacturaResponse)
+    return respuesta_json(paginar(query, paginacion, ORDEN_FACTURAS, FacturaResponse), paginacion.response)
 
-@router.get("/facturas/{id_factura}", response_model=FacturaResponse)
-def get_factura(id_factura: str, db: Session = Depends(get_db)):
-    """Obtener una factura por ID"""
-    factura = get_or_404(db, Factura, Factura.id_factura, id_factura, "factura")
-    return factura
+@router.get(
+    "/facturas/{id_factura}",
+    response_model=FacturaDetalleResponse,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(sin_cambios_detalle)]
+)
+def get_factura(
+    id_factura: str,
+    expand: Optional[str] = parametro_expand("reserva.funcion.pelicula,reserva.asientos"),
+    db: Session = Depends(get_db)
+):
+    """Obtener una factura por ID, con su reserva y relaciones si se piden en expand"""
+    return detalle_expandido(
+        db, Factura, Factura.id_factura, validate_uuid(id_factura, "factura"), "factura",
+        FacturaResponse, EXPANSIONES_FACTURA, expand
+    )
 
 @router.put("/facturas/{id_factura}", response_model=FacturaResponse)
 def update_factura(
@@ -44,6 +73,7 @@ def update_factura(
     
     db.commit()
     db.refresh(factura)
+    notificar_cambio("factura", factura.id_factura)
     return factura
 
 @router.delete("/facturas/{id_factura}", status_code=status.HTTP_204_NO_CONTENT)
@@ -52,4 +82,17 @@ def delete_factura(id_factura: str, db: Session = Depends(get_db)):
     factura = get_or_404(db, Factura, Factura.id_factura, id_factura, "factura")
     db.delete(factura)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("factura", id_factura)
+    return None
+
+# Escrituras en lote: POST/PATCH /facturas/lote y POST /facturas/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="facturas",
+    model=Factura,
+    pk=Factura.id_factura,
+    create_schema=FacturaCreate,
+    update_schema=FacturaUpdate,
+    response_schema=FacturaResponse,
+    tabla="factura"
+)
\ No newline at end of file
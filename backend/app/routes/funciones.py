@@ -1,13 +1,31 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from app.database import get_db
 from app.models import Funcion
 from app.schemas import FuncionCreate, FuncionUpdate, FuncionResponse
-from app.utils.dependencies import get_or_404
+from app.schemas.detalle import FuncionDetalleResponse
+from app.services.detalle_service import EXPANSIONES_FUNCION, TABLAS_FUNCION
+from app.utils.cache import catalog_cache
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
+from app.utils.dependencies import get_or_404, validate_uuid
+from app.utils.expansion import detalle_expandido, parametro_expand
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_CATALOGO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_FUNCIONES = (Funcion.fecha_hora, Funcion.id_funcion)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("funcion", cache_control=CACHE_CATALOGO)
+# El detalle puede incluir película y sala (expand=)
+sin_cambios_detalle = condicional(*TABLAS_FUNCION, cache_control=CACHE_CATALOGO)
+
 @router.post("/funciones", response_model=FuncionResponse, status_code=status.HTTP_201_CREATED)
 def create_funcion(funcion: FuncionCreate, db: Session = Depends(get_db)):
     """Crear una nueva función"""
@@ -15,29 +33,43 @@ def create_funcion(funcion: FuncionCreate, db: Session = Depends(get_db)):
     db.add(db_funcion)
     db.commit()
     db.refresh(db_funcion)
+    notificar_cambio("funcion", db_funcion.id_funcion)
     return db_funcion
 
-@router.get("/funciones", response_model=List[FuncionResponse])
+@router.get("/funciones", response_model=Union[List[FuncionResponse], Pagina[FuncionResponse]], dependencies=[Depends(sin_cambios)])
 def get_funciones(
-    skip: int = 0, 
-    limit: int = 100, 
+    paginacion: Paginacion = Depends(),
     id_pelicula: str = None,
     db: Session = Depends(get_db)
 ):
     """Obtener lista de funciones, opcionalmente filtradas por ID de película"""
-    query = db.query(Funcion)
-    
-    if id_pelicula:
-        query = query.filter(Funcion.id_pelicula == id_pelicula)
+    def cargar():
+        query = consulta_ligera(db, Funcion, FuncionResponse)
         
-    funciones = query.offset(skip).limit(limit).all()
-    return funciones
+        if id_pelicula:
+            query = query.filter(Funcion.id_pelicula == id_pelicula)
+            
+        return paginar(query, paginacion, ORDEN_FUNCIONES, FuncionResponse)
+    
+    resultado = catalog_cache.get_or_set(("funciones", id_pelicula) + paginacion.cache_key(), cargar)
+    return respuesta_json(resultado, paginacion.response)
 
-@router.get("/funciones/{id_funcion}", response_model=FuncionResponse)
-def get_funcion(id_funcion: str, db: Session = Depends(get_db)):
-    """Obtener una función por ID"""
-    funcion = get_or_404(db, Funcion, Funcion.id_funcion, id_funcion, "función")
-    return funcion
+@router.get(
+    "/funciones/{id_funcion}",
+    response_model=FuncionDetalleResponse,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(sin_cambios_detalle)]
+)
+def get_funcion(
+    id_funcion: str,
+    expand: Optional[str] = parametro_expand("pelicula,sala"),
+    db: Session = Depends(get_db)
+):
+    """Obtener una función por ID, con su película y sala si se piden en expand"""
+    return detalle_expandido(
+        db, Funcion, Funcion.id_funcion, validate_uuid(id_funcion, "función"), "función",
+        FuncionResponse, EXPANSIONES_FUNCION, expand
+    )
 
 @router.put("/funciones/{id_funcion}", response_model=FuncionResponse)
 def update_funcion(
@@ -54,6 +86,7 @@ def update_funcion(
     
     db.commit()
     db.refresh(funcion)
+    notificar_cambio("funcion", funcion.id_funcion)
     return funcion
 
 @router.delete("/funciones/{id_funcion}", status_code=status.HTTP_204_NO_CONTENT)
@@ -62,4 +95,17 @@ def delete_funcion(id_funcion: str, db: Session = Depends(get_db)):
     funcion = get_or_404(db, Funcion, Funcion.id_funcion, id_funcion, "función")
     db.delete(funcion)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("funcion", id_funcion)
+    return None
+
+# Escrituras en lote: POST/PATCH /funciones/lote y POST /funciones/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="funciones",
+    model=Funcion,
+    pk=Funcion.id_funcion,
+    create_schema=FuncionCreate,
+    update_schema=FuncionUpdate,
+    response_schema=FuncionResponse,
+    tabla="funcion"
+)
\ No newline at end of file
@@ -1,13 +1,25 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from app.database import get_db
 from app.models import Incidencia
 from app.schemas import IncidenciaCreate, IncidenciaUpdate, IncidenciaResponse
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
 from app.utils.dependencies import get_or_404
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_PRIVADO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_INCIDENCIAS = (Incidencia.fecha_generacion, Incidencia.id_incidencia)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("incidencia", cache_control=CACHE_PRIVADO)
+
 @router.post("/incidencias", response_model=IncidenciaResponse, status_code=status.HTTP_201_CREATED)
 def create_incidencia(incidencia: IncidenciaCreate, db: Session = Depends(get_db)):
     """Crear una nueva incidencia"""
@@ -15,15 +27,16 @@ def create_incidencia(incidencia: IncidenciaCreate, db: Session = Depends(get_db
     db.add(db_incidencia)
     db.commit()
     db.refresh(db_incidencia)
+    notificar_cambio("incidencia", db_incidencia.id_incidencia)
     return db_incidencia
 
-@router.get("/incidencias", response_model=List[IncidenciaResponse])
-def get_incidencias(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/incidencias", response_model=Union[List[IncidenciaResponse], Pagina[IncidenciaResponse]], dependencies=[Depends(sin_cambios)])
+def get_incidencias(paginacion: Paginacion = Depends(), db: Session = Depends(get_db)):
     """Obtener lista de incidencias"""
-    incidencias = db.query(Incidencia).offset(skip).limit(limit).all()
-    return incidencias
+    query = consulta_ligera(db, Incidencia, IncidenciaResponse)
+    return respuesta_json(paginar(query, paginacion, ORDEN_INCIDENCIAS, IncidenciaResponse), paginacion.response)
 
-@router.get("/incidencias/{id_incidencia}", response_model=IncidenciaResponse)
+@router.get("/incidencias/{id_incidencia}", response_model=IncidenciaResponse, dependencies=[Depends(sin_cambios)])
 def get_incidencia(id_incidencia: str, db: Session = Depends(get_db)):
     """Obtener una incidencia por ID"""
     incidencia = get_or_404(db, Incidencia, Incidencia.id_incidencia, id_incidencia, "incidencia")
@@ -44,6 +57,7 @@ def update_incidencia(
     
     db.commit()
     db.refresh(incidencia)
+    notificar_cambio("incidencia", incidencia.id_incidencia)
     return incidencia
 
 @router.delete("/incidencias/{id_incidencia}", status_code=status.HTTP_204_NO_CONTENT)
@@ -52,4 +66,17 @@ def delete_incidencia(id_incidencia: str, db: Session = Depends(get_db)):
     incidencia = get_or_404(db, Incidencia, Incidencia.id_incidencia, id_incidencia, "incidencia")
     db.delete(incidencia)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("incidencia", id_incidencia)
+    return None
+
+# Escrituras en lote: POST/PATCH /incidencias/lote y POST /incidencias/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="incidencias",
+    model=Incidencia,
+    pk=Incidencia.id_incidencia,
+    create_schema=IncidenciaCreate,
+    update_schema=IncidenciaUpdate,
+    response_schema=IncidenciaResponse,
+    tabla="incidencia"
+)
\ No newline at end of file
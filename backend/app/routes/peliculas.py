@@ -1,13 +1,26 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from app.database import get_db
 from app.models import Pelicula
 from app.schemas import PeliculaCreate, PeliculaUpdate, PeliculaResponse
+from app.utils.cache import catalog_cache
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
 from app.utils.dependencies import get_or_404
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_CATALOGO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_PELICULAS = (Pelicula.id_pelicula,)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("pelicula", cache_control=CACHE_CATALOGO)
+
 @router.post("/peliculas", response_model=PeliculaResponse, status_code=status.HTTP_201_CREATED)
 def create_pelicula(pelicula: PeliculaCreate, db: Session = Depends(get_db)):
     """Crear una nueva película"""
@@ -15,15 +28,19 @@ def create_pelicula(pelicula: PeliculaCreate, db: Session = Depends(get_db)):
     db.add(db_pelicula)
     db.commit()
     db.refresh(db_pelicula)
+    notificar_cambio("pelicula", db_pelicula.id_pelicula)
     return db_pelicula
 
-@router.get("/peliculas", response_model=List[PeliculaResponse])
-def get_peliculas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/peliculas", response_model=Union[List[PeliculaResponse], Pagina[PeliculaResponse]], dependencies=[Depends(sin_cambios)])
+def get_peliculas(paginacion: Paginacion = Depends(), db: Session = Depends(get_db)):
     """Obtener lista de películas"""
-    peliculas = db.query(Pelicula).offset(skip).limit(limit).all()
-    return peliculas
+    resultado = catalog_cache.get_or_set(
+        ("peliculas",) + paginacion.cache_key(),
+        lambda: paginar(consulta_ligera(db, Pelicula, PeliculaResponse), paginacion, ORDEN_PELICULAS, PeliculaResponse)
+    )
+    return respuesta_json(resultado, paginacion.response)
 
-@router.get("/peliculas/{id_pelicula}", response_model=PeliculaResponse)
+@router.get("/peliculas/{id_pelicula}", response_model=PeliculaResponse, dependencies=[Depends(sin_cambios)])
 def get_pelicula(id_pelicula: str, db: Session = Depends(get_db)):
     """Obtener una película por ID"""
     pelicula = get_or_404(db, Pelicula, Pelicula.id_pelicula, id_pelicula, "película")
@@ -44,6 +61,7 @@ def update_pelicula(
     
     db.commit()
     db.refresh(pelicula)
+    notificar_cambio("pelicula", pelicula.id_pelicula)
     return pelicula
 
 @router.delete("/peliculas/{id_pelicula}", status_code=status.HTTP_204_NO_CONTENT)
@@ -52,4 +70,17 @@ def delete_pelicula(id_pelicula: str, db: Session = Depends(get_db)):
     pelicula = get_or_404(db, Pelicula, Pelicula.id_pelicula, id_pelicula, "película")
     db.delete(pelicula)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("pelicula", id_pelicula)
+    return None
+
+# Escrituras en lote: POST/PATCH /peliculas/lote y POST /peliculas/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="peliculas",
+    model=Pelicula,
+    pk=Pelicula.id_pelicula,
+    create_schema=PeliculaCreate,
+    update_schema=PeliculaUpdate,
+    response_schema=PeliculaResponse,
+    tabla="pelicula"
+)
\ No newline at end of file
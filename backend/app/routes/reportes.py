@@ -0,0 +1,95 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.schemas.reporte import (
+    PeliculaMasVistaResponse,
+    IngresosPeriodoResponse,
+    OcupacionSalaResponse,
+    FuncionMasVendidaResponse,
+    EstadisticaUsuarioResponse,
+    MetodoPagoResponse
+)
+from app.services import reportes_service
+from app.utils.cache import reportes_cache
+from app.utils.dependencies import RangoFechas
+
+router = APIRouter()
+
+
+def _cacheado(nombre: str, rango: RangoFechas, cargar, *extra):
+    return reportes_cache.get_or_set((nombre, rango.desde, rango.hasta) + extra, cargar)
+
+
+@router.get("/reportes/peliculas-mas-vistas", response_model=List[PeliculaMasVistaResponse])
+def reporte_peliculas_mas_vistas(
+    rango: RangoFechas = Depends(),
+    limite: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Películas con más asientos vendidos (por fecha de reserva)"""
+    return _cacheado(
+        "peliculas-mas-vistas", rango,
+        lambda: reportes_service.peliculas_mas_vistas(db, rango.desde, rango.hasta, limite),
+        limite
+    )
+
+
+@router.get("/reportes/ingresos", response_model=List[IngresosPeriodoResponse])
+def reporte_ingresos(
+    rango: RangoFechas = Depends(),
+    periodo: str = Query("dia", pattern="^(dia|semana|mes)$"),
+    db: Session = Depends(get_read_db)
+):
+    """Ingresos facturados por día, semana o mes"""
+    return _cacheado(
+        "ingresos", rango,
+        lambda: reportes_service.ingresos_por_periodo(db, periodo, rango.desde, rango.hasta),
+        periodo
+    )
+
+
+@router.get("/reportes/ocupacion-salas", response_model=List[OcupacionSalaResponse])
+def reporte_ocupacion_salas(rango: RangoFechas = Depends(), db: Session = Depends(get_read_db)):
+    """Ocupación de cada sala en las funciones del rango"""
+    return _cacheado(
+        "ocupacion-salas", rango,
+        lambda: reportes_service.ocupacion_salas(db, rango.desde, rango.hasta)
+    )
+
+
+@router.get("/reportes/funciones-mas-vendidas", response_model=List[FuncionMasVendidaResponse])
+def reporte_funciones_mas_vendidas(
+    rango: RangoFechas = Depends(),
+    limite: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Funciones con más asientos vendidos (por fecha de reserva)"""
+    return _cacheado(
+        "funciones-mas-vendidas", rango,
+        lambda: reportes_service.funciones_mas_vendidas(db, rango.desde, rango.hasta, limite),
+        limite
+    )
+
+
+@router.get("/reportes/usuarios", response_model=List[EstadisticaUsuarioResponse])
+def reporte_usuarios(
+    rango: RangoFechas = Depends(),
+    limite: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Usuarios con mayor gasto: reservas, gasto total y promedio"""
+    return _cacheado(
+        "usuarios", rango,
+        lambda: reportes_service.estadisticas_usuarios(db, rango.desde, rango.hasta, limite),
+        limite
+    )
+
+
+@router.get("/reportes/metodos-pago", response_model=List[MetodoPagoResponse])
+def reporte_metodos_pago(rango: RangoFechas = Depends(), db: Session = Depends(get_read_db)):
+    """Uso de cada método de pago en las facturas del rango"""
+    return _cacheado(
+        "metodos-pago", rango,
+        lambda: reportes_service.metodos_pago(db, rango.desde, rango.hasta)
+    )
@@ -1,15 +1,86 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, Response, status, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
-from app.models import Reserva, Asiento, ReservaAsiento
-from app.schemas.reserva_asiento import ReservaAsientoCreate, ReservaAsientoResponse
-from app.utils.dependencies import get_or_404
+from app.config import settings
+from app.database import get_db, get_async_db
+from app.models import Reserva, ReservaAsiento
+from app.schemas.reserva_asiento import (
+    ReservaAsientoResponse,
+    MapaAsientosResponse,
+    ReservaAsientosLoteCreate,
+    ReservaAsientosLoteResponse,
+    RetencionCreate,
+    RetencionResponse
+)
+from app.services.ocupacion_service import (
+    asientos_ocupados_stmt,
+    mapa_asientos_stmt,
+    asientos_de_reserva_stmt,
+    filas_a_asientos_ocupados,
+    filas_a_mapa,
+    reservar_asientos,
+    CONFLICTO_NO_ENCONTRADO,
+    CONFLICTO_EN_ESTA_RESERVA,
+    CONFLICTO_FUERA_DE_SALA,
+    CONFLICTO_RETENIDO,
+    ReservaDeOtraFuncion,
+    retener_asientos,
+    liberar_retencion,
+    canal_funcion,
+    publicar_asientos,
+    publicar_liberados,
+    ESTADO_OCUPADO,
+    ESTADO_RETENIDO,
+    ESTADO_DISPONIBLE
+)
+from app.utils import eventos
+from app.utils.cambios import notificar_cambio
+from app.utils.dependencies import get_or_404, validate_uuid
+from app.utils.observability import presupuesto_sql
+from app.utils.serializacion import respuesta_json
 
 router = APIRouter()
 
+# Sesión de get_async_db fuera de una dependencia (el stream vive más que el request)
+sesion_async = asynccontextmanager(get_async_db)
+
+async def _leer_mapa(funcion_uuid):
+    """Mapa de asientos de la función serializado, o None si no existe"""
+    async with sesion_async() as db:
+        rows = (await db.execute(mapa_asientos_stmt(funcion_uuid))).all()
+    mapa = filas_a_mapa(funcion_uuid, rows)
+    if mapa is None:
+        return None
+    return MapaAsientosResponse(**mapa).model_dump(mode="json")
+
+async def _eventos_mapa(suscripcion, funcion_uuid, mapa):
+    """Generador SSE: snapshot inicial y luego los cambios publicados"""
+    try:
+        yield eventos.formatear("snapshot", mapa)
+        while True:
+            evento = await suscripcion.siguiente(settings.SSE_KEEPALIVE_SECONDS)
+            if evento is None:
+                # Comentario SSE para que proxies y clientes no corten la conexión
+                yield ": keepalive\n\n"
+                continue
+            
+            nombre, mensaje = evento
+            if nombre == eventos.EVENTO_RESYNC:
+                mapa = await _leer_mapa(funcion_uuid)
+                if mapa is None:
+                    # La función se eliminó
+                    return
+                yield eventos.formatear("snapshot", mapa)
+            else:
+                yield mensaje
+    finally:
+        eventos.desuscribir(suscripcion)
+
 @router.get("/funciones/{id_funcion}/asientos-ocupados", response_model=List[dict])
-async def get_asientos_ocupados_por_funcion(id_funcion: str, db: Session = Depends(get_db)):
+async def get_asientos_ocupados_por_funcion(id_funcion: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Obtener todos los asientos ocupados para una función específica
     
@@ -20,38 +91,63 @@ async def get_asientos_ocupados_por_funcion(id_funcion: str, db: Session = Depen
         "id_sala": "uuid"
     }
     """
-    # Obtener todas las reservas para esta función
-    reservas = db.query(Reserva).filter(Reserva.id_funcion == id_funcion).all()
+    funcion_uuid = validate_uuid(id_funcion, "función")
     
-    if not reservas:
-        return []
+    # Una sola consulta: asientos reservados o retenidos para la función
+    rows = (await db.execute(asientos_ocupados_stmt(funcion_uuid))).all()
+    return respuesta_json(filas_a_asientos_ocupados(rows), response)
+
+@router.get("/funciones/{id_funcion}/mapa-asientos", response_model=MapaAsientosResponse)
+async def get_mapa_asientos_por_funcion(id_funcion: str, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Obtener el mapa completo de asientos de la sala de una función
     
-    # Obtener todos los IDs de reservas (como UUID)
-    reserva_ids = [r.id_reserva for r in reservas]
+    Cada asiento de la sala incluye su estado para la función
+    ("disponible", "ocupado" o "en-proceso" si está retenido), en una sola consulta.
+    """
+    funcion_uuid = validate_uuid(id_funcion, "función")
     
-    # Obtener todas las relaciones reserva-asiento para estas reservas
-    reserva_asientos = db.query(ReservaAsiento).filter(
-        ReservaAsiento.id_reserva.in_(reserva_ids)
-    ).all()
+    rows = (await db.execute(mapa_asientos_stmt(funcion_uuid))).all()
+    mapa = filas_a_mapa(funcion_uuid, rows)
+    if mapa is None:
+        raise HTTPException(status_code=404, detail="Función no encontrada")
     
-    if not reserva_asientos:
-        return []
+    # El mapa se arma con los tipos del schema: se serializa sin volver a validarlo
+    return respuesta_json(mapa, response)
+
+# El stream vuelve a leer el mapa en cada resync mientras siga abierto
+@router.get("/funciones/{id_funcion}/asientos/stream", dependencies=[Depends(presupuesto_sql(None))])
+async def stream_mapa_asientos(id_funcion: str):
+    """
+    Mapa de asientos en vivo (Server-Sent Events)
     
-    # Obtener los IDs de asientos ocupados (como UUID)
-    asiento_ids = [ra.id_asiento for ra in reserva_asientos]
+    Envía un evento "snapshot" con el mapa completo (mismo formato que
+    /mapa-asientos) y después un evento "asientos" por cada cambio:
+    {"id_funcion", "estado": "ocupado" | "en-proceso" | "disponible", "asientos": [ids]}.
+    Si la conexión se atrasa, o una escritura afecta asientos no identificados,
+    se vuelve a enviar un "snapshot".
+    """
+    funcion_uuid = validate_uuid(id_funcion, "función")
     
-    # Obtener la información completa de los asientos
-    asientos = db.query(Asiento).filter(Asiento.id_asiento.in_(asiento_ids)).all()
+    # Suscribirse antes de leer el mapa para no perder cambios intermedios
+    suscripcion = eventos.suscribir(canal_funcion(funcion_uuid))
+    try:
+        mapa = await _leer_mapa(funcion_uuid)
+    except Exception:
+        eventos.desuscribir(suscripcion)
+        raise
+    if mapa is None:
+        eventos.desuscribir(suscripcion)
+        raise HTTPException(status_code=404, detail="Función no encontrada")
     
-    return [{
-        "id_asiento": str(a.id_asiento),
-        "numero": str(a.numero) if a.numero else None,
-        "id_sala": str(a.id_sala) if a.id_sala else None,
-        "estado": a.estado if a.estado else None
-    } for a in asientos]
+    return StreamingResponse(
+        _eventos_mapa(suscripcion, funcion_uuid, mapa),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/reservas/{id_reserva}/asientos", response_model=List[dict])
-async def get_asientos_por_reserva(id_reserva: str, db: Session = Depends(get_db)):
+async def get_asientos_por_reserva(id_reserva: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Obtener todos los asientos de una reserva
     
@@ -62,106 +158,134 @@ async def get_asientos_por_reserva(id_reserva: str, db: Session = Depends(get_db
         "estado": "string"
     }
     """
-    # Verificar que la reserva existe
-    reserva = db.query(Reserva).filter(Reserva.id_reserva == id_reserva).first()
-    if not reserva:
+    reserva_uuid = validate_uuid(id_reserva, "reserva")
+    
+    # Una sola consulta: la reserva con sus asientos
+    rows = (await db.execute(asientos_de_reserva_stmt(reserva_uuid))).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     
-    # Obtener las relaciones reserva-asiento
-    reserva_asientos = db.query(ReservaAsiento).filter(
-        ReservaAsiento.id_reserva == id_reserva
-    ).all()
+    return respuesta_json([{
+        "id_asiento": row.id_asiento,
+        "numero": row.numero or '',
+        "estado": row.estado or 'disponible'
+    } for row in rows if row.id_asiento is not None], response)
+
+@router.post(
+    "/reservas/{id_reserva}/asientos",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ReservaAsientosLoteResponse,
+    responses={409: {"model": ReservaAsientosLoteResponse}}
+)
+def agregar_asientos_a_reserva(
+    id_reserva: str,
+    lote: ReservaAsientosLoteCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Agregar varios asientos de una función a una reserva en una sola transacción
     
-    if not reserva_asientos:
-        return []
+    Es todo o nada: si algún asiento no está disponible para la función se
+    responde 409 con la lista de conflictos por asiento y no se reserva ninguno.
+    Si se envía id_retencion, los asientos retenidos por ese carrito se consumen.
+    """
+    reserva = get_or_404(db, Reserva, Reserva.id_reserva, validate_uuid(id_reserva, "reserva"), "reserva")
     
-    # Obtener los IDs de asientos
-    asiento_ids = [ra.id_asiento for ra in reserva_asientos]
+    if reserva.id_funcion is not None and reserva.id_funcion != lote.id_funcion:
+        raise HTTPException(status_code=400, detail="La reserva pertenece a otra función")
     
-    # Obtener la información completa de los asientos
-    asientos = db.query(Asiento).filter(Asiento.id_asiento.in_(asiento_ids)).all()
+    # Una reserva sin función queda asociada a la del lote
+    sin_funcion = reserva.id_funcion is None
+    try:
+        asientos, conflictos = reservar_asientos(
+            db, reserva, lote.id_funcion, lote.id_asientos, id_retencion=lote.id_retencion
+        )
+    except ReservaDeOtraFuncion:
+        raise HTTPException(status_code=400, detail="La reserva pertenece a otra función")
     
-    return [{
-        "id_asiento": str(a.id_asiento),
-        "numero": str(a.numero) if a.numero else '',
-        "estado": a.estado if a.estado else 'disponible'
-    } for a in asientos]
+    resultado = ReservaAsientosLoteResponse(
+        id_reserva=reserva.id_reserva,
+        id_funcion=lote.id_funcion,
+        asientos=asientos,
+        conflictos=conflictos
+    )
+    if conflictos:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=resultado.model_dump(mode="json")
+        )
+    
+    if sin_funcion:
+        notificar_cambio("reserva", reserva.id_reserva)
+    notificar_cambio("reserva_asiento", reserva.id_reserva)
+    publicar_asientos(lote.id_funcion, ESTADO_OCUPADO, [a["id_asiento"] for a in asientos])
+    return resultado
 
 @router.post(
     "/reservas/{id_reserva}/asientos/{id_asiento}", 
     status_code=status.HTTP_201_CREATED,
     response_model=ReservaAsientoResponse
 )
-async def agregar_asiento_a_reserva(
+def agregar_asiento_a_reserva(
     id_reserva: str, 
     id_asiento: str, 
     db: Session = Depends(get_db)
 ):
     """Agregar un asiento a una reserva"""
     # Verificar que la reserva existe
-    reserva = db.query(Reserva).filter(Reserva.id_reserva == id_reserva).first()
+    reserva_uuid = validate_uuid(id_reserva, "reserva")
+    reserva = db.query(Reserva).filter(Reserva.id_reserva == reserva_uuid).first()
     if not reserva:
         raise HTTPException(status_code=404, detail="Reserva no encontrada")
     
-    # Verificar que el asiento existe
-    asiento = db.query(Asiento).filter(Asiento.id_asiento == id_asiento).first()
-    if not asiento:
-        raise HTTPException(status_code=404, detail="Asiento no encontrado")
-    
-    # Verificar si el asiento ya está en esta reserva
-    reserva_existente = db.query(ReservaAsiento).filter(
-        ReservaAsiento.id_asiento == id_asiento,
-        ReservaAsiento.id_reserva == id_reserva
-    ).first()
-    
-    if reserva_existente:
-        raise HTTPException(status_code=400, detail="El asiento ya está en esta reserva")
+    if reserva.id_funcion is None:
+        raise HTTPException(status_code=400, detail="La reserva no tiene una función asociada")
     
-    # Verificar si el asiento ya está reservado en otra reserva
-    reserva_otra = db.query(ReservaAsiento).filter(
-        ReservaAsiento.id_asiento == id_asiento,
-        ReservaAsiento.id_reserva != id_reserva
-    ).first()
+    # Misma ruta transaccional que el lote, con un solo asiento
+    id_funcion = reserva.id_funcion
+    try:
+        asientos, conflictos = reservar_asientos(
+            db, reserva, id_funcion, [validate_uuid(id_asiento, "asiento")]
+        )
+    except ReservaDeOtraFuncion:
+        raise HTTPException(status_code=409, detail="La función de la reserva cambió; intente de nuevo")
     
-    if reserva_otra:
+    if conflictos:
+        motivo = conflictos[0]["motivo"]
+        if motivo == CONFLICTO_NO_ENCONTRADO:
+            raise HTTPException(status_code=404, detail="Asiento no encontrado")
+        if motivo == CONFLICTO_EN_ESTA_RESERVA:
+            raise HTTPException(status_code=400, detail="El asiento ya está en esta reserva")
+        if motivo == CONFLICTO_FUERA_DE_SALA:
+            raise HTTPException(status_code=400, detail="El asiento no pertenece a la sala de la función")
+        if motivo == CONFLICTO_RETENIDO:
+            raise HTTPException(status_code=400, detail="El asiento está retenido por otra compra en curso")
         raise HTTPException(status_code=400, detail="El asiento ya está reservado en otra reserva")
     
-    # Crear la relación reserva-asiento
-    reserva_asiento = ReservaAsiento(
-        id_reserva=id_reserva,
-        id_asiento=id_asiento
-    )
-    
-    db.add(reserva_asiento)
-    db.commit()
-    db.refresh(reserva_asiento)
-    
-    # Obtener el asiento para incluirlo en la respuesta
-    asiento = db.query(Asiento).filter(Asiento.id_asiento == id_asiento).first()
+    notificar_cambio("reserva_asiento", reserva_uuid)
+    publicar_asientos(id_funcion, ESTADO_OCUPADO, [asientos[0]["id_asiento"]])
     
     # Como ReservaAsiento tiene clave primaria compuesta, no tiene un campo 'id' único
     # Usamos una combinación de ambos IDs como identificador
-    return {
-        "id_reserva": str(reserva_asiento.id_reserva),
-        "id_asiento": str(reserva_asiento.id_asiento),
-        "numero_asiento": asiento.numero if asiento else None,
-        "estado_asiento": asiento.estado if asiento else None
-    }
+    return asientos[0]
 
 @router.delete(
     "/reservas/{id_reserva}/asientos/{id_asiento}", 
     status_code=status.HTTP_204_NO_CONTENT
 )
-async def remover_asiento_de_reserva(
+def remover_asiento_de_reserva(
     id_reserva: str, 
     id_asiento: str, 
     db: Session = Depends(get_db)
 ):
     """Eliminar un asiento de una reserva"""
+    reserva_uuid = validate_uuid(id_reserva, "reserva")
+    asiento_uuid = validate_uuid(id_asiento, "asiento")
+    
     # Buscar la relación reserva-asiento
     reserva_asiento = db.query(ReservaAsiento).filter(
-        ReservaAsiento.id_reserva == id_reserva,
-        ReservaAsiento.id_asiento == id_asiento
+        ReservaAsiento.id_reserva == reserva_uuid,
+        ReservaAsiento.id_asiento == asiento_uuid
     ).first()
     
     if not reserva_asiento:
@@ -170,8 +294,69 @@ async def remover_asiento_de_reserva(
             detail="No se encontró el asiento en la reserva especificada"
         )
     
+    id_funcion = db.query(Reserva.id_funcion).filter(Reserva.id_reserva == reserva_uuid).scalar()
+    
     # Eliminar la relación
     db.delete(reserva_asiento)
     db.commit()
+    notificar_cambio("reserva_asiento", id_reserva)
+    publicar_asientos(id_funcion, ESTADO_DISPONIBLE, [asiento_uuid])
+    
+    return None
+
+@router.post(
+    "/funciones/{id_funcion}/retenciones",
+    status_code=status.HTTP_201_CREATED,
+    response_model=RetencionResponse,
+    responses={409: {"model": RetencionResponse}}
+)
+def retener_asientos_de_funcion(
+    id_funcion: str,
+    retencion: RetencionCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Retener temporalmente asientos de una función mientras se completa el pago
+    
+    Los asientos retenidos cuentan como ocupados hasta que vence la retención,
+    se libera el carrito o se reservan con el mismo id_retencion.
+    Enviar un id_retencion existente agrega asientos al carrito y renueva su vencimiento.
+    """
+    funcion_uuid = validate_uuid(id_funcion, "función")
+    
+    id_retencion, expira_en, conflictos = retener_asientos(
+        db,
+        funcion_uuid,
+        retencion.id_asientos,
+        id_retencion=retencion.id_retencion,
+        id_usuario=retencion.id_usuario
+    )
+    
+    resultado = RetencionResponse(
+        id_retencion=id_retencion,
+        id_funcion=funcion_uuid,
+        expira_en=expira_en,
+        asientos=[] if conflictos else retencion.id_asientos,
+        conflictos=conflictos
+    )
+    if conflictos:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=resultado.model_dump(mode="json")
+        )
+    
+    notificar_cambio("retencion_asiento", id_retencion)
+    publicar_asientos(funcion_uuid, ESTADO_RETENIDO, retencion.id_asientos)
+    return resultado
+
+@router.delete("/retenciones/{id_retencion}", status_code=status.HTTP_204_NO_CONTENT)
+def liberar_retencion_de_asientos(id_retencion: str, db: Session = Depends(get_db)):
+    """Liberar todos los asientos retenidos por un carrito"""
+    liberados = liberar_retencion(db, validate_uuid(id_retencion, "retención"))
+    
+    if not liberados:
+        raise HTTPException(status_code=404, detail="Retención no encontrada")
     
+    notificar_cambio("retencion_asiento", id_retencion)
+    publicar_liberados(liberados)
     return None
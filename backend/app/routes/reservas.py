@@ -1,13 +1,53 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from app.database import get_db
 from app.models import Reserva
 from app.schemas import ReservaCreate, ReservaUpdate, ReservaResponse
-from app.utils.dependencies import get_or_404
+from app.schemas.detalle import ReservaDetalleResponse
+from app.services.detalle_service import EXPANSIONES_RESERVA, TABLAS_RESERVA
+from app.services.ocupacion_service import publicar_resync, publicar_resync_todos, reservas_con_asientos
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
+from app.utils.dependencies import get_or_404, validate_uuid
+from app.utils.expansion import detalle_expandido, parametro_expand
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_PRIVADO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_RESERVAS = (Reserva.fecha_reserva, Reserva.id_reserva)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("reserva", cache_control=CACHE_PRIVADO)
+# El detalle puede incluir función, película, sala, asientos y facturas (expand=)
+sin_cambios_detalle = condicional(*TABLAS_RESERVA, cache_control=CACHE_PRIVADO)
+
+# Los asientos se reservan para la función de la reserva (ver reserva_asiento.id_funcion)
+CAMBIO_FUNCION_CON_ASIENTOS = "La reserva tiene asientos; no se puede cambiar su función"
+
+
+def _cambios_de_funcion_con_asientos(db: Session, cambios: List[dict]) -> List[tuple]:
+    """Errores del PATCH en lote para las reservas con asientos que cambian de función"""
+    nuevas = {c["id_reserva"]: c["id_funcion"] for c in cambios if "id_funcion" in c}
+    if not nuevas:
+        return []
+    actuales = dict(db.execute(
+        select(Reserva.id_reserva, Reserva.id_funcion).where(Reserva.id_reserva.in_(nuevas))
+    ).all())
+    movidas = [id_reserva for id_reserva, id_funcion in nuevas.items() if actuales.get(id_reserva) != id_funcion]
+    con_asientos = reservas_con_asientos(db, movidas) if movidas else set()
+    return [
+        (indice, "id_funcion", CAMBIO_FUNCION_CON_ASIENTOS, "con_asientos")
+        for indice, cambio in enumerate(cambios)
+        if cambio["id_reserva"] in con_asientos and "id_funcion" in cambio
+    ]
+
 @router.post("/reservas", response_model=ReservaResponse, status_code=status.HTTP_201_CREATED)
 def create_reserva(reserva: ReservaCreate, db: Session = Depends(get_db)):
     """Crear una nueva reserva"""
@@ -15,19 +55,31 @@ def create_reserva(reserva: ReservaCreate, db: Session = Depends(get_db)):
     db.add(db_reserva)
     db.commit()
     db.refresh(db_reserva)
+    notificar_cambio("reserva", db_reserva.id_reserva)
     return db_reserva
 
-@router.get("/reservas", response_model=List[ReservaResponse])
-def get_reservas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/reservas", response_model=Union[List[ReservaResponse], Pagina[ReservaResponse]], dependencies=[Depends(sin_cambios)])
+def get_reservas(paginacion: Paginacion = Depends(), db: Session = Depends(get_db)):
     """Obtener lista de reservas"""
-    reservas = db.query(Reserva).offset(skip).limit(limit).all()
-    return reservas
+    query = consulta_ligera(db, Reserva, ReservaResponse)
+    return respuesta_json(paginar(query, paginacion, ORDEN_RESERVAS, ReservaResponse), paginacion.response)
 
-@router.get("/reservas/{id_reserva}", response_model=ReservaResponse)
-def get_reserva(id_reserva: str, db: Session = Depends(get_db)):
-    """Obtener una reserva por ID"""
-    reserva = get_or_404(db, Reserva, Reserva.id_reserva, id_reserva, "reserva")
-    return reserva
+@router.get(
+    "/reservas/{id_reserva}",
+    response_model=ReservaDetalleResponse,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(sin_cambios_detalle)]
+)
+def get_reserva(
+    id_reserva: str,
+    expand: Optional[str] = parametro_expand("funcion.pelicula,funcion.sala,asientos,facturas"),
+    db: Session = Depends(get_db)
+):
+    """Obtener una reserva por ID, con las relaciones pedidas en expand"""
+    return detalle_expandido(
+        db, Reserva, Reserva.id_reserva, validate_uuid(id_reserva, "reserva"), "reserva",
+        ReservaResponse, EXPANSIONES_RESERVA, expand
+    )
 
 @router.put("/reservas/{id_reserva}", response_model=ReservaResponse)
 def update_reserva(
@@ -37,19 +89,55 @@ def update_reserva(
 ):
     """Actualizar una reserva"""
     reserva = get_or_404(db, Reserva, Reserva.id_reserva, id_reserva, "reserva")
+    funcion_anterior = reserva.id_funcion
     
     update_data = reserva_update.model_dump(exclude_unset=True)
+    if (
+        "id_funcion" in update_data
+        and update_data["id_funcion"] != funcion_anterior
+        and reservas_con_asientos(db, [reserva.id_reserva])
+    ):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CAMBIO_FUNCION_CON_ASIENTOS)
     for field, value in update_data.items():
         setattr(reserva, field, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Se le agregaron asientos entre la verificación y el commit
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CAMBIO_FUNCION_CON_ASIENTOS)
     db.refresh(reserva)
+    notificar_cambio("reserva", reserva.id_reserva)
+    if reserva.id_funcion != funcion_anterior:
+        # Los mapas de las dos funciones recargan su estado
+        publicar_resync(funcion_anterior)
+        publicar_resync(reserva.id_funcion)
     return reserva
 
 @router.delete("/reservas/{id_reserva}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_reserva(id_reserva: str, db: Session = Depends(get_db)):
     """Eliminar una reserva"""
     reserva = get_or_404(db, Reserva, Reserva.id_reserva, id_reserva, "reserva")
+    id_funcion = reserva.id_funcion
     db.delete(reserva)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("reserva", id_reserva)
+    # Sus asientos vuelven a estar disponibles en el mapa en vivo
+    publicar_resync(id_funcion)
+    return None
+
+# Escrituras en lote: POST/PATCH /reservas/lote y POST /reservas/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="reservas",
+    model=Reserva,
+    pk=Reserva.id_reserva,
+    create_schema=ReservaCreate,
+    update_schema=ReservaUpdate,
+    response_schema=ReservaResponse,
+    tabla="reserva",
+    # Los lotes pueden mover o borrar reservas de cualquier función
+    al_modificar=publicar_resync_todos,
+    validar_cambios=_cambios_de_funcion_con_asientos
+)
\ No newline at end of file
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from app.database import get_db
 from app.models import Sala
 from app.schemas import SalaCreate, SalaUpdate, SalaResponse
+from app.schemas.sala import GeneracionAsientosResponse
+from app.services.asientos_service import generar_asientos, MAX_ASIENTOS_POR_SALA
+from app.utils.cache import catalog_cache
+from app.utils.bulk import agregar_rutas_lote
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
 from app.utils.dependencies import get_or_404
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_CATALOGO
 
 router = APIRouter()
 
+# Orden estable para la paginación por cursor
+ORDEN_SALAS = (Sala.id_sala,)
+
+# ETag/304 para las lecturas, según la versión de la tabla
+sin_cambios = condicional("sala", cache_control=CACHE_CATALOGO)
+
 @router.post("/salas", response_model=SalaResponse, status_code=status.HTTP_201_CREATED)
 def create_sala(sala: SalaCreate, db: Session = Depends(get_db)):
     """Crear una nueva sala"""
@@ -15,20 +30,49 @@ def create_sala(sala: SalaCreate, db: Session = Depends(get_db)):
     db.add(db_sala)
     db.commit()
     db.refresh(db_sala)
+    notificar_cambio("sala", db_sala.id_sala)
     return db_sala
 
-@router.get("/salas", response_model=List[SalaResponse])
-def get_salas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/salas", response_model=Union[List[SalaResponse], Pagina[SalaResponse]], dependencies=[Depends(sin_cambios)])
+def get_salas(paginacion: Paginacion = Depends(), db: Session = Depends(get_db)):
     """Obtener lista de salas"""
-    salas = db.query(Sala).offset(skip).limit(limit).all()
-    return salas
+    resultado = catalog_cache.get_or_set(
+        ("salas",) + paginacion.cache_key(),
+        lambda: paginar(consulta_ligera(db, Sala, SalaResponse), paginacion, ORDEN_SALAS, SalaResponse)
+    )
+    return respuesta_json(resultado, paginacion.response)
 
-@router.get("/salas/{id_sala}", response_model=SalaResponse)
+@router.get("/salas/{id_sala}", response_model=SalaResponse, dependencies=[Depends(sin_cambios)])
 def get_sala(id_sala: str, db: Session = Depends(get_db)):
     """Obtener una sala por ID"""
     sala = get_or_404(db, Sala, Sala.id_sala, id_sala, "sala")
     return sala
 
+@router.post("/salas/{id_sala}/asientos/generar", response_model=GeneracionAsientosResponse)
+def generar_asientos_sala(id_sala: str, regenerar: bool = False, db: Session = Depends(get_db)):
+    """
+    Generar los asientos de la sala a partir de sus filas y columnas (A1, A2, ..., B1, ...).
+    Solo crea los que faltan; con regenerar=true también elimina los que quedaron
+    fuera de la grilla y no tienen reservas.
+    """
+    sala = get_or_404(db, Sala, Sala.id_sala, id_sala, "sala")
+    
+    if not sala.filas or not sala.columnas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La sala no tiene filas y columnas definidas"
+        )
+    if sala.filas * sala.columnas > MAX_ASIENTOS_POR_SALA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La sala no puede tener más de {MAX_ASIENTOS_POR_SALA} asientos"
+        )
+    
+    resumen = generar_asientos(db, sala, regenerar=regenerar)
+    if resumen["creados"] or resumen["eliminados"]:
+        notificar_cambio("asiento")
+    return resumen
+
 @router.put("/salas/{id_sala}", response_model=SalaResponse)
 def update_sala(
     id_sala: str,
@@ -44,6 +88,7 @@ def update_sala(
     
     db.commit()
     db.refresh(sala)
+    notificar_cambio("sala", sala.id_sala)
     return sala
 
 @router.delete("/salas/{id_sala}", status_code=status.HTTP_204_NO_CONTENT)
@@ -52,4 +97,17 @@ def delete_sala(id_sala: str, db: Session = Depends(get_db)):
     sala = get_or_404(db, Sala, Sala.id_sala, id_sala, "sala")
     db.delete(sala)
     db.commit()
-    return None
\ No newline at end of file
+    notificar_cambio("sala", id_sala)
+    return None
+
+# Escrituras en lote: POST/PATCH /salas/lote y POST /salas/lote/eliminar
+agregar_rutas_lote(
+    router,
+    recurso="salas",
+    model=Sala,
+    pk=Sala.id_sala,
+    create_schema=SalaCreate,
+    update_schema=SalaUpdate,
+    response_schema=SalaResponse,
+    tabla="sala"
+)
\ No newline at end of file
@@ -1,64 +1,82 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Union
 from app.database import get_db
 from app.models import Usuario
-from app.schemas import UsuarioUpdate, UsuarioResponse
-from app.services.auth_service import get_current_active_user, get_password_hash
+from app.schemas import UsuarioUpdate, UsuarioResponse, Principal
+from app.services.auth_service import get_current_active_user
+from app.services.password_service import get_password_hash_async
+from app.utils.cambios import notificar_cambio
+from app.utils.consultas import consulta_ligera
 from app.utils.dependencies import get_or_404
+from app.utils.pagination import Paginacion, Pagina, paginar
+from app.utils.serializacion import respuesta_json
+from app.utils.etag import condicional, CACHE_PRIVADO
 
 router = APIRouter()
 
-@router.get("/usuarios", response_model=List[UsuarioResponse])
+# Orden estable para la paginación por cursor
+ORDEN_USUARIOS = (Usuario.id_usuario,)
+
+# ETag/304 para las lecturas; la autenticación se resuelve primero
+lecturas_condicionales = [
+    Depends(get_current_active_user),
+    Depends(condicional("usuario", cache_control=CACHE_PRIVADO))
+]
+
+@router.get("/usuarios", response_model=Union[List[UsuarioResponse], Pagina[UsuarioResponse]], dependencies=lecturas_condicionales)
 def get_usuarios(
-    skip: int = 0,
-    limit: int = 100,
+    paginacion: Paginacion = Depends(),
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener lista de usuarios (requiere autenticación)"""
-    usuarios = db.query(Usuario).offset(skip).limit(limit).all()
-    return usuarios
+    query = consulta_ligera(db, Usuario, UsuarioResponse)
+    return respuesta_json(paginar(query, paginacion, ORDEN_USUARIOS, UsuarioResponse), paginacion.response)
+
+@router.get("/usuarios/me", response_model=UsuarioResponse)
+def get_current_usuario(current_user: Principal = Depends(get_current_active_user)):
+    """Obtener datos del usuario actual"""
+    # El UsuarioResponse ya excluye el password automáticamente por no estar en el schema
+    # Pero asegurémonos de que se serialice correctamente
+    return current_user
 
-@router.get("/usuarios/{id_usuario}", response_model=UsuarioResponse)
+@router.get("/usuarios/{id_usuario}", response_model=UsuarioResponse, dependencies=lecturas_condicionales)
 def get_usuario(
     id_usuario: str,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener un usuario por ID"""
     usuario = get_or_404(db, Usuario, Usuario.id_usuario, id_usuario, "usuario")
     return usuario
 
-@router.get("/usuarios/me", response_model=UsuarioResponse)
-def get_current_usuario(current_user: Usuario = Depends(get_current_active_user)):
-    """Obtener datos del usuario actual"""
-    # El UsuarioResponse ya excluye el password automáticamente por no estar en el schema
-    # Pero asegurémonos de que se serialice correctamente
-    return current_user
-
 @router.put("/usuarios/{id_usuario}", response_model=UsuarioResponse)
-def update_usuario(
+async def update_usuario(
     id_usuario: str,
     usuario_update: UsuarioUpdate,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Actualizar un usuario"""
-    usuario = get_or_404(db, Usuario, Usuario.id_usuario, id_usuario, "usuario")
+    usuario = await run_in_threadpool(get_or_404, db, Usuario, Usuario.id_usuario, id_usuario, "usuario")
     
     # Actualizar campos
     update_data = usuario_update.model_dump(exclude_unset=True)
     
-    # Si se actualiza la contraseña, hashearla
+    # Si se actualiza la contraseña, hashearla (en el pool de hash)
     if "password" in update_data:
-        update_data["password"] = get_password_hash(update_data["password"])
+        update_data["password"] = await get_password_hash_async(update_data["password"])
     
-    for field, value in update_data.items():
-        setattr(usuario, field, value)
+    def guardar():
+        for field, value in update_data.items():
+            setattr(usuario, field, value)
+        db.commit()
+        db.refresh(usuario)
     
-    db.commit()
-    db.refresh(usuario)
+    await run_in_threadpool(guardar)
+    notificar_cambio("usuario", usuario.id_usuario)
     
     return usuario
 
@@ -66,12 +84,13 @@ def update_usuario(
 def delete_usuario(
     id_usuario: str,
     db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Eliminar un usuario"""
     usuario = get_or_404(db, Usuario, Usuario.id_usuario, id_usuario, "usuario")
     
     db.delete(usuario)
     db.commit()
+    notificar_cambio("usuario", id_usuario)
     
     return None
\ No newline at end of file
@@ -6,7 +6,7 @@ from .asiento import AsientoCreate, AsientoUpdate, AsientoResponse
 from .reserva import ReservaCreate, ReservaUpdate, ReservaResponse
 from .factura import FacturaCreate, FacturaUpdate, FacturaResponse
 from .incidencia import IncidenciaCreate, IncidenciaUpdate, IncidenciaResponse
-from .auth import Token, TokenData
+from .auth import Token, TokenData, Principal
 
 __all__ = [
     # Usuario
@@ -26,5 +26,5 @@ __all__ = [
     # Incidencia
     "IncidenciaCreate", "IncidenciaUpdate", "IncidenciaResponse",
     # Auth
-    "Token", "TokenData"
+    "Token", "TokenData", "Principal"
 ]
\ No newline at end of file
@@ -1,9 +1,20 @@
 from pydantic import BaseModel
 from typing import Optional
+from uuid import UUID
 
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class TokenData(BaseModel):
-    correo: Optional[str] = None
\ No newline at end of file
+    correo: Optional[str] = None
+
+class Principal(BaseModel):
+    """Usuario autenticado, sin password; es lo que se guarda en cache"""
+    id_usuario: UUID
+    nombre: str
+    correo: Optional[str] = None
+    rol: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
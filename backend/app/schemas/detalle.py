@@ -0,0 +1,21 @@
+from typing import List, Optional
+from .pelicula import PeliculaResponse
+from .sala import SalaResponse
+from .funcion import FuncionResponse
+from .asiento import AsientoResponse
+from .reserva import ReservaResponse
+from .factura import FacturaResponse
+
+# Respuestas de detalle con expand=: cada relación aparece solo si se pidió
+
+class FuncionDetalleResponse(FuncionResponse):
+    pelicula: Optional[PeliculaResponse] = None
+    sala: Optional[SalaResponse] = None
+
+class ReservaDetalleResponse(ReservaResponse):
+    funcion: Optional[FuncionDetalleResponse] = None
+    asientos: Optional[List[AsientoResponse]] = None
+    facturas: Optional[List[FacturaResponse]] = None
+
+class FacturaDetalleResponse(FacturaResponse):
+    reserva: Optional[ReservaDetalleResponse] = None
@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from decimal import Decimal
+from datetime import date, datetime
+
+class PeliculaMasVistaResponse(BaseModel):
+    id_pelicula: UUID
+    titulo: str
+    reservas: int
+    asientos_vendidos: int
+    ingresos: Decimal
+
+class IngresosPeriodoResponse(BaseModel):
+    periodo: date
+    facturas: int
+    ingresos: Decimal
+
+class OcupacionSalaResponse(BaseModel):
+    id_sala: UUID
+    nombre: str
+    funciones: int
+    asientos_por_funcion: int
+    asientos_vendidos: int
+    # Asientos vendidos / (asientos de la sala x funciones), entre 0 y 1
+    ocupacion: float
+
+class FuncionMasVendidaResponse(BaseModel):
+    id_funcion: UUID
+    fecha_hora: datetime
+    id_pelicula: Optional[UUID] = None
+    titulo: Optional[str] = None
+    id_sala: Optional[UUID] = None
+    reservas: int
+    asientos_vendidos: int
+    ingresos: Decimal
+
+class EstadisticaUsuarioResponse(BaseModel):
+    id_usuario: UUID
+    nombre: str
+    reservas: int
+    gasto_total: Decimal
+    gasto_promedio: Decimal
+
+class MetodoPagoResponse(BaseModel):
+    metodo_pago: Optional[str] = None
+    facturas: int
+    ingresos: Decimal
+    # Fracción de las facturas del período, entre 0 y 1
+    porcentaje: float
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, UUID4, Field
-from typing import Optional
+from typing import Optional, List
+from datetime import datetime
 
 class ReservaAsientoBase(BaseModel):
     id_reserva: UUID4
@@ -16,3 +17,46 @@ class ReservaAsientoResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class AsientoMapaResponse(BaseModel):
+    id_asiento: UUID4
+    numero: str
+    estado: str
+
+class MapaAsientosResponse(BaseModel):
+    id_funcion: UUID4
+    id_sala: Optional[UUID4] = None
+    filas: Optional[int] = None
+    columnas: Optional[int] = None
+    total: int
+    ocupados: int
+    retenidos: int = 0
+    asientos: List[AsientoMapaResponse]
+
+class ReservaAsientosLoteCreate(BaseModel):
+    id_funcion: UUID4
+    id_asientos: List[UUID4] = Field(..., min_length=1, max_length=100)
+    # Carrito cuyas retenciones se consumen al reservar
+    id_retencion: Optional[UUID4] = None
+
+class ConflictoAsiento(BaseModel):
+    id_asiento: UUID4
+    motivo: str
+
+class ReservaAsientosLoteResponse(BaseModel):
+    id_reserva: UUID4
+    id_funcion: UUID4
+    asientos: List[ReservaAsientoResponse] = []
+    conflictos: List[ConflictoAsiento] = []
+
+class RetencionCreate(BaseModel):
+    id_asientos: List[UUID4] = Field(..., min_length=1, max_length=100)
+    id_retencion: Optional[UUID4] = None
+    id_usuario: Optional[UUID4] = None
+
+class RetencionResponse(BaseModel):
+    id_retencion: UUID4
+    id_funcion: UUID4
+    expira_en: Optional[datetime] = None
+    asientos: List[UUID4] = []
+    conflictos: List[ConflictoAsiento] = []
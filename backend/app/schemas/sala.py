@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from decimal import Decimal
 
@@ -26,4 +26,15 @@ class SalaResponse(SalaBase):
     id_sala: UUID
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class GeneracionAsientosResponse(BaseModel):
+    """Resumen de la generación de asientos de una sala"""
+    id_sala: UUID
+    filas: int
+    columnas: int
+    creados: int
+    existentes: int
+    eliminados: int
+    # Asientos fuera de la grilla que se conservaron (sin regenerar, o con reservas)
+    fuera_de_grilla: List[str] = []
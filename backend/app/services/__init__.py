@@ -3,6 +3,7 @@ from .auth_service import (
     get_password_hash,
     create_access_token,
     authenticate_user,
+    authenticate_user_async,
     get_current_user,
     get_current_active_user
 )
@@ -12,6 +13,7 @@ __all__ = [
     "get_password_hash", 
     "create_access_token",
     "authenticate_user",
+    "authenticate_user_async",
     "get_current_user",
     "get_current_active_user"
 ]
\ No newline at end of file
@@ -0,0 +1,98 @@
+import re
+from sqlalchemy import select, insert, delete, exists
+from sqlalchemy.orm import Session
+from app.models import Sala, Asiento, ReservaAsiento, RetencionAsiento
+
+# Tope de asientos que se generan para una sala en una sola llamada
+MAX_ASIENTOS_POR_SALA = 5000
+
+ESTADO_INICIAL = "disponible"
+
+# Número de asiento de la grilla: letras de la fila y número de columna
+NUMERO_GRILLA = re.compile(r"([A-Z]+)(\d+)")
+
+
+def etiqueta_fila(indice: int) -> str:
+    """Letra de la fila: 0 -> A, 25 -> Z, 26 -> AA, 27 -> AB..."""
+    etiqueta = ""
+    indice += 1
+    while indice > 0:
+        indice, resto = divmod(indice - 1, 26)
+        etiqueta = chr(ord("A") + resto) + etiqueta
+    return etiqueta
+
+
+def numeros_grilla(filas: int, columnas: int) -> list:
+    """Números de asiento de la grilla completa, fila por fila: A1, A2, ..., B1, ..."""
+    return [
+        f"{etiqueta_fila(fila)}{columna}"
+        for fila in range(filas)
+        for columna in range(1, columnas + 1)
+    ]
+
+
+def posicion_grilla(numero: str) -> tuple:
+    """
+    Clave para ordenar asientos por fila y columna: A2 antes que A10 y Z9
+    antes que AA1. Los números fuera del formato de la grilla van al final.
+    """
+    coincidencia = NUMERO_GRILLA.fullmatch(numero or "")
+    if coincidencia is None:
+        return (1, 0, 0, numero or "")
+    fila = 0
+    for letra in coincidencia.group(1):
+        fila = fila * 26 + ord(letra) - ord("A") + 1
+    return (0, fila, int(coincidencia.group(2)), "")
+
+
+def generar_asientos(db: Session, sala: Sala, regenerar: bool = False) -> dict:
+    """
+    Crea los asientos que faltan en la grilla filas x columnas de la sala con
+    una sola inserción multi-fila. Volver a llamarla no duplica asientos.
+
+    Con regenerar=True además elimina los asientos que quedaron fuera de la
+    grilla (por ejemplo, si la sala se achicó), salvo los que tienen reservas
+    o retenciones, que se conservan y se informan.
+    """
+    filas, columnas = int(sala.filas or 0), int(sala.columnas or 0)
+    grilla = numeros_grilla(filas, columnas)
+    en_grilla = set(grilla)
+
+    # Bloquear la sala para que dos generaciones simultáneas no dupliquen asientos
+    db.execute(select(Sala.id_sala).where(Sala.id_sala == sala.id_sala).with_for_update())
+    existentes = dict(db.execute(
+        select(Asiento.numero, Asiento.id_asiento).where(Asiento.id_sala == sala.id_sala)
+    ).all())
+
+    faltantes = [numero for numero in grilla if numero not in existentes]
+    if faltantes:
+        db.execute(
+            insert(Asiento),
+            [{"numero": numero, "estado": ESTADO_INICIAL, "id_sala": sala.id_sala} for numero in faltantes]
+        )
+
+    eliminados, conservados = 0, []
+    fuera = [id_asiento for numero, id_asiento in existentes.items() if numero not in en_grilla]
+    if regenerar and fuera:
+        referenciado = (
+            exists().where(ReservaAsiento.id_asiento == Asiento.id_asiento)
+            | exists().where(RetencionAsiento.id_asiento == Asiento.id_asiento)
+        )
+        conservados = list(db.execute(
+            select(Asiento.numero).where(Asiento.id_asiento.in_(fuera), referenciado)
+        ).scalars())
+        eliminados = db.execute(
+            delete(Asiento).where(Asiento.id_asiento.in_(fuera), ~referenciado)
+        ).rowcount
+
+    db.commit()
+
+    return {
+        "id_sala": sala.id_sala,
+        "filas": filas,
+        "columnas": columnas,
+        "creados": len(faltantes),
+        "existentes": len(existentes) - len(fuera),
+        "eliminados": eliminados,
+        "fuera_de_grilla": sorted(conservados) if regenerar else sorted(n for n in existentes if n not in en_grilla),
+    }
@@ -1,105 +1,48 @@
 from datetime import datetime, timedelta
 from typing import Optional
-import hashlib
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
 from app.database import get_db
 from app.models import Usuario
-from app.schemas.auth import TokenData
-
-# Configuración de encriptación
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.schemas.auth import TokenData, Principal
+from app.services.password_service import (
+    get_password_hash,
+    verify_password,
+    verify_and_update,
+    verify_and_update_async,
+    verificar_ficticio,
+    verificar_ficticio_async
+)
+from app.utils.cache import TTLCache
+from app.utils.cambios import suscribir
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
-def get_password_hash(password: str) -> str:
-    """
-    Generate a password hash.
-    
-    NOTE: Temporarily disabled hashing for testing.
-    In production, use the commented code below for secure password hashing.
-    """
-    if not password or not isinstance(password, str):
-        raise ValueError("Password must be a non-empty string")
-    
-    # TEMPORARY: Return password as-is for testing
-    print("WARNING: Password hashing is disabled for testing")
-    return password
-    
-    # SECURE VERSION (commented for now)
-    """
-    try:
-        # Bcrypt has a 72 byte limit. If password is too long, hash it first
-        password_bytes = password.encode('utf-8')
-        
-        if len(password_bytes) > 72:
-            print(f"Password too long ({len(password_bytes)} bytes), hashing with SHA-256 first")
-            # Hash with SHA-256 first to reduce length
-            password = hashlib.sha256(password_bytes).hexdigest()
-        
-        return pwd_context.hash(password)
-        
-    except Exception as e:
-        print(f"Error hashing password: {str(e)}")
-        raise ValueError(f"Error al hashear la contraseña: {str(e)}")
-    """
+# Usuario autenticado por subject del token, con TTL corto
+principal_cache = TTLCache(
+    "principales",
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS > 0
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Verify a plain password against a stored password.
-    
-    NOTE: Temporarily using plain text comparison for testing.
-    In production, use the commented code below for secure password verification.
-    """
-    if not plain_password or not isinstance(plain_password, str):
-        print("Invalid password type or empty")
-        return False
-    
-    if not hashed_password:
-        print("No password hash provided")
-        return False
-    
-    # TEMPORARY: Simple string comparison for testing
-    print("WARNING: Using plain text password comparison for testing")
-    return plain_password == hashed_password
-    
-    # SECURE VERSION (commented for now)
-    """
-    try:
-        if not plain_password or not isinstance(plain_password, str):
-            print("Invalid password type or empty")
-            return False
-        
-        if not hashed_password:
-            print("No hashed password provided")
-            return False
-        
-        password_bytes = plain_password.encode('utf-8')
-        
-        # First try direct verification
-        try:
-            if pwd_context.verify(plain_password, hashed_password):
-                return True
-        except Exception as e:
-            print(f"Direct verification failed: {str(e)}")
-        
-        # If password is long, try with SHA-256 hash
-        if len(password_bytes) > 72:
-            print(f"Password long ({len(password_bytes)} bytes), trying SHA-256 verification")
-            hashed_pw = hashlib.sha256(password_bytes).hexdigest()
-            return pwd_context.verify(hashed_pw, hashed_password)
-        
-        return False
-        
-    except Exception as e:
-        print(f"Error verifying password: {str(e)}")
-        return False
-    """
+
+def _invalidar_principal(tabla: str, id=None, datos=None):
+    """Un usuario modificado o eliminado deja de estar en cache"""
+    if id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate_where(
+            lambda principal: principal is not None and str(principal.id_usuario) == id
+        )
+
+
+suscribir("usuario", _invalidar_principal)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Crea un token JWT"""
@@ -115,50 +58,65 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     return encoded_jwt
 
+def _guardar_hash(db: Session, usuario: Usuario, nuevo_hash: str):
+    """Reemplaza un hash obsoleto (texto plano u otro costo) por el actual"""
+    usuario.password = nuevo_hash
+    db.commit()
+
 def authenticate_user(db: Session, correo: str, password: str) -> Optional[Usuario]:
-    """Autentica un usuario"""
-    print(f"Attempting to authenticate user: {correo}")
+    """Autentica un usuario (versión síncrona: el hash corre en el hilo actual)"""
+    if not correo or not password:
+        return None
     
-    try:
-        if not correo or not password:
-            print("Email or password not provided")
-            return None
-        
-        usuario = db.query(Usuario).filter(Usuario.correo == correo).first()
-        
-        if not usuario:
-            print(f"User {correo} not found")
-            return None
-        
-        print(f"User found: {usuario.correo}")
-        
-        if not usuario.password:
-            print("No password hash found for user")
-            return None
-        
-        print(f"Stored password hash starts with: {usuario.password[:10]}...")
-        
-        # Verify the password
-        is_valid = verify_password(password, usuario.password)
-        print(f"Password valid: {is_valid}")
-        
-        if not is_valid:
-            print("Invalid password")
-            return None
-        
-        return usuario
-        
-    except Exception as e:
-        print(f"Error during authentication: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    usuario = db.query(Usuario).filter(Usuario.correo == correo).first()
+    if not usuario or not usuario.password:
+        # Mismo costo que una contraseña incorrecta: no revela si la cuenta existe
+        verificar_ficticio(password)
+        return None
+    
+    valida, nuevo_hash = verify_and_update(password, usuario.password)
+    if not valida:
+        return None
+    if nuevo_hash:
+        _guardar_hash(db, usuario, nuevo_hash)
+    
+    return usuario
+
+async def authenticate_user_async(db: Session, correo: str, password: str) -> Optional[Usuario]:
+    """
+    Autentica un usuario sin bloquear el event loop: las consultas van al
+    threadpool y la verificación del hash al pool de hash.
+    """
+    if not correo or not password:
+        return None
+    
+    usuario = await run_in_threadpool(
+        lambda: db.query(Usuario).filter(Usuario.correo == correo).first()
+    )
+    if not usuario or not usuario.password:
+        # Mismo costo que una contraseña incorrecta: no revela si la cuenta existe
+        await verificar_ficticio_async(password)
+        return None
+    
+    valida, nuevo_hash = await verify_and_update_async(password, usuario.password)
+    if not valida:
         return None
+    if nuevo_hash:
+        await run_in_threadpool(_guardar_hash, db, usuario, nuevo_hash)
+    
+    return usuario
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> Usuario:
-    """Obtiene el usuario actual desde el token"""
+) -> Principal:
+    """
+    Obtiene el usuario actual desde el token.
+    
+    Se guarda en cache por subject del token durante
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS; solo se consulta la base de datos
+    cuando no está en cache.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -174,15 +132,25 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    usuario = db.query(Usuario).filter(Usuario.correo == token_data.correo).first()
-    
-    if usuario is None:
-        raise credentials_exception
+    clave = ("principal", token_data.correo)
+    principal = principal_cache.get(clave)
+    if principal is None:
+        # Si el usuario cambia mientras se lee, no se guarda la versión vieja
+        generacion = principal_cache.generacion(clave)
+        
+        def cargar():
+            usuario = db.query(Usuario).filter(Usuario.correo == token_data.correo).first()
+            return Principal.model_validate(usuario) if usuario is not None else None
+        
+        principal = await run_in_threadpool(cargar)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.set(clave, principal, generacion=generacion)
     
-    return usuario
+    return principal
 
 async def get_current_active_user(
-    current_user: Usuario = Depends(get_current_user)
-) -> Usuario:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Obtiene el usuario actual activo"""
     return current_user
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Relaciones que se pueden expandir en los endpoints de detalle (expand=).
+"""
+from app.models import Funcion, Reserva, Factura
+from app.schemas import (
+    PeliculaResponse,
+    SalaResponse,
+    FuncionResponse,
+    AsientoResponse,
+    ReservaResponse,
+    FacturaResponse
+)
+from app.utils.expansion import Expansion
+
+EXPANSIONES_FUNCION = {
+    "pelicula": Expansion(Funcion.pelicula, PeliculaResponse),
+    "sala": Expansion(Funcion.sala, SalaResponse),
+}
+
+EXPANSIONES_RESERVA = {
+    "funcion": Expansion(Reserva.funcion, FuncionResponse, EXPANSIONES_FUNCION),
+    "asientos": Expansion(Reserva.asientos, AsientoResponse),
+    "facturas": Expansion(Reserva.facturas, FacturaResponse),
+}
+
+EXPANSIONES_FACTURA = {
+    "reserva": Expansion(Factura.reserva, ReservaResponse, EXPANSIONES_RESERVA),
+}
+
+# Tablas de las que puede depender cada detalle expandido (para el ETag)
+TABLAS_FUNCION = ("funcion", "pelicula", "sala")
+TABLAS_RESERVA = ("reserva", "reserva_asiento", "asiento", "factura") + TABLAS_FUNCION
+TABLAS_FACTURA = ("factura",) + TABLAS_RESERVA
@@ -0,0 +1,427 @@
+from datetime import datetime, timedelta
+import uuid
+from sqlalchemy import select, exists, insert, update, delete, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Funcion, Sala, Asiento, Reserva, ReservaAsiento, RetencionAsiento
+from app.services.asientos_service import posicion_grilla
+from app.utils import eventos
+from app.utils.cambios import notificar_cambio, suscribir, TODAS
+
+# Estados que puede tener un asiento dentro del mapa de una función
+ESTADO_DISPONIBLE = "disponible"
+ESTADO_OCUPADO = "ocupado"
+ESTADO_RETENIDO = "en-proceso"
+
+# Motivos por los que no se puede reservar un asiento
+CONFLICTO_NO_ENCONTRADO = "no_encontrado"
+CONFLICTO_FUERA_DE_SALA = "fuera_de_sala"
+CONFLICTO_EN_ESTA_RESERVA = "ya_en_reserva"
+CONFLICTO_OCUPADO = "ocupado"
+CONFLICTO_RETENIDO = "retenido"
+
+
+class ReservaDeOtraFuncion(ValueError):
+    """La reserva ya está asociada a otra función"""
+
+
+# Evento SSE con los asientos de una función que cambiaron de estado
+EVENTO_ASIENTOS = "asientos"
+
+
+def canal_funcion(id_funcion) -> str:
+    """Canal de eventos en vivo del mapa de asientos de una función"""
+    return f"funcion:{id_funcion}"
+
+
+def publicar_asientos(id_funcion, estado: str, id_asientos):
+    """
+    Publica el nuevo estado de algunos asientos de una función a los mapas
+    abiertos (de este y de los demás procesos). Se llama después del commit.
+    """
+    if id_funcion is None or not id_asientos:
+        return
+    notificar_cambio("ocupacion", id_funcion, {
+        "estado": estado,
+        "asientos": [str(id_asiento) for id_asiento in id_asientos]
+    })
+
+
+def publicar_resync(id_funcion):
+    """Pide a los mapas abiertos de una función que vuelvan a cargar el estado completo"""
+    if id_funcion is not None:
+        notificar_cambio("ocupacion", id_funcion)
+
+
+def publicar_resync_todos():
+    """Pide a todos los mapas abiertos que recarguen (cambios sin funciones identificadas)"""
+    notificar_cambio("ocupacion")
+
+
+def _difundir_ocupacion(tabla: str, id=None, datos=None):
+    """Lleva los cambios de ocupación a las conexiones SSE de este proceso"""
+    if tabla == TODAS or id is None:
+        eventos.publicar_todos(eventos.EVENTO_RESYNC, {})
+    elif datos is None:
+        # Sin detalle de asientos (o demasiado grande para el feed): estado completo
+        eventos.publicar(canal_funcion(id), eventos.EVENTO_RESYNC, {"id_funcion": id})
+    else:
+        eventos.publicar(canal_funcion(id), EVENTO_ASIENTOS, {"id_funcion": id, **datos})
+
+
+suscribir("ocupacion", _difundir_ocupacion)
+
+
+def publicar_liberados(filas):
+    """Publica como disponibles los asientos liberados, agrupados por función"""
+    por_funcion = {}
+    for row in filas:
+        por_funcion.setdefault(row.id_funcion, []).append(row.id_asiento)
+    for id_funcion, id_asientos in por_funcion.items():
+        publicar_asientos(id_funcion, ESTADO_DISPONIBLE, id_asientos)
+
+
+def _asiento_ocupado(id_funcion):
+    """Condición EXISTS: el asiento tiene una reserva para la función"""
+    return exists().where(
+        ReservaAsiento.id_asiento == Asiento.id_asiento,
+        ReservaAsiento.id_reserva == Reserva.id_reserva,
+        Reserva.id_funcion == id_funcion
+    )
+
+
+def _asiento_retenido(id_funcion, ahora):
+    """Condición EXISTS: el asiento tiene una retención vigente para la función"""
+    return exists().where(
+        RetencionAsiento.id_asiento == Asiento.id_asiento,
+        RetencionAsiento.id_funcion == id_funcion,
+        RetencionAsiento.expira_en > ahora
+    )
+
+
+def asientos_ocupados_stmt(id_funcion, ahora: datetime = None):
+    """
+    Consulta única con los asientos ocupados de una función: los reservados
+    más los que tienen una retención vigente.
+    Solo proyecta las columnas necesarias, sin hidratar objetos ORM.
+    """
+    ahora = ahora or datetime.utcnow()
+    columnas = (Asiento.id_asiento, Asiento.numero, Asiento.id_sala, Asiento.estado)
+    reservados = (
+        select(*columnas)
+        .join(ReservaAsiento, ReservaAsiento.id_asiento == Asiento.id_asiento)
+        .join(Reserva, Reserva.id_reserva == ReservaAsiento.id_reserva)
+        .where(Reserva.id_funcion == id_funcion)
+    )
+    retenidos = (
+        select(*columnas)
+        .join(RetencionAsiento, RetencionAsiento.id_asiento == Asiento.id_asiento)
+        .where(
+            RetencionAsiento.id_funcion == id_funcion,
+            RetencionAsiento.expira_en > ahora
+        )
+    )
+    # UNION (sin ALL) elimina duplicados
+    return union(reservados, retenidos)
+
+
+def mapa_asientos_stmt(id_funcion, ahora: datetime = None):
+    """
+    Consulta única con todos los asientos de la sala de una función y si están
+    ocupados o retenidos.
+
+    Parte de la función con OUTER JOIN para distinguir una función inexistente
+    (cero filas) de una sala sin asientos (una fila con asiento nulo).
+    """
+    return (
+        select(
+            Funcion.id_sala,
+            Sala.filas,
+            Sala.columnas,
+            Asiento.id_asiento,
+            Asiento.numero,
+            Asiento.estado,
+            _asiento_ocupado(id_funcion).label("ocupado"),
+            _asiento_retenido(id_funcion, ahora or datetime.utcnow()).label("retenido")
+        )
+        .select_from(Funcion)
+        .outerjoin(Sala, Sala.id_sala == Funcion.id_sala)
+        .outerjoin(Asiento, Asiento.id_sala == Funcion.id_sala)
+        .where(Funcion.id_funcion == id_funcion)
+    )
+
+
+def asientos_de_reserva_stmt(id_reserva):
+    """
+    Consulta única con los asientos de una reserva.
+    Parte de la reserva con OUTER JOIN para distinguir una reserva inexistente
+    (cero filas) de una reserva sin asientos (una fila con asiento nulo).
+    """
+    return (
+        select(Reserva.id_reserva, Asiento.id_asiento, Asiento.numero, Asiento.estado)
+        .select_from(Reserva)
+        .outerjoin(ReservaAsiento, ReservaAsiento.id_reserva == Reserva.id_reserva)
+        .outerjoin(Asiento, Asiento.id_asiento == ReservaAsiento.id_asiento)
+        .where(Reserva.id_reserva == id_reserva)
+    )
+
+
+def filas_a_asientos_ocupados(rows) -> list:
+    """
+    Convierte las filas de asientos_ocupados_stmt al formato de respuesta.
+    Los UUID quedan como tales: se pasan a texto al serializar.
+    """
+    return [{
+        "id_asiento": row.id_asiento,
+        "numero": row.numero or None,
+        "id_sala": row.id_sala,
+        "estado": row.estado or None
+    } for row in rows]
+
+
+def filas_a_mapa(id_funcion, rows) -> dict:
+    """
+    Convierte las filas de mapa_asientos_stmt al mapa compacto de la función,
+    con los asientos por fila y columna. Devuelve None si la función no existe.
+    """
+    if not rows:
+        return None
+
+    primera = rows[0]
+    asientos = []
+    for row in rows:
+        if row.id_asiento is None:
+            continue
+        if row.ocupado:
+            estado = ESTADO_OCUPADO
+        elif row.retenido:
+            estado = ESTADO_RETENIDO
+        else:
+            estado = ESTADO_DISPONIBLE
+        asientos.append({
+            "id_asiento": row.id_asiento,
+            "numero": row.numero,
+            "estado": estado
+        })
+    # ORDER BY numero compararía texto: A10 quedaría antes que A2
+    asientos.sort(key=lambda asiento: posicion_grilla(asiento["numero"]))
+
+    return {
+        "id_funcion": id_funcion,
+        "id_sala": primera.id_sala,
+        "filas": primera.filas,
+        "columnas": primera.columnas,
+        "total": len(asientos),
+        "ocupados": sum(1 for a in asientos if a["estado"] == ESTADO_OCUPADO),
+        "retenidos": sum(1 for a in asientos if a["estado"] == ESTADO_RETENIDO),
+        "asientos": asientos
+    }
+
+
+def _bloquear_y_verificar(db: Session, id_funcion, ids, id_reserva=None, id_retencion=None, ahora=None) -> tuple:
+    """
+    Bloquea las filas de los asientos (SELECT ... FOR UPDATE, en orden de ID para
+    evitar deadlocks) y calcula los conflictos de cada uno para la función.
+
+    Con los bloqueos tomados, dos transacciones que compiten por el mismo asiento
+    se serializan: la segunda ve la reserva o retención que dejó la primera.
+    Devuelve (asientos_bloqueados_por_id, conflictos).
+    """
+    ahora = ahora or datetime.utcnow()
+
+    # 1. Bloquear los asientos pedidos y comprobar que pertenecen a la sala de la función
+    sala_funcion = select(Funcion.id_sala).where(Funcion.id_funcion == id_funcion).scalar_subquery()
+    bloqueados = db.execute(
+        select(
+            Asiento.id_asiento,
+            Asiento.numero,
+            Asiento.estado,
+            (Asiento.id_sala == sala_funcion).label("en_sala")
+        )
+        .where(Asiento.id_asiento.in_(ids))
+        .order_by(Asiento.id_asiento)
+        .with_for_update(of=Asiento)
+    ).all()
+    asientos = {row.id_asiento: row for row in bloqueados}
+
+    # 2. Asientos ya reservados para esta función
+    ocupados = dict(db.execute(
+        select(ReservaAsiento.id_asiento, ReservaAsiento.id_reserva)
+        .join(Reserva, Reserva.id_reserva == ReservaAsiento.id_reserva)
+        .where(
+            Reserva.id_funcion == id_funcion,
+            ReservaAsiento.id_asiento.in_(ids)
+        )
+    ).all())
+
+    # 3. Retenciones vigentes de otros carritos para esta función
+    retenidos_stmt = select(RetencionAsiento.id_asiento).where(
+        RetencionAsiento.id_funcion == id_funcion,
+        RetencionAsiento.id_asiento.in_(ids),
+        RetencionAsiento.expira_en > ahora
+    )
+    if id_retencion is not None:
+        retenidos_stmt = retenidos_stmt.where(RetencionAsiento.id_retencion != id_retencion)
+    retenidos = set(db.execute(retenidos_stmt).scalars())
+
+    conflictos = []
+    for id_asiento in ids:
+        if id_asiento not in asientos:
+            motivo = CONFLICTO_NO_ENCONTRADO
+        elif not asientos[id_asiento].en_sala:
+            motivo = CONFLICTO_FUERA_DE_SALA
+        elif id_reserva is not None and ocupados.get(id_asiento) == id_reserva:
+            motivo = CONFLICTO_EN_ESTA_RESERVA
+        elif id_asiento in ocupados:
+            motivo = CONFLICTO_OCUPADO
+        elif id_asiento in retenidos:
+            motivo = CONFLICTO_RETENIDO
+        else:
+            continue
+        conflictos.append({"id_asiento": id_asiento, "motivo": motivo})
+
+    return asientos, conflictos
+
+
+def reservas_con_asientos(db: Session, ids) -> set:
+    """IDs de las reservas (entre ids) que tienen algún asiento"""
+    return set(db.execute(
+        select(ReservaAsiento.id_reserva).where(ReservaAsiento.id_reserva.in_(ids)).distinct()
+    ).scalars())
+
+
+def reservar_asientos(db: Session, reserva: Reserva, id_funcion, id_asientos, id_retencion=None) -> tuple:
+    """
+    Reserva varios asientos de una función en una sola transacción.
+
+    Es todo o nada: si algún asiento tiene conflicto no se reserva ninguno.
+    Los asientos retenidos por el mismo carrito (id_retencion) se pueden
+    reservar y su retención se consume. Una reserva sin función queda
+    asociada a id_funcion; si ya tiene otra se lanza ReservaDeOtraFuncion.
+
+    Devuelve (asientos_reservados, conflictos).
+    """
+    ids = sorted(set(id_asientos), key=str)
+    # La función de la reserva se verifica y se fija con la fila bloqueada
+    id_funcion_reserva = db.execute(
+        select(Reserva.id_funcion).where(Reserva.id_reserva == reserva.id_reserva).with_for_update()
+    ).scalar()
+    if id_funcion_reserva is not None and id_funcion_reserva != id_funcion:
+        db.rollback()
+        raise ReservaDeOtraFuncion(str(id_funcion_reserva))
+
+    asientos, conflictos = _bloquear_y_verificar(
+        db, id_funcion, ids, id_reserva=reserva.id_reserva, id_retencion=id_retencion
+    )
+
+    if conflictos:
+        # Liberar los bloqueos sin reservar nada
+        db.rollback()
+        return [], conflictos
+
+    # Inserción multi-fila, consumo de retenciones y commit
+    id_reserva = reserva.id_reserva
+    if id_funcion_reserva is None:
+        # Las consultas de ocupación unen por Reserva.id_funcion: sin ella
+        # los asientos no figurarían como ocupados
+        db.execute(update(Reserva).where(Reserva.id_reserva == id_reserva).values(id_funcion=id_funcion))
+    db.execute(
+        delete(RetencionAsiento).where(
+            RetencionAsiento.id_funcion == id_funcion,
+            RetencionAsiento.id_asiento.in_(ids)
+        )
+    )
+    try:
+        db.execute(
+            insert(ReservaAsiento),
+            [{"id_reserva": id_reserva, "id_asiento": id_asiento, "id_funcion": id_funcion} for id_asiento in ids]
+        )
+        db.commit()
+    except IntegrityError:
+        # UNIQUE (id_funcion, id_asiento): otra escritura sin estos bloqueos
+        # ganó el asiento. Se informan los conflictos como están ahora.
+        db.rollback()
+        _, conflictos = _bloquear_y_verificar(
+            db, id_funcion, ids, id_reserva=id_reserva, id_retencion=id_retencion
+        )
+        db.rollback()
+        return [], conflictos or [{"id_asiento": i, "motivo": CONFLICTO_OCUPADO} for i in ids]
+
+    return [{
+        "id_reserva": id_reserva,
+        "id_asiento": id_asiento,
+        "numero_asiento": asientos[id_asiento].numero,
+        "estado_asiento": asientos[id_asiento].estado
+    } for id_asiento in ids], []
+
+
+def retener_asientos(db: Session, id_funcion, id_asientos, id_retencion=None, id_usuario=None) -> tuple:
+    """
+    Retiene varios asientos de una función durante SEAT_HOLD_TTL_SECONDS.
+
+    Si se indica un id_retencion existente, los asientos se agregan a ese
+    carrito y se renueva el vencimiento de los que ya tenía.
+    Es todo o nada, igual que reservar_asientos.
+
+    Devuelve (id_retencion, expira_en, conflictos).
+    """
+    ids = sorted(set(id_asientos), key=str)
+    id_retencion = id_retencion or uuid.uuid4()
+    ahora = datetime.utcnow()
+    expira_en = ahora + timedelta(seconds=settings.SEAT_HOLD_TTL_SECONDS)
+
+    _, conflictos = _bloquear_y_verificar(db, id_funcion, ids, id_retencion=id_retencion, ahora=ahora)
+
+    if conflictos:
+        db.rollback()
+        return id_retencion, None, conflictos
+
+    # Reemplazar retenciones vencidas o propias de estos asientos por las nuevas
+    db.execute(
+        delete(RetencionAsiento).where(
+            RetencionAsiento.id_funcion == id_funcion,
+            RetencionAsiento.id_asiento.in_(ids)
+        )
+    )
+    db.execute(
+        insert(RetencionAsiento),
+        [{
+            "id_funcion": id_funcion,
+            "id_asiento": id_asiento,
+            "id_retencion": id_retencion,
+            "id_usuario": id_usuario,
+            "expira_en": expira_en
+        } for id_asiento in ids]
+    )
+    # Renovar también el resto del carrito
+    db.execute(
+        update(RetencionAsiento)
+        .where(RetencionAsiento.id_retencion == id_retencion)
+        .values(expira_en=expira_en)
+    )
+    db.commit()
+
+    return id_retencion, expira_en, []
+
+
+def liberar_retencion(db: Session, id_retencion) -> list:
+    """Libera todos los asientos de un carrito. Devuelve las filas (id_funcion, id_asiento) liberadas"""
+    liberados = db.execute(
+        delete(RetencionAsiento)
+        .where(RetencionAsiento.id_retencion == id_retencion)
+        .returning(RetencionAsiento.id_funcion, RetencionAsiento.id_asiento)
+    ).all()
+    db.commit()
+    return liberados
+
+
+def liberar_retenciones_expiradas(db: Session) -> list:
+    """Borra en bloque todas las retenciones vencidas. Devuelve las filas (id_funcion, id_asiento) borradas"""
+    liberados = db.execute(
+        delete(RetencionAsiento)
+        .where(RetencionAsiento.expira_en <= datetime.utcnow())
+        .returning(RetencionAsiento.id_funcion, RetencionAsiento.id_asiento)
+    ).all()
+    db.commit()
+    return liberados
@@ -0,0 +1,138 @@
+"""
+Hash de contraseñas.
+
+El esquema y su costo salen de Settings (PASSWORD_HASH_SCHEME,
+PASSWORD_HASH_ROUNDS). Los hashes con otro esquema u otro costo, y las
+contraseñas que quedaron en texto plano, se marcan como obsoletos y se
+vuelven a hashear en el siguiente login correcto.
+
+El hash es CPU intensivo (~100+ ms con bcrypt 12), así que las versiones
+async lo ejecutan en un pool propio de PASSWORD_HASH_WORKERS hilos: un pico
+de logins no ocupa el threadpool con el que se atienden los demás requests.
+
+Un login con un correo que no existe verifica igual contra un hash fijo
+(verificar_ficticio): si respondiera sin hashear, el tiempo de respuesta
+revelaría qué cuentas existen.
+"""
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from app.config import settings
+
+# Límite de bcrypt: ignora lo que pase de 72 bytes
+BCRYPT_MAX_BYTES = 72
+
+
+def crear_contexto(esquema: str = None, rounds: Optional[int] = None) -> CryptContext:
+    """
+    CryptContext con el esquema configurado como principal.
+    "plaintext" queda solo para verificar contraseñas viejas y marcarlas
+    para rehash. Con rounds fijo, los hashes con otro costo también se
+    consideran obsoletos.
+    """
+    esquema = esquema or settings.PASSWORD_HASH_SCHEME
+    rounds = settings.PASSWORD_HASH_ROUNDS if rounds is None else rounds
+    opciones = {}
+    if rounds:
+        opciones = {
+            f"{esquema}__default_rounds": rounds,
+            f"{esquema}__min_rounds": rounds,
+            f"{esquema}__max_rounds": rounds,
+        }
+    return CryptContext(
+        schemes=[esquema, "plaintext"],
+        default=esquema,
+        deprecated=["plaintext"],
+        **opciones
+    )
+
+
+pwd_context = crear_contexto()
+
+# Pool acotado para el hash, separado del threadpool de los requests
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+
+def _preparar(password: str, esquema: Optional[str]) -> str:
+    """Con bcrypt, las contraseñas de más de 72 bytes se reducen antes con SHA-256"""
+    if esquema == "bcrypt":
+        password_bytes = password.encode("utf-8")
+        if len(password_bytes) > BCRYPT_MAX_BYTES:
+            return hashlib.sha256(password_bytes).hexdigest()
+    return password
+
+
+def get_password_hash(password: str, contexto: CryptContext = None) -> str:
+    """Genera el hash de una contraseña con el esquema configurado"""
+    if not password or not isinstance(password, str):
+        raise ValueError("Password must be a non-empty string")
+
+    contexto = contexto or pwd_context
+    return contexto.hash(_preparar(password, contexto.default_scheme()))
+
+
+def verify_and_update(
+    plain_password: str,
+    hashed_password: str,
+    contexto: CryptContext = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica una contraseña. Devuelve (válida, nuevo_hash); nuevo_hash no es
+    None cuando el hash guardado está obsoleto y hay que reemplazarlo.
+    """
+    if not plain_password or not isinstance(plain_password, str) or not hashed_password:
+        return False, None
+
+    contexto = contexto or pwd_context
+    try:
+        esquema = contexto.identify(hashed_password)
+        valida = contexto.verify(_preparar(plain_password, esquema), hashed_password)
+    except (ValueError, TypeError):
+        # Hash corrupto o de un esquema desconocido
+        return False, None
+
+    if not valida:
+        return False, None
+    if contexto.needs_update(hashed_password):
+        return True, get_password_hash(plain_password, contexto)
+    return True, None
+
+
+@lru_cache(maxsize=1)
+def _hash_ficticio() -> str:
+    """Hash fijo con el esquema y costo actuales (se genera una vez, al primer uso)"""
+    return get_password_hash("contraseña-ficticia")
+
+
+def verificar_ficticio(plain_password: str):
+    """Verifica contra el hash fijo para tardar lo mismo que con una cuenta real"""
+    verify_and_update(plain_password or "-", _hash_ficticio())
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica una contraseña contra el hash guardado"""
+    return verify_and_update(plain_password, hashed_password)[0]
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash en el pool de hash"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update en el pool de hash"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_and_update, plain_password, hashed_password)
+
+
+async def verificar_ficticio_async(plain_password: str):
+    """verificar_ficticio en el pool de hash"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_hash_executor, verificar_ficticio, plain_password)
@@ -0,0 +1,186 @@
+"""
+Reportes agregados en SQL (GROUP BY) en lugar de traer tablas completas.
+
+Películas, funciones, ocupación, ingresos y métodos de pago se leen de los
+resúmenes diarios (app.services.resumenes_service), así que reflejan los
+datos hasta su última actualización. Las estadísticas por usuario se
+calculan sobre las reservas.
+
+Rango de fechas de cada reporte (desde/hasta inclusivos, por día):
+- películas, funciones y usuarios: fecha de la reserva (fecha_reserva)
+- ingresos y métodos de pago: fecha de emisión de la factura
+- ocupación de salas: fecha de la función (fecha_hora)
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, func, cast, Date
+from sqlalchemy.orm import Session
+from app.models import (
+    Pelicula, Sala, Funcion, Asiento, Reserva, Usuario,
+    ResumenVentaDiaria, ResumenFacturacionDiaria
+)
+
+# Unidad de date_trunc (PostgreSQL) de cada período
+_PERIODOS_POSTGRES = {"dia": "day", "semana": "week", "mes": "month"}
+
+
+def en_rango(columna, desde: Optional[date], hasta: Optional[date]) -> list:
+    """Condiciones desde <= columna < hasta + 1 día"""
+    condiciones = []
+    if desde is not None:
+        condiciones.append(columna >= desde)
+    if hasta is not None:
+        condiciones.append(columna < hasta + timedelta(days=1))
+    return condiciones
+
+
+def truncar_fecha(columna, periodo: str, dialecto: str):
+    """Inicio del día, semana (lunes) o mes de una fecha, según el motor"""
+    if dialecto == "postgresql":
+        return cast(func.date_trunc(_PERIODOS_POSTGRES[periodo], columna), Date)
+    if periodo == "dia":
+        return func.date(columna)
+    if periodo == "semana":
+        # weekday 0 avanza al domingo siguiente (o se queda); -6 días da el lunes
+        return func.date(columna, "weekday 0", "-6 days")
+    return func.date(columna, "start of month")
+
+
+def peliculas_mas_vistas(db: Session, desde=None, hasta=None, limite: int = 10) -> list:
+    vendidos = func.sum(ResumenVentaDiaria.asientos)
+    reservas = func.sum(ResumenVentaDiaria.reservas)
+    stmt = (
+        select(
+            Pelicula.id_pelicula,
+            Pelicula.titulo,
+            reservas.label("reservas"),
+            vendidos.label("asientos_vendidos"),
+            func.sum(ResumenVentaDiaria.ingresos).label("ingresos")
+        )
+        .join(ResumenVentaDiaria, ResumenVentaDiaria.id_pelicula == Pelicula.id_pelicula)
+        .where(*en_rango(ResumenVentaDiaria.dia, desde, hasta))
+        .group_by(Pelicula.id_pelicula, Pelicula.titulo)
+        .order_by(vendidos.desc(), reservas.desc())
+        .limit(limite)
+    )
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def ingresos_por_periodo(db: Session, periodo: str = "dia", desde=None, hasta=None) -> list:
+    inicio = truncar_fecha(ResumenFacturacionDiaria.dia, periodo, db.get_bind().dialect.name).label("periodo")
+    stmt = (
+        select(
+            inicio,
+            func.sum(ResumenFacturacionDiaria.facturas).label("facturas"),
+            func.sum(ResumenFacturacionDiaria.ingresos).label("ingresos")
+        )
+        .where(*en_rango(ResumenFacturacionDiaria.dia, desde, hasta))
+        .group_by(inicio)
+        .order_by(inicio)
+    )
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def ocupacion_salas(db: Session, desde=None, hasta=None) -> list:
+    asientos_sala = (
+        select(Asiento.id_sala, func.count().label("asientos"))
+        .group_by(Asiento.id_sala)
+        .subquery()
+    )
+    vendidos_funcion = (
+        select(ResumenVentaDiaria.id_funcion, func.sum(ResumenVentaDiaria.asientos).label("vendidos"))
+        .join(Funcion, Funcion.id_funcion == ResumenVentaDiaria.id_funcion)
+        .where(*en_rango(Funcion.fecha_hora, desde, hasta))
+        .group_by(ResumenVentaDiaria.id_funcion)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Sala.id_sala,
+            Sala.nombre,
+            func.count(Funcion.id_funcion).label("funciones"),
+            func.coalesce(asientos_sala.c.asientos, 0).label("asientos_por_funcion"),
+            func.coalesce(func.sum(vendidos_funcion.c.vendidos), 0).label("asientos_vendidos")
+        )
+        .join(Funcion, Funcion.id_sala == Sala.id_sala)
+        .outerjoin(asientos_sala, asientos_sala.c.id_sala == Sala.id_sala)
+        .outerjoin(vendidos_funcion, vendidos_funcion.c.id_funcion == Funcion.id_funcion)
+        .where(*en_rango(Funcion.fecha_hora, desde, hasta))
+        .group_by(Sala.id_sala, Sala.nombre, asientos_sala.c.asientos)
+        .order_by(Sala.nombre)
+    )
+    return [_con_ocupacion(dict(row._mapping)) for row in db.execute(stmt)]
+
+
+def _con_ocupacion(fila: dict) -> dict:
+    capacidad = fila["asientos_por_funcion"] * fila["funciones"]
+    fila["ocupacion"] = round(fila["asientos_vendidos"] / capacidad, 4) if capacidad else 0.0
+    return fila
+
+
+def funciones_mas_vendidas(db: Session, desde=None, hasta=None, limite: int = 10) -> list:
+    vendidos = func.sum(ResumenVentaDiaria.asientos)
+    reservas = func.sum(ResumenVentaDiaria.reservas)
+    stmt = (
+        select(
+            Funcion.id_funcion,
+            Funcion.fecha_hora,
+            Funcion.id_pelicula,
+            Pelicula.titulo,
+            Funcion.id_sala,
+            reservas.label("reservas"),
+            vendidos.label("asientos_vendidos"),
+            func.sum(ResumenVentaDiaria.ingresos).label("ingresos")
+        )
+        .join(ResumenVentaDiaria, ResumenVentaDiaria.id_funcion == Funcion.id_funcion)
+        .outerjoin(Pelicula, Pelicula.id_pelicula == Funcion.id_pelicula)
+        .where(*en_rango(ResumenVentaDiaria.dia, desde, hasta))
+        .group_by(Funcion.id_funcion, Funcion.fecha_hora, Funcion.id_pelicula, Pelicula.titulo, Funcion.id_sala)
+        .order_by(vendidos.desc(), reservas.desc())
+        .limit(limite)
+    )
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def estadisticas_usuarios(db: Session, desde=None, hasta=None, limite: int = 10) -> list:
+    gasto = func.coalesce(func.sum(Reserva.total), 0)
+    stmt = (
+        select(
+            Usuario.id_usuario,
+            Usuario.nombre,
+            func.count(Reserva.id_reserva).label("reservas"),
+            gasto.label("gasto_total"),
+            func.coalesce(func.avg(Reserva.total), 0).label("gasto_promedio")
+        )
+        .join(Reserva, Reserva.id_usuario == Usuario.id_usuario)
+        .where(*en_rango(Reserva.fecha_reserva, desde, hasta))
+        .group_by(Usuario.id_usuario, Usuario.nombre)
+        .order_by(gasto.desc())
+        .limit(limite)
+    )
+    return [
+        dict(row._mapping, gasto_promedio=Decimal(row.gasto_promedio).quantize(Decimal("0.01")))
+        for row in db.execute(stmt)
+    ]
+
+
+def metodos_pago(db: Session, desde=None, hasta=None) -> list:
+    facturas = func.sum(ResumenFacturacionDiaria.facturas)
+    stmt = (
+        select(
+            ResumenFacturacionDiaria.metodo_pago,
+            facturas.label("facturas"),
+            func.sum(ResumenFacturacionDiaria.ingresos).label("ingresos")
+        )
+        .where(*en_rango(ResumenFacturacionDiaria.dia, desde, hasta))
+        .group_by(ResumenFacturacionDiaria.metodo_pago)
+        .order_by(facturas.desc())
+    )
+    filas = [dict(row._mapping) for row in db.execute(stmt)]
+    total = sum(fila["facturas"] for fila in filas)
+    for fila in filas:
+        # En el resumen, '' representa las facturas sin método de pago
+        fila["metodo_pago"] = fila["metodo_pago"] or None
+        fila["porcentaje"] = round(fila["facturas"] / total, 4) if total else 0.0
+    return filas
@@ -0,0 +1,176 @@
+"""
+Resúmenes diarios (rollups) de ventas y facturación para los reportes.
+
+- resumen_venta_diaria: reservas, asientos e ingresos por día de reserva y
+  función (con película y sala desnormalizadas).
+- resumen_facturacion_diaria: facturas e ingresos por día de emisión y
+  método de pago.
+
+La actualización es incremental: cada resumen guarda en marca_resumen la
+fecha de origen más reciente que ya agregó, sin pasar de la fecha actual.
+Al actualizar se borran y se recalculan los días desde esa marca menos
+RESUMENES_DIAS_REVISION, así que solo se leen las filas recientes (hay
+índices por fecha). Los cambios a filas más viejas que esa ventana
+necesitan una reconstrucción completa.
+
+Cada actualización informa si el contenido de la ventana cambió, para que
+solo entonces se invaliden los reportes. Con varios workers, el que llega
+poco después de otro (minimo_entre) no vuelve a recalcular.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import (
+    Funcion, Reserva, ReservaAsiento, Factura,
+    ResumenVentaDiaria, ResumenFacturacionDiaria, MarcaResumen
+)
+from app.services.reportes_service import truncar_fecha
+
+VENTAS = "ventas"
+FACTURACION = "facturacion"
+
+
+# INSERT ... ON CONFLICT DO NOTHING según el dialecto
+_INSERT_SIN_CONFLICTO = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _bloquear_marca(db: Session, nombre: str) -> MarcaResumen:
+    """
+    Toma la marca del resumen con FOR UPDATE: dos procesos no lo actualizan a
+    la vez. En una base nueva la fila no existe y FOR UPDATE no bloquearía
+    nada, así que primero se crea sin fallar si otro proceso ya la creó.
+    """
+    insertar = _INSERT_SIN_CONFLICTO[db.get_bind().dialect.name]
+    db.execute(
+        insertar(MarcaResumen).values(nombre=nombre).on_conflict_do_nothing(index_elements=["nombre"])
+    )
+    return db.execute(
+        select(MarcaResumen).where(MarcaResumen.nombre == nombre).with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def _contenido(db: Session, tabla, desde: Optional[date]) -> set:
+    """Filas del resumen desde el día dado (la ventana que se recalcula)"""
+    consulta = select(*tabla.__table__.columns)
+    if desde:
+        consulta = consulta.where(tabla.dia >= desde)
+    return set(db.execute(consulta).all())
+
+
+def _dia_inicial(marca: MarcaResumen, completo: bool, ahora: datetime) -> Optional[date]:
+    """Primer día a recalcular; None recalcula todo"""
+    if completo or marca.hasta is None:
+        return None
+    # Una marca guardada en el futuro (antes de acotarla) no puede saltear hoy
+    return min(marca.hasta, ahora).date() - timedelta(days=settings.RESUMENES_DIAS_REVISION)
+
+
+def _actualizar_ventas(db: Session, desde: Optional[date]) -> int:
+    """Recalcula resumen_venta_diaria desde el día dado; devuelve las filas escritas"""
+    dia = truncar_fecha(Reserva.fecha_reserva, "dia", db.get_bind().dialect.name)
+    filtro = [Reserva.fecha_reserva >= datetime.combine(desde, time.min)] if desde else []
+
+    asientos = (
+        select(ReservaAsiento.id_reserva, func.count().label("asientos"))
+        .join(Reserva, Reserva.id_reserva == ReservaAsiento.id_reserva)
+        .where(*filtro)
+        .group_by(ReservaAsiento.id_reserva)
+        .subquery()
+    )
+    origen = (
+        select(
+            dia,
+            Reserva.id_funcion,
+            Funcion.id_pelicula,
+            Funcion.id_sala,
+            func.count(Reserva.id_reserva),
+            func.coalesce(func.sum(asientos.c.asientos), 0),
+            func.coalesce(func.sum(Reserva.total), 0)
+        )
+        .join(Funcion, Funcion.id_funcion == Reserva.id_funcion)
+        .outerjoin(asientos, asientos.c.id_reserva == Reserva.id_reserva)
+        .where(*filtro)
+        .group_by(dia, Reserva.id_funcion, Funcion.id_pelicula, Funcion.id_sala)
+    )
+
+    borrar = delete(ResumenVentaDiaria)
+    if desde:
+        borrar = borrar.where(ResumenVentaDiaria.dia >= desde)
+    db.execute(borrar)
+    return db.execute(
+        insert(ResumenVentaDiaria).from_select(
+            ["dia", "id_funcion", "id_pelicula", "id_sala", "reservas", "asientos", "ingresos"],
+            origen
+        )
+    ).rowcount
+
+
+def _actualizar_facturacion(db: Session, desde: Optional[date]) -> int:
+    """Recalcula resumen_facturacion_diaria desde el día dado; devuelve las filas escritas"""
+    dia = truncar_fecha(Factura.fecha_emision, "dia", db.get_bind().dialect.name)
+    metodo = func.coalesce(Factura.metodo_pago, "")
+    origen = (
+        select(dia, metodo, func.count(Factura.id_factura), func.coalesce(func.sum(Factura.total), 0))
+        .group_by(dia, metodo)
+    )
+    if desde:
+        origen = origen.where(Factura.fecha_emision >= datetime.combine(desde, time.min))
+
+    borrar = delete(ResumenFacturacionDiaria)
+    if desde:
+        borrar = borrar.where(ResumenFacturacionDiaria.dia >= desde)
+    db.execute(borrar)
+    return db.execute(
+        insert(ResumenFacturacionDiaria).from_select(
+            ["dia", "metodo_pago", "facturas", "ingresos"],
+            origen
+        )
+    ).rowcount
+
+
+# Resumen -> (función que lo recalcula, tabla del resumen, columna de fecha de origen)
+_RESUMENES = {
+    VENTAS: (_actualizar_ventas, ResumenVentaDiaria, Reserva.fecha_reserva),
+    FACTURACION: (_actualizar_facturacion, ResumenFacturacionDiaria, Factura.fecha_emision),
+}
+
+
+def actualizar_resumenes(db: Session, completo: bool = False, minimo_entre: Optional[timedelta] = None) -> dict:
+    """
+    Actualiza los resúmenes desde su marca de agua (o completos).
+    Cada resumen se confirma en su propia transacción. Con minimo_entre, un
+    resumen actualizado hace menos de ese tiempo (por otro worker) se omite.
+
+    Devuelve, por resumen, el día desde el que se recalculó, las filas
+    escritas y si el contenido cambió; los omitidos no figuran.
+    """
+    resultado = {}
+    for nombre, (actualizar, tabla, columna_fecha) in _RESUMENES.items():
+        marca = _bloquear_marca(db, nombre)
+        ahora = datetime.utcnow()
+        if (
+            not completo and minimo_entre is not None and marca.actualizado_en is not None
+            and ahora - marca.actualizado_en < minimo_entre
+        ):
+            db.commit()
+            continue
+        desde = _dia_inicial(marca, completo, ahora)
+        # La nueva marca se lee antes de agregar: lo que llegue durante la
+        # actualización queda dentro de la ventana de la próxima. Las fechas
+        # las envía el cliente, así que se ignoran las futuras: una sola fila
+        # adelantada correría la marca y dejaría fuera las ventas de hoy
+        hasta = db.execute(select(func.max(columna_fecha)).where(columna_fecha <= ahora)).scalar()
+
+        # La reconstrucción completa no compara: se da por cambiada
+        anterior = None if completo else _contenido(db, tabla, desde)
+        filas = actualizar(db, desde)
+        cambios = completo or _contenido(db, tabla, desde) != anterior
+        marca.hasta = hasta or marca.hasta
+        marca.actualizado_en = datetime.utcnow()
+        db.commit()
+        resultado[nombre] = {"desde": desde, "filas": filas, "cambios": cambios}
+    return resultado
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from datetime import timedelta
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.services.ocupacion_service import liberar_retenciones_expiradas, publicar_liberados
+from app.services.resumenes_service import actualizar_resumenes
+from app.utils.cambios import notificar_cambio
+
+logger = logging.getLogger(__name__)
+
+
+def _barrer_retenciones() -> list:
+    """Ejecuta un barrido de retenciones vencidas con su propia sesión"""
+    db = SessionLocal()
+    try:
+        return liberar_retenciones_expiradas(db)
+    finally:
+        db.close()
+
+
+async def barrer_retenciones_periodicamente():
+    """
+    Tarea de fondo que libera en bloque las retenciones de asientos vencidas
+    cada SEAT_HOLD_SWEEP_INTERVAL_SECONDS.
+
+    Las consultas de ocupación ya ignoran las retenciones vencidas; el barrido
+    solo evita que la tabla crezca con filas muertas.
+    """
+    while True:
+        await asyncio.sleep(settings.SEAT_HOLD_SWEEP_INTERVAL_SECONDS)
+        try:
+            liberadas = await run_in_threadpool(_barrer_retenciones)
+            if liberadas:
+                notificar_cambio("retencion_asiento")
+                publicar_liberados(liberadas)
+                logger.info(f"[RETENCIONES] {len(liberadas)} retenciones vencidas liberadas")
+        except Exception as e:
+            logger.error(f"[RETENCIONES] Error en el barrido: {str(e)}")
+
+
+def _actualizar_resumenes() -> dict:
+    """Actualiza los resúmenes diarios con su propia sesión"""
+    db = SessionLocal()
+    try:
+        # Si otro worker acaba de actualizar, este ciclo no repite el trabajo
+        return actualizar_resumenes(db, minimo_entre=timedelta(seconds=settings.RESUMENES_INTERVALO_SECONDS / 2))
+    finally:
+        db.close()
+
+
+async def actualizar_resumenes_periodicamente():
+    """
+    Tarea de fondo que actualiza los resúmenes diarios de los reportes desde
+    su marca de agua: al arrancar y luego cada RESUMENES_INTERVALO_SECONDS.
+
+    Solo se avisa el cambio (y se vacía el cache de reportes) si algún
+    resumen quedó distinto.
+    """
+    while True:
+        try:
+            resultado = await run_in_threadpool(_actualizar_resumenes)
+            if any(r["cambios"] for r in resultado.values()):
+                notificar_cambio("resumen")
+                logger.info(f"[RESUMENES] Actualizados: {resultado}")
+        except Exception as e:
+            logger.error(f"[RESUMENES] Error al actualizar: {str(e)}")
+        await asyncio.sleep(settings.RESUMENES_INTERVALO_SECONDS)
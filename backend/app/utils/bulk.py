@@ -0,0 +1,181 @@
+"""
+Endpoints de escritura en lote para los routers CRUD.
+
+agregar_rutas_lote() agrega a un router:
+- POST   /<recurso>/lote           crea varias filas (INSERT multi-fila con RETURNING)
+- PATCH  /<recurso>/lote           actualiza varias filas por clave primaria
+- POST   /<recurso>/lote/eliminar  elimina varias filas por clave primaria
+
+Cada lote se valida completo en una pasada con TypeAdapter(List[...]); si
+algún item no es válido no se escribe nada y se devuelven los errores
+agrupados por índice. Todo el lote va en una sola transacción.
+"""
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
+from sqlalchemy import insert, update, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_db
+from app.utils.cambios import notificar_cambio
+
+
+class EliminacionLote(BaseModel):
+    ids: List[UUID]
+
+
+class EliminacionLoteResponse(BaseModel):
+    eliminados: int
+    no_encontrados: List[UUID] = []
+
+
+def _errores_por_item(error: ValidationError) -> list:
+    """Agrupa los errores de TypeAdapter(List[...]) por índice del item"""
+    por_indice: Dict[int, list] = {}
+    for e in error.errors(include_url=False):
+        indice, *campo = e["loc"]
+        por_indice.setdefault(indice, []).append({
+            "campo": ".".join(str(c) for c in campo) or None,
+            "mensaje": e["msg"],
+            "tipo": e["type"]
+        })
+    return [{"indice": indice, "errores": errores} for indice, errores in sorted(por_indice.items())]
+
+
+def _error_item(indice: int, campo: str, mensaje: str, tipo: str) -> dict:
+    return {"indice": indice, "errores": [{"campo": campo, "mensaje": mensaje, "tipo": tipo}]}
+
+
+def _comprobar_tamano(items: list):
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote no puede tener más de {settings.BULK_MAX_ITEMS} items"
+        )
+
+
+def _validar_lote(adapter: TypeAdapter, items: list) -> list:
+    _comprobar_tamano(items)
+    try:
+        return adapter.validate_python(items)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=_errores_por_item(e))
+
+
+def _ejecutar(db: Session, operacion):
+    """Ejecuta la escritura y convierte las violaciones de integridad en 409"""
+    try:
+        resultado = operacion()
+        db.commit()
+        return resultado
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El lote viola una restricción de la base de datos: {str(e.orig)}"
+        )
+
+
+def agregar_rutas_lote(
+    router: APIRouter,
+    *,
+    recurso: str,
+    model,
+    pk,
+    create_schema,
+    update_schema,
+    response_schema,
+    tabla: str,
+    al_modificar: Optional[Callable[[], None]] = None,
+    validar_cambios: Optional[Callable[[Session, List[dict]], List[tuple]]] = None,
+):
+    """
+    Registra las rutas de lote de un recurso.
+
+    recurso: segmento de la URL ("peliculas"); pk: columna de clave primaria;
+    tabla: nombre usado en notificar_cambio; al_modificar: se llama después
+    de actualizar o eliminar un lote (avisos que dependen de las filas viejas);
+    validar_cambios: recibe los cambios de un PATCH y devuelve los errores
+    como (indice, campo, mensaje, tipo) para reglas que dependen de la base.
+    """
+    crear_adapter = TypeAdapter(List[create_schema])
+    # Para actualizar, cada item lleva además su clave primaria
+    update_item = create_model(
+        f"{update_schema.__name__}Lote",
+        __base__=update_schema,
+        **{pk.key: (UUID, ...)}
+    )
+    actualizar_adapter = TypeAdapter(List[update_item])
+
+    @router.post(
+        f"/{recurso}/lote",
+        response_model=List[response_schema],
+        status_code=status.HTTP_201_CREATED,
+        name=f"crear_{recurso}_lote"
+    )
+    def crear_lote(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+        """Crear varios registros en una sola inserción; se devuelven en el orden enviado"""
+        validados = _validar_lote(crear_adapter, items)
+        if not validados:
+            return []
+
+        # Se convierten antes del commit: después estarían expiradas y cada
+        # una volvería a consultarse al serializar
+        filas = _ejecutar(db, lambda: [response_schema.model_validate(fila) for fila in db.scalars(
+            insert(model).returning(model, sort_by_parameter_order=True),
+            [item.model_dump() for item in validados]
+        )])
+        notificar_cambio(tabla)
+        return filas
+
+    @router.patch(
+        f"/{recurso}/lote",
+        response_model=List[response_schema],
+        name=f"actualizar_{recurso}_lote"
+    )
+    def actualizar_lote(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+        """Actualizar varios registros por clave primaria; solo cambia los campos enviados"""
+        validados = _validar_lote(actualizar_adapter, items)
+        if not validados:
+            return []
+
+        ids = [getattr(item, pk.key) for item in validados]
+        existentes = set(db.execute(select(pk).where(pk.in_(ids))).scalars())
+        errores, vistos = [], set()
+        for indice, id_item in enumerate(ids):
+            if id_item not in existentes:
+                errores.append(_error_item(indice, pk.key, "Registro no encontrado", "no_encontrado"))
+            elif id_item in vistos:
+                errores.append(_error_item(indice, pk.key, "ID repetido en el lote", "repetido"))
+            vistos.add(id_item)
+        # UPDATE por clave primaria con executemany (agrupado por conjunto de campos)
+        cambios = [item.model_dump(exclude_unset=True) | {pk.key: getattr(item, pk.key)} for item in validados]
+        if validar_cambios and not errores:
+            errores = [_error_item(*error) for error in validar_cambios(db, cambios)]
+        if errores:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errores)
+        _ejecutar(db, lambda: db.execute(update(model), cambios))
+        notificar_cambio(tabla)
+        if al_modificar:
+            al_modificar()
+        return db.scalars(select(model).where(pk.in_(ids))).all()
+
+    @router.post(
+        f"/{recurso}/lote/eliminar",
+        response_model=EliminacionLoteResponse,
+        name=f"eliminar_{recurso}_lote"
+    )
+    def eliminar_lote(lote: EliminacionLote, db: Session = Depends(get_db)):
+        """Eliminar varios registros por clave primaria"""
+        _comprobar_tamano(lote.ids)
+        ids = list(dict.fromkeys(lote.ids))
+        existentes = set(db.execute(select(pk).where(pk.in_(ids))).scalars())
+
+        eliminados = _ejecutar(db, lambda: db.execute(delete(model).where(pk.in_(ids))).rowcount)
+        if eliminados:
+            notificar_cambio(tabla)
+            if al_modificar:
+                al_modificar()
+        return {"eliminados": eliminados, "no_encontrados": [i for i in ids if i not in existentes]}
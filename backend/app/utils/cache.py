@@ -0,0 +1,178 @@
+"""
+Cache en proceso con vencimiento (TTL) y desalojo LRU.
+
+Se usa para lecturas del catálogo que cambian pocas veces al día; los
+handlers de escritura invalidan por espacio de nombres a través de
+app.utils.cambios.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Tuple
+from app.config import settings
+from app.utils.cambios import suscribir, TODAS
+from app.utils.metrics import Counter, Gauge
+
+CACHE_HITS = Counter("cache_hits_total", "Lecturas resueltas desde cache", ("cache",))
+CACHE_MISSES = Counter("cache_misses_total", "Lecturas que no estaban en cache", ("cache",))
+CACHE_EVICTIONS = Counter("cache_evictions_total", "Entradas desalojadas por LRU", ("cache",))
+CACHE_INVALIDATIONS = Counter("cache_invalidations_total", "Entradas invalidadas por escrituras", ("cache",))
+CACHE_ENTRIES = Gauge("cache_entries", "Entradas guardadas", ("cache",))
+
+
+class TTLCache:
+    """
+    Cache clave -> valor con TTL y tamaño máximo (LRU).
+    Las claves son tuplas cuyo primer elemento es el espacio de nombres
+    (por ejemplo ("peliculas", skip, limit)) para poder invalidar en grupo.
+
+    Cada invalidación sube una generación (global o del espacio de nombres).
+    Un valor calculado antes de una invalidación no se guarda: si una
+    escritura invalida mientras loader() lee, el resultado ya es viejo.
+    """
+
+    def __init__(self, nombre: str, maxsize: int, ttl: float, enabled: bool = True):
+        self.nombre = nombre
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        # clear/invalidate_where suben la global; invalidate_prefix la de su espacio
+        self._generacion = 0
+        self._generaciones: Dict[str, int] = {}
+        CACHE_ENTRIES.set_function(lambda: len(self._data), cache=nombre)
+
+    def get(self, key: Hashable, default=None):
+        if not self.enabled:
+            return default
+        ahora = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > ahora:
+                self._data.move_to_end(key)
+                CACHE_HITS.inc(cache=self.nombre)
+                return item[1]
+            if item is not None:
+                del self._data[key]
+        CACHE_MISSES.inc(cache=self.nombre)
+        return default
+
+    @staticmethod
+    def _namespace(key: Hashable):
+        return key[0] if isinstance(key, tuple) and key else None
+
+    def generacion(self, key: Hashable) -> tuple:
+        """Generación vigente para key; se toma antes de calcular el valor"""
+        with self._lock:
+            return (self._generacion, self._generaciones.get(self._namespace(key), 0))
+
+    def set(self, key: Hashable, value: Any, ttl: float = None, generacion: tuple = None):
+        """
+        Guarda value. Con generacion (la de generacion() antes de calcularlo),
+        no lo guarda si hubo una invalidación en el medio.
+        """
+        if not self.enabled:
+            return
+        expira = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            actual = (self._generacion, self._generaciones.get(self._namespace(key), 0))
+            if generacion is not None and generacion != actual:
+                return
+            self._data[key] = (expira, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                CACHE_EVICTIONS.inc(cache=self.nombre)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: float = None):
+        """Devuelve el valor en cache o lo calcula con loader() y lo guarda"""
+        _faltante = object()
+        value = self.get(key, _faltante)
+        if value is _faltante:
+            generacion = self.generacion(key)
+            value = loader()
+            self.set(key, value, ttl, generacion)
+        return value
+
+    def invalidate_prefix(self, namespace: str) -> int:
+        """Invalida todas las claves de un espacio de nombres"""
+        with self._lock:
+            self._generaciones[namespace] = self._generaciones.get(namespace, 0) + 1
+            keys = [k for k in self._data if isinstance(k, tuple) and k and k[0] == namespace]
+            for key in keys:
+                del self._data[key]
+        if keys:
+            CACHE_INVALIDATIONS.inc(len(keys), cache=self.nombre)
+        return len(keys)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Invalida las entradas cuyo valor cumple predicate"""
+        with self._lock:
+            self._generacion += 1
+            keys = [k for k, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        if keys:
+            CACHE_INVALIDATIONS.inc(len(keys), cache=self.nombre)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generacion += 1
+            cantidad = len(self._data)
+            self._data.clear()
+        if cantidad:
+            CACHE_INVALIDATIONS.inc(cantidad, cache=self.nombre)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": CACHE_HITS.value(cache=self.nombre),
+            "misses": CACHE_MISSES.value(cache=self.nombre),
+            "evictions": CACHE_EVICTIONS.value(cache=self.nombre),
+            "invalidations": CACHE_INVALIDATIONS.value(cache=self.nombre)
+        }
+
+
+# Cache del catálogo: películas, salas y funciones
+catalog_cache = TTLCache(
+    "catalogo",
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED
+)
+
+# Cache de los reportes agregados; solo vence por TTL porque las reservas
+# cambian todo el tiempo y un reporte puede atrasarse unos segundos
+reportes_cache = TTLCache(
+    "reportes",
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.REPORTES_CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED and settings.REPORTES_CACHE_TTL_SECONDS > 0
+)
+
+# Los reportes leen los resúmenes diarios: al actualizarse se descartan
+suscribir("resumen", lambda tabla, id=None, datos=None: reportes_cache.clear())
+
+# Tabla modificada -> espacio de nombres del cache que deja obsoleto
+_NAMESPACES_POR_TABLA = {
+    "pelicula": "peliculas",
+    "sala": "salas",
+    "funcion": "funciones",
+}
+
+
+def _invalidar_catalogo(tabla: str, id=None, datos=None):
+    if tabla == TODAS:
+        catalog_cache.clear()
+        return
+    namespace = _NAMESPACES_POR_TABLA.get(tabla)
+    if namespace:
+        catalog_cache.invalidate_prefix(namespace)
+
+
+for _tabla in _NAMESPACES_POR_TABLA:
+    suscribir(_tabla, _invalidar_catalogo)
@@ -0,0 +1,81 @@
+"""
+Aviso de cambios en las tablas.
+
+Los handlers de escritura llaman a notificar_cambio() después del commit y
+los componentes que guardan estado derivado (caches, versiones, mapas en
+vivo) se suscriben con suscribir() para invalidarlo.
+
+Con varios procesos, el feed de cambios (app.utils.feed_cambios) registra un
+emisor que reenvía cada aviso a los demás procesos, y estos lo entregan a sus
+suscriptores con despachar().
+"""
+import logging
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tabla comodín: al suscribirse recibe los cambios de todas las tablas; al
+# despacharse significa "pudo cambiar cualquier cosa" y llega a todos
+TODAS = "*"
+
+# Suscriptor: callback(tabla, id, datos) ; datos es opcional y depende de la tabla
+Suscriptor = Callable[[str, Optional[str], Any], None]
+# Emisor: reenvía el aviso fuera del proceso
+Emisor = Callable[[str, Optional[str], Any], None]
+
+_suscriptores: Dict[str, List[Suscriptor]] = {}
+_emisores: List[Emisor] = []
+_lock = Lock()
+
+
+def suscribir(tabla: str, callback: Suscriptor):
+    """Registra un callback para los cambios de una tabla ("*" para todas)"""
+    with _lock:
+        _suscriptores.setdefault(tabla, []).append(callback)
+
+
+def registrar_emisor(emisor: Emisor):
+    """Registra un emisor que recibe cada cambio notificado en este proceso"""
+    with _lock:
+        _emisores.append(emisor)
+
+
+def quitar_emisor(emisor: Emisor):
+    with _lock:
+        if emisor in _emisores:
+            _emisores.remove(emisor)
+
+
+def despachar(tabla: str, id: Optional[str] = None, datos: Any = None):
+    """Entrega un cambio a los suscriptores de este proceso, sin reenviarlo"""
+    with _lock:
+        if tabla == TODAS:
+            # Cada suscriptor una sola vez, aunque esté en varias tablas
+            callbacks = list(dict.fromkeys(cb for cbs in _suscriptores.values() for cb in cbs))
+        else:
+            callbacks = list(_suscriptores.get(tabla, ())) + list(_suscriptores.get(TODAS, ()))
+    
+    for callback in callbacks:
+        try:
+            callback(tabla, id, datos)
+        except Exception as e:
+            # Un suscriptor con error no debe romper la escritura que ya se confirmó
+            logger.error(f"[CAMBIOS] Error en suscriptor de {tabla}: {str(e)}")
+
+
+def notificar_cambio(tabla: str, id: Optional[object] = None, datos: Any = None):
+    """
+    Avisa que una fila (o la tabla entera si id es None) cambió, a los
+    suscriptores de este proceso y a los emisores hacia los demás procesos.
+    """
+    id_str = str(id) if id is not None else None
+    despachar(tabla, id_str, datos)
+    
+    with _lock:
+        emisores = list(_emisores)
+    for emisor in emisores:
+        try:
+            emisor(tabla, id_str, datos)
+        except Exception as e:
+            logger.error(f"[CAMBIOS] Error al reenviar el cambio de {tabla}: {str(e)}")
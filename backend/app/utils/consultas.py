@@ -0,0 +1,38 @@
+"""
+Consultas livianas de solo lectura para las listas.
+
+db.query(Model) construye una instancia ORM por fila, la registra en el
+identity map de la sesión y le prepara el estado de las relaciones, aunque
+la respuesta la serialice y la descarte enseguida. consulta_ligera() pide
+solo las columnas del schema de respuesta: el resultado son tuplas Row que
+no pasan por el identity map, y la consulta no dispara autoflush.
+
+El Query que devuelve admite filter/order_by/offset/limit como cualquier
+otro, así que se pasa tal cual a paginar().
+"""
+from functools import lru_cache
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+
+@lru_cache(maxsize=None)
+def columnas_schema(model, schema) -> tuple:
+    """Columnas del modelo que corresponden a los campos del schema, en su orden"""
+    columnas = inspect(model).columns
+    faltantes = [campo for campo in schema.model_fields if campo not in columnas]
+    if faltantes:
+        raise ValueError(f"{schema.__name__} tiene campos que no son columnas de {model.__name__}: {faltantes}")
+    return tuple(getattr(model, campo) for campo in schema.model_fields)
+
+
+def consulta_ligera(db: Session, model, schema):
+    """Query de solo lectura con las columnas del schema; devuelve filas Row"""
+    return db.query(*columnas_schema(model, schema)).autoflush(False)
+
+
+def filas_a_dicts(filas) -> list:
+    """Filas Row a dicts por nombre de columna (validarlas como dict es más rápido)"""
+    if not filas:
+        return []
+    claves = filas[0]._fields
+    return [dict(zip(claves, fila)) for fila in filas]
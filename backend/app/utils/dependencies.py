@@ -1,7 +1,8 @@
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
+from datetime import date
 
 def validate_uuid(id_value: str, entity_name: str = "recurso") -> UUID:
     """Valida que un string sea un UUID válido"""
@@ -15,10 +16,29 @@ def validate_uuid(id_value: str, entity_name: str = "recurso") -> UUID:
 
 def get_or_404(db: Session, model, id_field, id_value, entity_name: str = "recurso"):
     """Obtiene un registro o lanza 404"""
+    # Los IDs llegan como texto desde la ruta; se comparan como UUID
+    if isinstance(id_value, str):
+        id_value = validate_uuid(id_value, entity_name)
     obj = db.query(model).filter(id_field == id_value).first()
     if not obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"{entity_name.capitalize()} no encontrado"
         )
-    return obj
\ No newline at end of file
+    return obj
+
+class RangoFechas:
+    """Dependencia con un rango de fechas opcional (ambos extremos inclusivos)"""
+
+    def __init__(
+        self,
+        desde: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+        hasta: Optional[date] = Query(None, description="Fecha final (inclusive)")
+    ):
+        if desde and hasta and desde > hasta:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha 'desde' no puede ser posterior a 'hasta'"
+            )
+        self.desde = desde
+        self.hasta = hasta
@@ -0,0 +1,96 @@
+"""
+ETags y GET condicional a partir de un contador de cambios por tabla.
+
+Cada tabla tiene una versión que sube con cada notificar_cambio(). El ETag
+de una respuesta es el identificador del proceso más las versiones de las
+tablas de las que depende, así que calcularlo no toca la base de datos ni
+serializa nada. Si el cliente envía un If-None-Match que coincide, se
+responde 304 antes de ejecutar el handler.
+
+Las versiones son de cada proceso. Con varios workers (WEB_CONCURRENCY > 1)
+solo valen si el feed de cambios reenvía las escrituras de los demás; si no
+está activo no se envían ETags ni se responde 304, porque un worker que no
+vio la escritura confirmaría una copia vieja sin plazo de vencimiento.
+"""
+import uuid
+from threading import Lock
+from typing import Dict, Optional
+from fastapi import HTTPException, Request, Response, status
+from app.config import settings
+from app.utils.cambios import suscribir, TODAS
+
+# Cache-Control por tipo de recurso
+CACHE_CATALOGO = "public, max-age=30, must-revalidate"
+CACHE_PRIVADO = "private, no-cache"
+
+# Identifica a este proceso: las versiones empiezan en 0 en cada arranque.
+# Se renueva cuando pudo haber cambios que no se notificaron (ver TODAS)
+_BOOT_ID = uuid.uuid4().hex[:12]
+_versiones: Dict[str, int] = {}
+_lock = Lock()
+# Lo fija el lifespan según si arrancó el feed de cambios
+_feed_activo = False
+
+
+def _subir_version(tabla: str, id: Optional[str] = None, datos=None):
+    global _BOOT_ID
+    with _lock:
+        if tabla == TODAS:
+            # Ningún ETag entregado hasta ahora vuelve a coincidir
+            _BOOT_ID = uuid.uuid4().hex[:12]
+            return
+        _versiones[tabla] = _versiones.get(tabla, 0) + 1
+
+
+def version_tabla(tabla: str) -> int:
+    return _versiones.get(tabla, 0)
+
+
+def usar_feed(activo: bool):
+    """Indica si el feed de cambios entrega a este proceso las escrituras de los demás"""
+    global _feed_activo
+    _feed_activo = activo
+
+
+def etags_activos() -> bool:
+    """True si las versiones de este proceso reflejan todas las escrituras"""
+    return settings.WEB_CONCURRENCY <= 1 or _feed_activo
+
+
+def calcular_etag(*tablas: str) -> str:
+    versiones = ".".join(str(version_tabla(tabla)) for tabla in tablas)
+    return f'"{_BOOT_ID}-{versiones}"'
+
+
+def _coincide(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = (c.strip() for c in if_none_match.split(","))
+    # Se acepta también la forma débil W/"..." que agregan algunos proxies
+    return any(c == etag or c == f"W/{etag}" for c in candidatos)
+
+
+def condicional(*tablas: str, cache_control: str = CACHE_PRIVADO):
+    """
+    Dependencia para GET de listas y detalles.
+    Agrega ETag y Cache-Control a la respuesta, o corta con 304 si el
+    cliente ya tiene la versión actual.
+    """
+    def dependencia(request: Request, response: Response):
+        if not etags_activos():
+            response.headers["Cache-Control"] = cache_control
+            return
+        etag = calcular_etag(*tablas)
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _coincide(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        response.headers.update(headers)
+    
+    return dependencia
+
+
+# Cualquier escritura notificada sube la versión de su tabla
+suscribir("*", _subir_version)
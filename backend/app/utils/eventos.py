@@ -0,0 +1,108 @@
+"""
+Difusión de eventos en vivo (Server-Sent Events) por canal.
+
+Cada conexión SSE abierta se registra con una cola acotada en el canal que
+escucha (p. ej. los asientos de una función). publicar() serializa el evento
+una sola vez y lo deja en la cola de cada suscriptor desde cualquier hilo:
+los handlers síncronos corren en el threadpool, así que la entrega se agenda
+en el event loop del suscriptor con call_soon_threadsafe.
+
+Si un cliente lento llena su cola, se descartan sus eventos pendientes y
+recibe un "resync" para que el stream vuelva a mandar el estado completo.
+"""
+import asyncio
+import json
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+from app.config import settings
+
+EVENTO_RESYNC = "resync"
+
+
+class Suscripcion:
+    """Cola de eventos (nombre, mensaje SSE ya serializado) de una conexión"""
+
+    def __init__(self, canal: str):
+        self.canal = canal
+        self.loop = asyncio.get_running_loop()
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_MAX_EVENTS)
+
+    def _entregar(self, evento: Tuple[str, str]):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente atrasado: se descarta lo pendiente y se pide el estado completo
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait((EVENTO_RESYNC, formatear(EVENTO_RESYNC, {})))
+
+    async def siguiente(self, timeout: float) -> Optional[Tuple[str, str]]:
+        """Próximo evento, o None si no llegó ninguno en timeout segundos"""
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+_canales: Dict[str, Set[Suscripcion]] = {}
+_lock = Lock()
+
+
+def formatear(evento: str, datos) -> str:
+    """Mensaje SSE con nombre de evento y datos en JSON"""
+    return f"event: {evento}\ndata: {json.dumps(datos, default=str)}\n\n"
+
+
+def suscribir(canal: str) -> Suscripcion:
+    """Registra una conexión en un canal. Debe llamarse desde el event loop"""
+    suscripcion = Suscripcion(canal)
+    with _lock:
+        _canales.setdefault(canal, set()).add(suscripcion)
+    return suscripcion
+
+
+def desuscribir(suscripcion: Suscripcion):
+    """Quita la conexión de su canal (al cerrarse el stream)"""
+    with _lock:
+        suscriptores = _canales.get(suscripcion.canal)
+        if suscriptores is not None:
+            suscriptores.discard(suscripcion)
+            if not suscriptores:
+                del _canales[suscripcion.canal]
+
+
+def publicar(canal: str, evento: str, datos) -> int:
+    """
+    Envía un evento a todas las conexiones del canal. Se puede llamar desde
+    cualquier hilo. Devuelve a cuántas conexiones se envió.
+    """
+    with _lock:
+        suscriptores = list(_canales.get(canal, ()))
+    if not suscriptores:
+        return 0
+
+    # Se serializa una sola vez para todas las conexiones
+    mensaje = (evento, formatear(evento, datos))
+    for suscripcion in suscriptores:
+        try:
+            suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, mensaje)
+        except RuntimeError:
+            # El loop del suscriptor ya se cerró
+            desuscribir(suscripcion)
+    return len(suscriptores)
+
+
+def publicar_todos(evento: str, datos) -> int:
+    """Envía un evento a las conexiones de todos los canales"""
+    with _lock:
+        canales = list(_canales)
+    return sum(publicar(canal, evento, datos) for canal in canales)
+
+
+def estado_eventos() -> dict:
+    """Canales activos y conexiones abiertas, para /health"""
+    with _lock:
+        return {
+            "canales": len(_canales),
+            "conexiones": sum(len(s) for s in _canales.values())
+        }
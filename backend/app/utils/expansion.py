@@ -0,0 +1,119 @@
+"""
+Parámetro expand= de los endpoints de detalle.
+
+Cada endpoint declara las relaciones que se pueden expandir (con sus
+sub-relaciones). Las pedidas se cargan en la misma consulta: las de un solo
+objeto con joinedload (JOIN) y las listas con selectinload (una consulta
+IN por relación), así el número de sentencias depende de las expansiones
+pedidas y no de la cantidad de filas. Las demás relaciones quedan con
+raiseload para que un acceso no previsto falle en vez de disparar N+1.
+"""
+from typing import Dict, Optional
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+
+
+class Expansion:
+    """Relación expandible: atributo del modelo, schema de salida y sub-relaciones"""
+
+    def __init__(self, relacion, schema: type[BaseModel], hijos: Dict[str, "Expansion"] = None):
+        self.relacion = relacion
+        self.schema = schema
+        self.hijos = hijos or {}
+
+    @property
+    def lista(self) -> bool:
+        return self.relacion.property.uselist
+
+
+def parametro_expand(ejemplo: str):
+    """Query param expand= con un ejemplo para la documentación"""
+    return Query(
+        None,
+        description=f"Relaciones a incluir, separadas por coma (p. ej. {ejemplo})"
+    )
+
+
+def parsear_expand(valor: Optional[str], expansiones: Dict[str, Expansion]) -> dict:
+    """
+    Convierte "funcion.pelicula,asientos" en un árbol
+    {"funcion": {"pelicula": {}}, "asientos": {}}. Responde 400 si se pide
+    una relación que no existe.
+    """
+    arbol = {}
+    for ruta in filter(None, (parte.strip() for parte in (valor or "").split(","))):
+        nodo, disponibles = arbol, expansiones
+        for nombre in ruta.split("."):
+            if nombre not in disponibles:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"No se puede expandir '{ruta}'. Opciones: {', '.join(_rutas(expansiones))}"
+                )
+            nodo = nodo.setdefault(nombre, {})
+            disponibles = disponibles[nombre].hijos
+    return arbol
+
+
+def _rutas(expansiones: Dict[str, Expansion], prefijo: str = ""):
+    for nombre, expansion in expansiones.items():
+        yield prefijo + nombre
+        yield from _rutas(expansion.hijos, f"{prefijo}{nombre}.")
+
+
+def opciones_carga(arbol: dict, expansiones: Dict[str, Expansion], padre=None) -> list:
+    """Opciones de carga (joinedload/selectinload) para las relaciones del árbol"""
+    opciones = []
+    for nombre, hijos in arbol.items():
+        expansion = expansiones[nombre]
+        if padre is None:
+            cargador = selectinload if expansion.lista else joinedload
+            opcion = cargador(expansion.relacion)
+        else:
+            cargador = padre.selectinload if expansion.lista else padre.joinedload
+            opcion = cargador(expansion.relacion)
+        opciones.append(opcion)
+        opciones.extend(opciones_carga(hijos, expansion.hijos, opcion))
+    return opciones
+
+
+def serializar(obj, schema: type[BaseModel], arbol: dict, expansiones: Dict[str, Expansion]) -> dict:
+    """Dict del objeto con las relaciones del árbol anidadas"""
+    datos = schema.model_validate(obj).model_dump()
+    for nombre, hijos in arbol.items():
+        expansion = expansiones[nombre]
+        valor = getattr(obj, expansion.relacion.key)
+        if expansion.lista:
+            datos[nombre] = [serializar(v, expansion.schema, hijos, expansion.hijos) for v in valor]
+        else:
+            datos[nombre] = serializar(valor, expansion.schema, hijos, expansion.hijos) if valor is not None else None
+    return datos
+
+
+def detalle_expandido(
+    db: Session,
+    model,
+    id_field,
+    id_value,
+    entity_name: str,
+    schema: type[BaseModel],
+    expansiones: Dict[str, Expansion],
+    expand: Optional[str]
+) -> dict:
+    """
+    Obtiene un registro con las relaciones pedidas en expand=, o lanza 404.
+    Usar con response_model_exclude_unset=True para omitir las no pedidas.
+    """
+    arbol = parsear_expand(expand, expansiones)
+    obj = (
+        db.query(model)
+        .options(*opciones_carga(arbol, expansiones), raiseload("*"))
+        .filter(id_field == id_value)
+        .first()
+    )
+    if not obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{entity_name.capitalize()} no encontrado"
+        )
+    return serializar(obj, schema, arbol, expansiones)
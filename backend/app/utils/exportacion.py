@@ -0,0 +1,88 @@
+"""
+Exportación en streaming (NDJSON o CSV) de consultas grandes.
+
+La consulta se ejecuta con una conexión propia y stream_results/yield_per:
+en PostgreSQL usa un cursor del servidor y en memoria solo hay un lote de
+EXPORT_CHUNK_SIZE filas a la vez, sin objetos ORM ni modelos Pydantic. Cada
+lote se serializa y se envía antes de leer el siguiente.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator
+from uuid import UUID
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.database import motor_lectura
+
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _valor(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (UUID, Decimal)):
+        return str(valor)
+    return valor
+
+
+def _lotes(stmt, engine) -> Iterator[tuple]:
+    """Devuelve (columnas, lotes de filas) leyendo con cursor del servidor"""
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True,
+            yield_per=settings.EXPORT_CHUNK_SIZE
+        ).execute(stmt)
+        columnas = list(result.keys())
+        yield columnas
+        for lote in result.partitions():
+            yield lote
+
+
+def _ndjson(stmt, engine) -> Iterator[bytes]:
+    lotes = _lotes(stmt, engine)
+    columnas = next(lotes)
+    for lote in lotes:
+        yield "".join(
+            json.dumps(dict(zip(columnas, map(_valor, fila))), ensure_ascii=False) + "\n"
+            for fila in lote
+        ).encode("utf-8")
+
+
+def _csv(stmt, engine) -> Iterator[bytes]:
+    lotes = _lotes(stmt, engine)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(next(lotes))
+    for lote in lotes:
+        writer.writerows([_valor(v) for v in fila] for fila in lote)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Encabezado solo, si la consulta no devolvió filas
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def exportar(stmt, formato: str, nombre: str, request: Request = None) -> StreamingResponse:
+    """
+    StreamingResponse con las filas de un select() de columnas.
+    Lee de una réplica si hay (ver motor_lectura), salvo que el cliente del
+    request haya escrito hace poco.
+    """
+    engine = motor_lectura(request)
+    generador = _ndjson(stmt, engine) if formato == "ndjson" else _csv(stmt, engine)
+    return StreamingResponse(
+        generador,
+        media_type=FORMATOS[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="{nombre}.{formato}"',
+            "Cache-Control": "no-store"
+        }
+    )
@@ -0,0 +1,228 @@
+"""
+Feed de cambios entre procesos con LISTEN/NOTIFY de PostgreSQL.
+
+Con varios workers (o varios hosts), cada proceso tiene sus propios caches,
+versiones de ETag y conexiones SSE. El feed reenvía cada notificar_cambio()
+a los demás procesos:
+
+- Un emisor registrado en app.utils.cambios encola el aviso (tabla, id,
+  datos) y un hilo lo publica con pg_notify, en lotes y fuera del request.
+  Si la base no responde, el lote se reintenta hasta que vuelva.
+- Un hilo escucha el canal con una conexión dedicada y entrega los avisos de
+  los otros procesos a los suscriptores locales con despachar(). Los avisos
+  propios se ignoran: ya se despacharon al notificar.
+
+NOTIFY no guarda los avisos de quien no estaba escuchando. Si la conexión de
+escucha se cae, al reconectar se despacha un cambio en TODAS las tablas: los
+caches se vacían, los ETag cambian y los mapas en vivo recargan su estado.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+import uuid
+from typing import List
+from app.config import settings
+from app.database import engine
+from app.utils import cambios
+
+logger = logging.getLogger(__name__)
+
+# Identifica a este proceso para ignorar sus propios avisos
+ORIGEN = uuid.uuid4().hex
+
+# NOTIFY admite hasta 8000 bytes de payload
+MAX_PAYLOAD_BYTES = 7900
+# Avisos por cada pg_notify en lote
+MAX_LOTE = 100
+# Cada cuánto revisan los hilos si tienen que detenerse
+ESPERA_SECONDS = 1.0
+
+_cola: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+_detener = threading.Event()
+_hilos: List[threading.Thread] = []
+_estado = {"conectado": False, "enviados": 0, "recibidos": 0, "reconexiones": 0, "errores": 0}
+
+
+def _conectar():
+    """
+    Conexión DBAPI dedicada en autocommit. Se separa del pool para no
+    ocupar uno de sus lugares mientras el feed esté activo.
+    """
+    conexion = engine.raw_connection()
+    conexion.detach()
+    conexion.dbapi_connection.autocommit = True
+    return conexion
+
+
+def _cerrar(conexion):
+    if conexion is None:
+        return
+    try:
+        conexion.close()
+    except Exception:
+        pass
+
+
+def _payload(tabla: str, id, datos) -> str:
+    mensaje = {"o": ORIGEN, "t": tabla, "id": id, "d": datos}
+    payload = json.dumps(mensaje, default=str)
+    if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+        # Sin los datos: quien lo recibe lo trata como un cambio sin detalle
+        mensaje["d"] = None
+        payload = json.dumps(mensaje, default=str)
+    return payload
+
+
+def _encolar(tabla: str, id, datos):
+    """Emisor registrado en cambios: no bloquea al handler que notificó"""
+    _cola.put(_payload(tabla, id, datos))
+
+
+def _enviar(conexion, lote: List[str]):
+    cursor = conexion.cursor()
+    try:
+        # Un solo viaje a la base por lote
+        cursor.execute(
+            "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+            (settings.CHANGE_FEED_CHANNEL, lote)
+        )
+    finally:
+        cursor.close()
+
+
+def _publicar():
+    """
+    Hilo emisor: publica los avisos encolados en lotes de hasta MAX_LOTE.
+
+    Si la publicación falla, el lote se conserva y se reintenta con una
+    conexión nueva cada CHANGE_FEED_RECONNECT_SECONDS. Si mientras tanto se
+    acumulan más de CHANGE_FEED_MAX_PENDIENTES avisos, se descartan y al
+    recuperar la conexión se publica un cambio en TODAS para que los demás
+    procesos se resincronicen.
+    """
+    conexion = None
+    lote: List[str] = []
+    descartados = False
+    while not _detener.is_set():
+        if not lote and not descartados:
+            try:
+                lote = [_cola.get(timeout=ESPERA_SECONDS)]
+            except queue.Empty:
+                continue
+            while len(lote) < MAX_LOTE:
+                try:
+                    lote.append(_cola.get_nowait())
+                except queue.Empty:
+                    break
+
+        # Los avisos descartados se reemplazan por un cambio en TODAS
+        envio = [_payload(cambios.TODAS, None, None)] + lote if descartados else lote
+        try:
+            if conexion is None:
+                conexion = _conectar()
+            _enviar(conexion, envio)
+        except Exception as e:
+            _cerrar(conexion)
+            conexion = None
+            _estado["errores"] += 1
+            logger.error(f"[FEED] No se pudieron publicar {len(lote)} cambios; se reintentará: {str(e)}")
+            if _cola.qsize() + len(lote) > settings.CHANGE_FEED_MAX_PENDIENTES:
+                logger.warning("[FEED] Demasiados cambios pendientes: se descartan y se publicará un cambio en TODAS")
+                lote = []
+                while True:
+                    try:
+                        _cola.get_nowait()
+                    except queue.Empty:
+                        break
+                descartados = True
+            _detener.wait(settings.CHANGE_FEED_RECONNECT_SECONDS)
+            continue
+        _estado["enviados"] += len(lote)
+        lote = []
+        descartados = False
+    _cerrar(conexion)
+
+
+def _recibir(payload: str):
+    try:
+        mensaje = json.loads(payload)
+    except ValueError:
+        logger.warning(f"[FEED] Aviso con formato inválido: {payload[:200]}")
+        return
+    if mensaje.get("o") == ORIGEN:
+        return
+    _estado["recibidos"] += 1
+    cambios.despachar(mensaje.get("t"), mensaje.get("id"), mensaje.get("d"))
+
+
+def _escuchar():
+    """Hilo receptor: LISTEN con reconexión y resincronización al reconectar"""
+    perdio_avisos = False
+    while not _detener.is_set():
+        conexion = None
+        try:
+            conexion = _conectar()
+            dbapi = conexion.dbapi_connection
+            cursor = conexion.cursor()
+            cursor.execute(f'LISTEN "{settings.CHANGE_FEED_CHANNEL}"')
+            _estado["conectado"] = True
+            logger.info(f"[FEED] Escuchando el canal {settings.CHANGE_FEED_CHANNEL}")
+
+            if perdio_avisos:
+                # Pudo haber cambios mientras no escuchábamos: se invalida todo
+                _estado["reconexiones"] += 1
+                cambios.despachar(cambios.TODAS)
+
+            ultimo_ping = time.monotonic()
+            while not _detener.is_set():
+                listos, _, _ = select.select([dbapi], [], [], ESPERA_SECONDS)
+                if listos:
+                    dbapi.poll()
+                elif time.monotonic() - ultimo_ping >= settings.CHANGE_FEED_PING_SECONDS:
+                    # Sin actividad: comprobar que la conexión sigue viva
+                    cursor.execute("SELECT 1")
+                    ultimo_ping = time.monotonic()
+                while dbapi.notifies:
+                    _recibir(dbapi.notifies.pop(0).payload)
+        except Exception as e:
+            _estado["errores"] += 1
+            logger.error(f"[FEED] Conexión de escucha perdida: {str(e)}")
+            _detener.wait(settings.CHANGE_FEED_RECONNECT_SECONDS)
+        finally:
+            _estado["conectado"] = False
+            _cerrar(conexion)
+        perdio_avisos = True
+
+
+def iniciar_feed() -> bool:
+    """Arranca el feed si está activado y la base es PostgreSQL (desde el lifespan)"""
+    if not settings.CHANGE_FEED_ENABLED:
+        return False
+    if engine.dialect.name != "postgresql":
+        logger.warning("[FEED] CHANGE_FEED_ENABLED requiere PostgreSQL; el feed queda desactivado")
+        return False
+
+    _detener.clear()
+    cambios.registrar_emisor(_encolar)
+    for nombre, destino in (("feed-emisor", _publicar), ("feed-receptor", _escuchar)):
+        hilo = threading.Thread(target=destino, name=nombre, daemon=True)
+        hilo.start()
+        _hilos.append(hilo)
+    return True
+
+
+def detener_feed():
+    """Detiene los hilos del feed (al apagar la aplicación)"""
+    cambios.quitar_emisor(_encolar)
+    _detener.set()
+    for hilo in _hilos:
+        hilo.join(timeout=ESPERA_SECONDS * 2)
+    _hilos.clear()
+
+
+def estado_feed() -> dict:
+    """Estado del feed, para /health"""
+    return {"activo": bool(_hilos), "pendientes": _cola.qsize(), **_estado}
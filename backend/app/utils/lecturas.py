@@ -0,0 +1,53 @@
+"""
+Lecturas del primario después de escribir (read-your-writes con réplicas).
+
+Las réplicas se atrasan unos instantes respecto del primario. Cuando un
+cliente escribe (cualquier método que no sea GET/HEAD/OPTIONS con respuesta
+exitosa), PrimarioTrasEscritura le agrega una cookie con el instante hasta
+el que debe leer del primario. Mientras siga vigente, motor_lectura() lo
+envía al primario en vez de a una réplica.
+"""
+import time
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from app.config import settings
+
+METODOS_LECTURA = {"GET", "HEAD", "OPTIONS"}
+
+
+def primario_reciente(request: Request) -> bool:
+    """True si el cliente escribió dentro de READ_AFTER_WRITE_SECONDS"""
+    valor = request.cookies.get(settings.READ_AFTER_WRITE_COOKIE)
+    if not valor:
+        return False
+    try:
+        hasta = int(valor)
+    except ValueError:
+        return False
+    ahora = time.time()
+    # Un valor más lejano que la ventana no es de esta API: se ignora
+    return ahora < hasta <= ahora + settings.READ_AFTER_WRITE_SECONDS
+
+
+class PrimarioTrasEscritura:
+    """Middleware ASGI que marca con la cookie a los clientes que escribieron"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in METODOS_LECTURA:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                ventana = settings.READ_AFTER_WRITE_SECONDS
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{settings.READ_AFTER_WRITE_COOKIE}={int(time.time()) + ventana}; "
+                    f"Max-Age={ventana}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,191 @@
+"""
+Métricas en proceso con formato compatible con Prometheus.
+
+Contadores, gauges e histogramas con etiquetas, sin dependencias externas.
+Son seguros entre hilos (los handlers síncronos corren en el threadpool).
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+# Buckets por defecto para latencias (segundos)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class Metric(ABC):
+    """Base común: nombre, ayuda, etiquetas y registro"""
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+        REGISTRY.register(self)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> list:
+        """Líneas de muestras en formato de exposición"""
+
+
+class Counter(Metric):
+    """Contador monotónico"""
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(Metric):
+    """
+    Valor instantáneo. Puede fijarse con set()/inc()/dec() o calcularse al
+    momento de leerlo con set_function() (por ejemplo, el estado del pool).
+    """
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        with self._lock:
+            self._functions[_label_key(self.labelnames, labels)] = function
+
+    def value(self, **labels) -> float:
+        key = _label_key(self.labelnames, labels)
+        if key in self._functions:
+            try:
+                return float(self._functions[key]())
+            except Exception:
+                return float("nan")
+        return self._values.get(key, 0.0)
+
+    def _samples(self):
+        with self._lock:
+            keys = list(self._values) + [k for k in self._functions if k not in self._values]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {self.value(**dict(zip(self.labelnames, key)))}"
+            for key in keys
+        ]
+
+
+class Histogram(Metric):
+    """Histograma acumulativo con buckets fijos"""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiqueta: [conteos por bucket..., +Inf], suma
+        self._counts: Dict[Tuple[str, ...], list] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def snapshot(self, **labels) -> Optional[dict]:
+        """Conteo, suma y buckets acumulados para un conjunto de etiquetas"""
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            counts = list(self._counts.get(key, []))
+            total_sum = self._sums.get(key, 0.0)
+        if not counts:
+            return None
+        acumulado, buckets = 0, {}
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            acumulado += count
+            buckets[bound] = acumulado
+        return {"count": acumulado, "sum": total_sum, "buckets": buckets}
+
+    def _samples(self):
+        with self._lock:
+            keys = list(self._counts)
+        lines = []
+        for key in keys:
+            snap = self.snapshot(**dict(zip(self.labelnames, key)))
+            for bound, count in snap["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                etiquetas = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{etiquetas} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {snap['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {snap['count']}")
+        return lines
+
+
+class Registry:
+    """Registro global de métricas"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Exposición en formato de texto de Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,248 @@
+"""
+Instrumentación por request: latencia, tamaño de respuesta y tiempo de SQL.
+
+MetricsMiddleware abre un RequestStats por request en una ContextVar; los
+hooks de SQLAlchemy (before/after_cursor_execute) suman en él cada sentencia.
+Starlette copia el contexto al threadpool, así que los handlers síncronos
+también acumulan en el mismo objeto.
+
+Cada sentencia se agrupa por su huella (el SQL sin literales ni listas IN).
+Un request que supera SQL_QUERY_BUDGET sentencias, o que repite la misma
+huella SQL_REPEAT_THRESHOLD veces (el patrón N+1), se registra en el log o,
+con SQL_BUDGET_MODE="raise", falla en la sentencia que cruza el límite.
+La respuesta lleva un header Server-Timing con el tiempo de base de datos y
+el de la aplicación.
+"""
+import logging
+import re
+import time
+from collections import Counter as Conteo
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from app.config import settings
+from app.utils.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests HTTP atendidos", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de los requests HTTP", ("method", "route")
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests HTTP en curso", ("method",)
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de las respuestas", ("method", "route"),
+    buckets=SIZE_BUCKETS
+)
+HTTP_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "Sentencias SQL ejecutadas por request", ("method", "route"),
+    buckets=COUNT_BUCKETS
+)
+HTTP_SQL_TIME = Histogram(
+    "http_request_sql_seconds", "Tiempo total de SQL por request", ("method", "route")
+)
+SQL_STATEMENTS = Counter(
+    "db_statements_total", "Sentencias SQL ejecutadas", ("engine", "operation")
+)
+SQL_DURATION = Histogram(
+    "db_statement_duration_seconds", "Duración de cada sentencia SQL", ("engine", "operation")
+)
+SQL_BUDGET_EXCEEDED = Counter(
+    "http_sql_budget_exceeded_total", "Requests que superaron el presupuesto de SQL", ("route", "reason")
+)
+
+# Motivos por los que un request excede el presupuesto
+EXCESO_SENTENCIAS = "statements"
+EXCESO_REPETICION = "repeated"
+
+
+class PresupuestoSQLExcedido(RuntimeError):
+    """Un request superó el presupuesto de SQL con SQL_BUDGET_MODE = raise"""
+
+
+class RequestStats:
+    """Acumulador de SQL de un request"""
+    __slots__ = ("statements", "sql_time", "huellas", "presupuesto", "repeticiones", "fallo")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_time = 0.0
+        self.huellas = Conteo()
+        self.presupuesto = settings.SQL_QUERY_BUDGET
+        self.repeticiones = settings.SQL_REPEAT_THRESHOLD
+        self.fallo = False
+
+    def excesos(self, en_curso: int = 0) -> list:
+        """Motivos por los que el request superó su presupuesto (contando en_curso sentencias sin terminar)"""
+        motivos = []
+        if self.presupuesto and self.statements + en_curso > self.presupuesto:
+            motivos.append(EXCESO_SENTENCIAS)
+        if self.repeticiones and self.huellas and max(self.huellas.values()) >= self.repeticiones:
+            motivos.append(EXCESO_REPETICION)
+        return motivos
+
+    def repetidas(self, cantidad: int = 3) -> list:
+        """Huellas más repetidas, para el log"""
+        return [(huella, n) for huella, n in self.huellas.most_common(cantidad) if n > 1]
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Estadísticas del request en curso (None fuera de un request)"""
+    return _request_stats.get()
+
+
+def presupuesto_sql(sentencias: Optional[int], repeticiones: Optional[int] = None):
+    """
+    Dependencia para cambiar el presupuesto de SQL de una ruta.
+    None deja el límite sin efecto (p. ej. streams que consultan durante horas).
+    """
+    async def dependencia():
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.presupuesto = sentencias
+            stats.repeticiones = repeticiones
+    return dependencia
+
+
+# Literales y listas de parámetros que no cambian la forma de la consulta
+_PARAMETRO = r"(?:\?|%\([^)]+\)s|%s|\$\d+|:\w+)"
+_LISTA_PARAMETROS = re.compile(rf"\(\s*{_PARAMETRO}(?:\s*,\s*{_PARAMETRO})*\s*\)")
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def huella(statement: str) -> str:
+    """Forma normalizada de una sentencia para detectar repeticiones"""
+    normalizada = _LITERALES.sub("?", statement)
+    normalizada = _LISTA_PARAMETROS.sub("(...)", normalizada)
+    return _ESPACIOS.sub(" ", normalizada).strip()
+
+
+def _operation(statement: str) -> str:
+    """Primera palabra de la sentencia (SELECT, INSERT, ...)"""
+    palabra = statement.lstrip().split(None, 1)
+    return palabra[0].upper() if palabra else "OTHER"
+
+
+def instrumentar_sql(engine, nombre: str):
+    """Engancha before/after_cursor_execute para medir cada sentencia"""
+    sync_engine = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_stats.get()
+        if stats is not None and settings.SQL_BUDGET_MODE != "off":
+            stats.huellas[huella(statement)] += 1
+            if settings.SQL_BUDGET_MODE == "raise" and not stats.fallo:
+                # statements suma recién al terminar la sentencia
+                motivos = stats.excesos(en_curso=1)
+                if motivos:
+                    stats.fallo = True
+                    raise PresupuestoSQLExcedido(
+                        f"Presupuesto de SQL excedido ({', '.join(motivos)}): "
+                        f"{stats.statements + 1} sentencias; {huella(statement)[:200]}"
+                    )
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - conn.info["query_start_time"].pop()
+        operacion = _operation(statement)
+        SQL_STATEMENTS.inc(engine=nombre, operation=operacion)
+        SQL_DURATION.observe(duracion, engine=nombre, operation=operacion)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_time += duracion
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra por ruta: conteo, latencia, requests en
+    curso, tamaño de respuesta y sentencias/tiempo SQL.
+
+    La etiqueta de ruta es la plantilla (/peliculas/{id_pelicula}), no la URL,
+    para no disparar la cardinalidad.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        body_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    _server_timing(message, stats, time.perf_counter() - inicio)
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method=method)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duracion = time.perf_counter() - inicio
+            HTTP_IN_PROGRESS.dec(method=method)
+            _request_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=status_code)
+            HTTP_LATENCY.observe(duracion, method=method, route=route_path)
+            HTTP_RESPONSE_SIZE.observe(body_size, method=method, route=route_path)
+            HTTP_SQL_STATEMENTS.observe(stats.statements, method=method, route=route_path)
+            HTTP_SQL_TIME.observe(stats.sql_time, method=method, route=route_path)
+            _revisar_presupuesto(stats, method, route_path)
+
+
+def _server_timing(message, stats: RequestStats, transcurrido: float):
+    """Server-Timing: tiempo de base de datos y del resto de la aplicación hasta la respuesta"""
+    db_ms = stats.sql_time * 1000
+    app_ms = max(transcurrido * 1000 - db_ms, 0.0)
+    MutableHeaders(scope=message).append(
+        "Server-Timing",
+        f'db;dur={db_ms:.1f};desc="{stats.statements} consultas", app;dur={app_ms:.1f}'
+    )
+
+
+def _revisar_presupuesto(stats: RequestStats, method: str, route_path: str):
+    if settings.SQL_BUDGET_MODE == "off":
+        return
+    motivos = stats.excesos()
+    if not motivos:
+        return
+    for motivo in motivos:
+        SQL_BUDGET_EXCEEDED.inc(route=route_path, reason=motivo)
+    repetidas = "; ".join(f"{n}x {h[:160]}" for h, n in stats.repetidas())
+    logger.warning(
+        f"[SQL] {method} {route_path}: {stats.statements} sentencias "
+        f"(presupuesto {stats.presupuesto}, repetición máx. {stats.repeticiones}). "
+        f"Más repetidas: {repetidas or '-'}"
+    )
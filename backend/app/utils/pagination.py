@@ -0,0 +1,145 @@
+"""
+Paginación compartida por las rutas de listas.
+
+Sin parámetro cursor se mantiene el comportamiento anterior (skip/limit y
+una lista JSON). Con cursor (vacío para la primera página) se usa
+paginación por clave (keyset): se ordena por una clave estable, por
+ejemplo (fecha_reserva, id_reserva), y se filtra con
+(clave) > (último valor visto). El costo no crece con la profundidad de la
+página como pasa con OFFSET. La respuesta es un sobre con items y
+next_cursor.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Generic, List, Optional, TypeVar
+from uuid import UUID
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+from sqlalchemy import Row, tuple_
+from app.utils.consultas import filas_a_dicts
+from app.utils.serializacion import validar_lista
+
+T = TypeVar("T")
+
+# Tope de items por página en modo cursor
+MAX_LIMIT_CURSOR = 1000
+
+
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limit: int
+    total: Optional[int] = None
+
+
+class Paginacion:
+    """Dependencia con los parámetros de paginación de las listas"""
+
+    def __init__(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = Query(
+            None,
+            description="Cursor opaco de paginación por clave. Vacío para la primera página; "
+                        "si se omite se usa skip/limit y se devuelve una lista simple."
+        ),
+        incluir_total: bool = Query(False, description="Incluir el total de filas (solo con cursor)"),
+        response: Response = None
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.incluir_total = incluir_total
+        # Respuesta del request, para respuesta_json() (headers de ETag y cache)
+        self.response = response
+
+    @property
+    def usa_cursor(self) -> bool:
+        return self.cursor is not None
+
+    def cache_key(self) -> tuple:
+        return (self.skip, self.limit, self.cursor, self.incluir_total)
+
+
+def _a_json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (UUID, Decimal)):
+        return str(valor)
+    return valor
+
+
+def codificar_cursor(valores) -> str:
+    crudo = json.dumps([_a_json(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, claves) -> tuple:
+    """Convierte el cursor al tipo Python de cada columna clave"""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if len(valores) != len(claves):
+            raise ValueError("cantidad de claves")
+        resultado = []
+        for columna, valor in zip(claves, valores):
+            tipo = columna.type.python_type
+            if valor is None:
+                resultado.append(None)
+            elif tipo is datetime:
+                resultado.append(datetime.fromisoformat(valor))
+            else:
+                resultado.append(tipo(valor))
+        return tuple(resultado)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El cursor de paginación no es válido"
+        )
+
+
+def _validar(schema, filas) -> list:
+    # Las filas Row de consulta_ligera() se validan como dicts
+    if filas and isinstance(filas[0], Row):
+        filas = filas_a_dicts(filas)
+    return validar_lista(schema, filas)
+
+
+def paginar(query, paginacion: Paginacion, claves, schema):
+    """
+    Aplica la paginación a un Query y valida las filas con el schema de respuesta.
+    El Query puede ser de objetos ORM o de columnas (ver consulta_ligera).
+
+    claves: columnas que forman el orden estable; la última debe ser la
+    clave primaria para desempatar.
+    """
+    if not paginacion.usa_cursor:
+        filas = query.offset(paginacion.skip).limit(paginacion.limit).all()
+        return _validar(schema, filas)
+
+    limit = max(1, min(paginacion.limit, MAX_LIMIT_CURSOR))
+    total = None
+    if paginacion.incluir_total:
+        total = query.order_by(None).count()
+
+    pagina = query
+    if paginacion.cursor:
+        pagina = pagina.filter(tuple_(*claves) > decodificar_cursor(paginacion.cursor, claves))
+    # Se pide una fila extra para saber si hay otra página
+    filas = pagina.order_by(*claves).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        next_cursor = codificar_cursor([getattr(ultima, columna.key) for columna in claves])
+
+    return Pagina[schema](
+        items=_validar(schema, filas),
+        next_cursor=next_cursor,
+        limit=limit,
+        total=total
+    )
@@ -0,0 +1,71 @@
+"""
+Serialización rápida de respuestas JSON (FAST_JSON_ENABLED).
+
+Por defecto FastAPI toma lo que devuelve el handler, lo vuelve a validar
+contra el response_model, lo pasa por jsonable_encoder y lo serializa con
+el json de la librería estándar. En listas grandes ese trabajo pesa más que
+la consulta. Con la opción activada:
+
+- La clase de respuesta por defecto es ORJSONResponse.
+- Las listas se validan una sola vez con un TypeAdapter (en vez de un
+  model_validate por fila) y respuesta_json() las serializa directo a bytes
+  con el serializador de pydantic, sin la segunda validación de FastAPI.
+
+El response_model de la ruta se mantiene para la documentación de OpenAPI.
+"""
+import logging
+from functools import lru_cache
+from typing import Any, List, Type
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from app.config import settings
+
+try:
+    from fastapi.responses import ORJSONResponse
+    import orjson  # noqa: F401
+except ImportError:
+    # orjson es opcional: sin él se usa JSONResponse
+    ORJSONResponse = None
+
+logger = logging.getLogger(__name__)
+
+
+def clase_respuesta() -> Type[Response]:
+    """Clase de respuesta por defecto de la aplicación"""
+    if not settings.FAST_JSON_ENABLED:
+        return JSONResponse
+    if ORJSONResponse is None:
+        logger.warning("[JSON] FAST_JSON_ENABLED requiere orjson; se usa JSONResponse")
+        return JSONResponse
+    return ORJSONResponse
+
+
+@lru_cache(maxsize=None)
+def adaptador_lista(schema) -> TypeAdapter:
+    """TypeAdapter de List[schema], creado una vez por schema"""
+    return TypeAdapter(List[schema])
+
+
+def validar_lista(schema, filas) -> list:
+    """Valida objetos ORM o filas (Row) contra el schema en una sola llamada"""
+    return adaptador_lista(schema).validate_python(filas, from_attributes=True)
+
+
+def respuesta_json(contenido: Any, response: Response):
+    """
+    Devuelve el contenido ya validado (modelos, listas de modelos o dicts)
+    como una respuesta con el JSON en bytes, conservando los headers y el
+    status que las dependencias pusieron en response (ETag, Cache-Control).
+    Sin FAST_JSON_ENABLED devuelve el contenido tal cual.
+    """
+    if not settings.FAST_JSON_ENABLED:
+        return contenido
+    respuesta = Response(
+        content=to_json(contenido),
+        status_code=response.status_code or 200,
+        media_type="application/json"
+    )
+    respuesta.headers.raw.extend(response.headers.raw)
+    return respuesta
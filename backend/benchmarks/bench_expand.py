@@ -0,0 +1,101 @@
+"""
+Sentencias SQL por request de los detalles con expand=.
+
+Siembra una reserva chica y una grande (más asientos y facturas) y cuenta
+las sentencias de cada expansión. El número tiene que ser el mismo para las
+dos y no superar el presupuesto: una consulta con JOIN para las relaciones
+de un objeto más una por cada lista pedida. Termina con error si no.
+
+    python -m benchmarks.bench_expand
+"""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_expand.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Usuario, Pelicula, Sala, Funcion, Asiento, Reserva, ReservaAsiento, Factura  # noqa: E402
+
+# (ruta, expand, sentencias esperadas)
+CASOS = (
+    ("reservas", None, 1),
+    ("reservas", "funcion", 1),
+    ("reservas", "funcion.pelicula,funcion.sala", 1),
+    ("reservas", "asientos", 2),
+    ("reservas", "facturas", 2),
+    ("reservas", "funcion.pelicula,funcion.sala,asientos,facturas", 3),
+    ("funciones", "pelicula,sala", 1),
+    ("facturas", "reserva", 1),
+    ("facturas", "reserva.funcion.pelicula,reserva.asientos,reserva.facturas", 3),
+)
+
+
+def sembrar(conn, asientos: int, facturas: int) -> dict:
+    """Una reserva con su función, película, sala, usuario, asientos y facturas"""
+    ids = {k: uuid.uuid4() for k in ("usuario", "pelicula", "sala", "funcion", "reserva")}
+    conn.execute(insert(Usuario), [{"id_usuario": ids["usuario"], "nombre": "Ana"}])
+    conn.execute(insert(Pelicula), [{"id_pelicula": ids["pelicula"], "titulo": "Película"}])
+    conn.execute(insert(Sala), [{"id_sala": ids["sala"], "nombre": "Sala", "filas": 1, "columnas": asientos}])
+    ids_asiento = [uuid.uuid4() for _ in range(asientos)]
+    conn.execute(insert(Asiento), [
+        {"id_asiento": a, "numero": f"A{n + 1}", "id_sala": ids["sala"]} for n, a in enumerate(ids_asiento)
+    ])
+    ahora = datetime(2026, 1, 1)
+    conn.execute(insert(Funcion), [{
+        "id_funcion": ids["funcion"], "fecha_hora": ahora, "precio": 10,
+        "id_pelicula": ids["pelicula"], "id_sala": ids["sala"]
+    }])
+    conn.execute(insert(Reserva), [{
+        "id_reserva": ids["reserva"], "cantidad_asientos": asientos, "id_funcion": ids["funcion"],
+        "id_usuario": ids["usuario"], "total": 10 * asientos, "fecha_reserva": ahora - timedelta(days=1)
+    }])
+    conn.execute(insert(ReservaAsiento), [
+        {"id_reserva": ids["reserva"], "id_asiento": a, "id_funcion": ids["funcion"]} for a in ids_asiento
+    ])
+    ids_factura = [uuid.uuid4() for _ in range(facturas)]
+    conn.execute(insert(Factura), [
+        {"id_factura": f, "fecha_emision": ahora, "total": 10, "id_reserva": ids["reserva"]} for f in ids_factura
+    ])
+    ids["factura"] = ids_factura[0]
+    return ids
+
+
+def main():
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        chica = sembrar(conn, asientos=2, facturas=1)
+        grande = sembrar(conn, asientos=200, facturas=20)
+
+    sentencias = []
+    event.listen(engine, "before_cursor_execute", lambda *args: sentencias.append(1))
+
+    client = TestClient(app)
+    fallas = 0
+    print(f"{'ruta':<10}{'expand':<62}{'chica':>7}{'grande':>8}{'máx':>5}")
+    for ruta, expand, maximo in CASOS:
+        conteos = []
+        for ids in (chica, grande):
+            clave = ruta[:-1] if ruta != "funciones" else "funcion"
+            url = f"/api/v1/{ruta}/{ids[clave]}"
+            sentencias.clear()
+            respuesta = client.get(url, params={"expand": expand} if expand else None)
+            assert respuesta.status_code == 200, respuesta.text
+            conteos.append(len(sentencias))
+        ok = conteos[0] == conteos[1] <= maximo
+        fallas += not ok
+        print(f"{ruta:<10}{expand or '-':<62}{conteos[0]:>7}{conteos[1]:>8}{maximo:>5}{'' if ok else '  <-- FALLA'}")
+
+    Base.metadata.drop_all(engine)
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
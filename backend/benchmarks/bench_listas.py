@@ -0,0 +1,88 @@
+"""
+Carga y validación de una página de las listas: db.query(Model) con
+objetos ORM contra consulta_ligera() con solo las columnas del schema.
+
+Cada repetición usa una sesión nueva, como un request. Verifica que las dos
+formas devuelvan la misma página e informa cuántas instancias ORM se
+construyen en cada una.
+
+    python -m benchmarks.bench_listas
+    python -m benchmarks.bench_listas --filas 5000 --repeticiones 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_listas.db")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.models import Asiento, Funcion, Reserva  # noqa: E402
+from app.schemas import AsientoResponse, FuncionResponse, ReservaResponse  # noqa: E402
+from app.utils.consultas import consulta_ligera  # noqa: E402
+from app.utils.pagination import Paginacion, paginar  # noqa: E402
+from benchmarks.datos import sembrar  # noqa: E402
+
+CASOS = (
+    ("asientos", Asiento, AsientoResponse, (Asiento.id_asiento,)),
+    ("funciones", Funcion, FuncionResponse, (Funcion.fecha_hora, Funcion.id_funcion)),
+    ("reservas", Reserva, ReservaResponse, (Reserva.fecha_reserva, Reserva.id_reserva)),
+)
+
+# Instancias ORM construidas al cargar filas
+instancias = []
+
+
+def pagina(model, schema, orden, ligera: bool, filas: int):
+    """Una página como la arma la ruta; devuelve los items y las instancias construidas"""
+    instancias.clear()
+    with Session(engine) as db:
+        query = consulta_ligera(db, model, schema) if ligera else db.query(model)
+        items = paginar(query, Paginacion(skip=0, limit=filas, cursor="", incluir_total=False), orden, schema).items
+        return items, len(instancias)
+
+
+def medir(funcion, repeticiones) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        sembrar(conn, usuarios=100, peliculas=50, salas=max(1, args.filas // 100), asientos_por_sala=100,
+                funciones=args.filas, reservas=args.filas)
+
+    for _, model, _, _ in CASOS:
+        event.listen(model, "load", lambda *args: instancias.append(1))
+
+    print(f"Página de {args.filas} filas, mediana de {args.repeticiones} (ms)\n")
+    print(f"{'lista':<12}{'ORM':>9}{'ligera':>9}{'mejora':>9}{'instancias':>15}")
+    for nombre, model, schema, orden in CASOS:
+        orm, mapa_orm = pagina(model, schema, orden, False, args.filas)
+        ligera, mapa_ligera = pagina(model, schema, orden, True, args.filas)
+        assert orm == ligera, f"{nombre}: las páginas no coinciden"
+
+        t_orm = medir(lambda: pagina(model, schema, orden, False, args.filas), args.repeticiones) * 1000
+        t_ligera = medir(lambda: pagina(model, schema, orden, True, args.filas), args.repeticiones) * 1000
+        print(f"{nombre:<12}{t_orm:>9.2f}{t_ligera:>9.2f}{t_orm / t_ligera:>8.1f}x{f'{mapa_orm} -> {mapa_ligera}':>15}")
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
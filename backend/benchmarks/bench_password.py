@@ -0,0 +1,72 @@
+"""
+Costo del hash de contraseñas: logins por segundo por núcleo según el
+esquema y los rounds, y el rendimiento del pool de hash con varios hilos.
+
+    python -m benchmarks.bench_password
+    python -m benchmarks.bench_password --esquema bcrypt --rounds 10 11 12 13 --hilos 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.password_service import crear_contexto, get_password_hash, verify_and_update  # noqa: E402
+
+PASSWORD = "correcto-caballo-bateria-grapa"
+
+
+def por_nucleo(contexto, hashed, repeticiones) -> dict:
+    """Verificaciones secuenciales en un solo hilo"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        valida, _ = verify_and_update(PASSWORD, hashed, contexto)
+        tiempos.append(time.perf_counter() - inicio)
+        assert valida
+    mediana = statistics.median(tiempos)
+    return {"mediana_ms": mediana * 1000, "logins_por_seg": 1 / mediana}
+
+
+async def en_pool(contexto, hashed, hilos, logins) -> float:
+    """Logins concurrentes a través de un pool acotado, como en la API"""
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, verify_and_update, PASSWORD, hashed, contexto)
+            for _ in range(logins)
+        ])
+        return logins / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--esquema", default="bcrypt")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--hilos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"Esquema {args.esquema}, pool de {args.hilos} hilos\n")
+    print(f"{'rounds':>7}{'verify (ms)':>14}{'logins/s/núcleo':>18}{'logins/s pool':>16}{'rehash':>8}")
+    anterior = None
+    for rounds in args.rounds:
+        contexto = crear_contexto(args.esquema, rounds)
+        hashed = get_password_hash(PASSWORD, contexto)
+        simple = por_nucleo(contexto, hashed, args.repeticiones)
+        pool = asyncio.run(en_pool(contexto, hashed, args.hilos, args.repeticiones * args.hilos))
+        # Un hash del costo anterior se marca para rehash con el costo actual
+        rehash = anterior is not None and verify_and_update(PASSWORD, anterior, contexto)[1] is not None
+        print(f"{rounds:>7}{simple['mediana_ms']:>14.1f}{simple['logins_por_seg']:>18.1f}{pool:>16.1f}{'sí' if rehash else '-':>8}")
+        anterior = hashed
+
+
+if __name__ == "__main__":
+    main()
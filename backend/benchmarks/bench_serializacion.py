@@ -0,0 +1,108 @@
+"""
+Tiempo de serialización por cada 1000 filas de las listas, con la ruta de
+FastAPI por defecto y con la de FAST_JSON_ENABLED.
+
+- estándar: model_validate por fila, la validación del response_model y
+  jsonable_encoder de FastAPI y JSONResponse (json de la librería estándar).
+- orjson: lo mismo, con ORJSONResponse como clase por defecto.
+- rápido: validar_lista() (un TypeAdapter) y respuesta_json() (bytes
+  directos del serializador de pydantic).
+
+Los objetos se cargan una vez de una base SQLite temporal, así que solo se
+mide la serialización. Verifica que las tres rutas produzcan el mismo JSON.
+
+    python -m benchmarks.bench_serializacion
+    python -m benchmarks.bench_serializacion --filas 5000 --repeticiones 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_serializacion.db")
+os.environ["FAST_JSON_ENABLED"] = "true"
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.models import Asiento, Funcion, Reserva  # noqa: E402
+from app.schemas import AsientoResponse, FuncionResponse, ReservaResponse  # noqa: E402
+from app.utils.serializacion import respuesta_json, validar_lista  # noqa: E402
+from benchmarks.datos import sembrar  # noqa: E402
+
+CASOS = (
+    ("asientos", Asiento, AsientoResponse),
+    ("funciones", Funcion, FuncionResponse),
+    ("reservas", Reserva, ReservaResponse),
+)
+
+
+def estandar(loop, campo, schema, objetos, clase) -> bytes:
+    """Lo que hacen paginar() y FastAPI sin la opción"""
+    contenido = [schema.model_validate(o) for o in objetos]
+    serializado = loop.run_until_complete(serialize_response(field=campo, response_content=contenido))
+    return clase(serializado).body
+
+
+def rapido(schema, objetos) -> bytes:
+    return respuesta_json(validar_lista(schema, objetos), Response()).body
+
+
+def medir(funcion, repeticiones) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        sembrar(conn, usuarios=100, peliculas=50, salas=max(1, args.filas // 100), asientos_por_sala=100,
+                funciones=args.filas, reservas=args.filas)
+
+    loop = asyncio.new_event_loop()
+    print(f"ms por cada 1000 filas ({args.filas} filas, mediana de {args.repeticiones})\n")
+    print(f"{'lista':<12}{'estándar':>10}{'orjson':>10}{'rápido':>10}{'mejora':>9}")
+    with Session(engine) as db:
+        for nombre, model, schema in CASOS:
+            objetos = db.query(model).limit(args.filas).all()
+            campo = create_model_field(name="Response", type_=List[schema], mode="serialization")
+
+            salidas = {
+                "estándar": estandar(loop, campo, schema, objetos, JSONResponse),
+                "orjson": estandar(loop, campo, schema, objetos, ORJSONResponse),
+                "rápido": rapido(schema, objetos),
+            }
+            referencia = json.loads(salidas["estándar"])
+            for ruta, cuerpo in salidas.items():
+                assert json.loads(cuerpo) == referencia, f"{nombre}: la ruta {ruta} produce otro JSON"
+
+            escala = 1000 * 1000 / len(objetos)
+            t_estandar = medir(lambda: estandar(loop, campo, schema, objetos, JSONResponse), args.repeticiones) * escala
+            t_orjson = medir(lambda: estandar(loop, campo, schema, objetos, ORJSONResponse), args.repeticiones) * escala
+            t_rapido = medir(lambda: rapido(schema, objetos), args.repeticiones) * escala
+            print(f"{nombre:<12}{t_estandar:>10.2f}{t_orjson:>10.2f}{t_rapido:>10.2f}{t_estandar / t_rapido:>8.1f}x")
+    loop.close()
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Generador de datos sintéticos para los benchmarks.
+
+Inserta con inserciones multi-fila un catálogo, funciones repartidas en el
+año y reservas con sus asientos (sin reservar dos veces el mismo asiento de
+una función) y facturas. Es determinístico para una misma semilla.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models import Usuario, Pelicula, Sala, Funcion, Asiento, Reserva, ReservaAsiento, Factura
+
+GENEROS = ("Acción", "Comedia", "Drama", "Terror", "Animación", "Ciencia ficción")
+CLASIFICACIONES = ("ATP", "+13", "+16", "+18")
+METODOS_PAGO = ("tarjeta", "efectivo", "transferencia", None)
+# Filas insertadas por cada execute para no armar listas enormes
+LOTE = 20_000
+
+
+def _insertar(conn, model, filas):
+    for inicio in range(0, len(filas), LOTE):
+        conn.execute(insert(model), filas[inicio:inicio + LOTE])
+
+
+def sembrar(conn, usuarios, peliculas, salas, asientos_por_sala, funciones, reservas, semilla=42) -> dict:
+    """
+    Inserta los datos y devuelve claves para las consultas de los benchmarks:
+    IDs de ejemplo y las listas de funciones, reservas y asientos por sala.
+    """
+    rnd = random.Random(semilla)
+    ids_usuario = [uuid.uuid4() for _ in range(usuarios)]
+    _insertar(conn, Usuario, [
+        {"id_usuario": i, "nombre": f"Usuario {n}", "correo": f"usuario{n}@cine.test", "rol": "cliente"}
+        for n, i in enumerate(ids_usuario)
+    ])
+    ids_pelicula = [uuid.uuid4() for _ in range(peliculas)]
+    _insertar(conn, Pelicula, [{
+        "id_pelicula": i,
+        "titulo": f"Película {n}",
+        "genero": rnd.choice(GENEROS),
+        "clasificacion": rnd.choice(CLASIFICACIONES),
+        "duracion": str(rnd.randint(80, 180))
+    } for n, i in enumerate(ids_pelicula)])
+
+    ids_sala = [uuid.uuid4() for _ in range(salas)]
+    _insertar(conn, Sala, [
+        {"id_sala": i, "nombre": f"Sala {n}", "capacidad": asientos_por_sala, "filas": 10, "columnas": asientos_por_sala // 10}
+        for n, i in enumerate(ids_sala)
+    ])
+    asientos_sala = {i: [uuid.uuid4() for _ in range(asientos_por_sala)] for i in ids_sala}
+    _insertar(conn, Asiento, [
+        {"id_asiento": a, "numero": f"{chr(65 + n // 10 % 26)}{n % 10 + 1}", "id_sala": sala}
+        for sala, ids in asientos_sala.items() for n, a in enumerate(ids)
+    ])
+
+    inicio = datetime(2026, 1, 1)
+    funciones_filas = [{
+        "id_funcion": uuid.uuid4(),
+        "fecha_hora": inicio + timedelta(hours=3 * n),
+        "precio": rnd.choice((8, 10, 12)),
+        "id_pelicula": rnd.choice(ids_pelicula),
+        "id_sala": rnd.choice(ids_sala)
+    } for n in range(funciones)]
+    _insertar(conn, Funcion, funciones_filas)
+
+    # Asientos libres por función, en orden aleatorio
+    libres = {}
+    reservas_filas, reserva_asientos, facturas_filas = [], [], []
+    for n in range(reservas):
+        funcion = rnd.choice(funciones_filas)
+        disponibles = libres.get(funcion["id_funcion"])
+        if disponibles is None:
+            disponibles = libres[funcion["id_funcion"]] = rnd.sample(asientos_sala[funcion["id_sala"]], asientos_por_sala)
+        cantidad = min(rnd.randint(1, 4), len(disponibles))
+        if not cantidad:
+            # Función llena
+            continue
+        id_reserva = uuid.uuid4()
+        fecha = funcion["fecha_hora"] - timedelta(days=rnd.randint(0, 14), minutes=rnd.randint(0, 1440))
+        total = cantidad * funcion["precio"]
+        reservas_filas.append({
+            "id_reserva": id_reserva,
+            "cantidad_asientos": cantidad,
+            "estado": "confirmada",
+            "id_funcion": funcion["id_funcion"],
+            "id_usuario": rnd.choice(ids_usuario),
+            "total": total,
+            "fecha_reserva": fecha
+        })
+        for _ in range(cantidad):
+            reserva_asientos.append({
+                "id_reserva": id_reserva, "id_asiento": disponibles.pop(), "id_funcion": funcion["id_funcion"]
+            })
+        if rnd.random() < 0.8:
+            facturas_filas.append({
+                "id_factura": uuid.uuid4(),
+                "fecha_emision": fecha,
+                "total": total,
+                "metodo_pago": rnd.choice(METODOS_PAGO),
+                "id_reserva": id_reserva
+            })
+    _insertar(conn, Reserva, reservas_filas)
+    _insertar(conn, ReservaAsiento, reserva_asientos)
+    _insertar(conn, Factura, facturas_filas)
+
+    return {
+        "correo": f"usuario{usuarios // 2}@cine.test",
+        "id_pelicula": ids_pelicula[0],
+        "id_sala": ids_sala[0],
+        "id_funcion": funciones_filas[0]["id_funcion"],
+        "id_asiento": asientos_sala[ids_sala[0]][0],
+        "funciones": [f["id_funcion"] for f in funciones_filas],
+        "reservas": [r["id_reserva"] for r in reservas_filas],
+        "salas": ids_sala,
+        "asientos_sala": asientos_sala,
+    }
@@ -0,0 +1,110 @@
+"""
+Réplica de lectura simulada con dos bases SQLite locales.
+
+Siembra el primario, copia el archivo como réplica y desde ahí la réplica
+queda congelada (un retraso de replicación infinito). Recorre el flujo con
+dos clientes y termina con error si alguna lectura va a la base equivocada:
+
+- Las exportaciones y los reportes leen de la réplica.
+- Después de escribir, el mismo cliente lee del primario (ve su reserva)
+  durante READ_AFTER_WRITE_SECONDS; otro cliente sigue en la réplica.
+- Vencida la ventana, el cliente vuelve a la réplica.
+- Las rutas con ETag o cache (listas) siguen en el primario.
+
+    python -m benchmarks.replicas_locales
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DIRECTORIO = tempfile.mkdtemp()
+PRIMARIO = os.path.join(DIRECTORIO, "primario.db")
+REPLICA = os.path.join(DIRECTORIO, "replica.db")
+VENTANA_SECONDS = 2
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARIO}"
+os.environ["DATABASE_READ_URLS"] = f"sqlite:///{REPLICA}"
+os.environ["READ_AFTER_WRITE_SECONDS"] = str(VENTANA_SECONDS)
+os.environ["CACHE_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app.database import Base, engine, read_engines  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.datos import sembrar  # noqa: E402
+
+# Sentencias ejecutadas en cada base
+sentencias = Counter()
+fallas = 0
+
+
+def contar(nombre):
+    return lambda *args: sentencias.update([nombre])
+
+
+def leer(cliente, url):
+    """GET y base que lo atendió"""
+    sentencias.clear()
+    respuesta = cliente.get(url)
+    assert respuesta.status_code == 200, respuesta.text
+    bases = sorted(sentencias)
+    return respuesta, bases[0] if len(bases) == 1 else "+".join(bases) or "ninguna"
+
+
+def verificar(descripcion, obtenida, esperada, detalle=""):
+    global fallas
+    ok = obtenida == esperada
+    fallas += not ok
+    print(f"{descripcion:<58}{obtenida:<10}{detalle}{'' if ok else f'  <-- FALLA (esperado {esperada})'}")
+
+
+def main():
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        claves = sembrar(conn, usuarios=20, peliculas=5, salas=2, asientos_por_sala=20, funciones=10, reservas=30)
+    engine.dispose()
+    shutil.copyfile(PRIMARIO, REPLICA)
+
+    event.listen(engine, "before_cursor_execute", contar("primario"))
+    event.listen(read_engines[0], "before_cursor_execute", contar("réplica"))
+
+    exportacion = "/api/v1/exportaciones/reservas"
+    cliente, otro = TestClient(app), TestClient(app)
+
+    respuesta, base = leer(cliente, exportacion)
+    iniciales = len(respuesta.text.splitlines())
+    verificar("exportación antes de escribir", base, "réplica", f"{iniciales} reservas")
+    verificar("reporte", leer(cliente, "/api/v1/reportes/ingresos")[1], "réplica")
+    verificar("lista con ETag", leer(cliente, "/api/v1/reservas")[1], "primario")
+
+    nueva = cliente.post("/api/v1/reservas", json={
+        "cantidad_asientos": 1,
+        "id_funcion": str(claves["id_funcion"]),
+        "total": 10,
+        "fecha_reserva": datetime.utcnow().isoformat()
+    })
+    assert nueva.status_code == 201, nueva.text
+    verificar("escritura: cookie de primario", str("cine_primario" in nueva.headers.get("set-cookie", "")), "True")
+
+    respuesta, base = leer(cliente, exportacion)
+    verificar("exportación del mismo cliente dentro de la ventana", base, "primario",
+              f"{len(respuesta.text.splitlines())} reservas")
+    respuesta, base = leer(otro, exportacion)
+    verificar("exportación de otro cliente", base, "réplica", f"{len(respuesta.text.splitlines())} reservas")
+
+    time.sleep(VENTANA_SECONDS + 1)
+    respuesta, base = leer(cliente, exportacion)
+    verificar("exportación del mismo cliente vencida la ventana", base, "réplica",
+              f"{len(respuesta.text.splitlines())} reservas")
+
+    shutil.rmtree(DIRECTORIO, ignore_errors=True)
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
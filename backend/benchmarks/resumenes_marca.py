@@ -0,0 +1,104 @@
+"""
+Marca de agua de los resúmenes con fechas futuras (SQLite temporal).
+
+Una reserva con fecha_reserva adelantada no debe correr la marca: las
+ventas de hoy que lleguen después tienen que aparecer en el resumen en la
+siguiente actualización incremental. También cubre una marca que ya quedó
+guardada en el futuro, la marca creada por otro proceso en una base nueva,
+el aviso de cambios (solo si el resumen cambió) y la actualización omitida
+cuando otro worker acaba de hacerla. Termina con error si algo no cuadra.
+
+    python -m benchmarks.resumenes_marca
+"""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/resumenes_marca.db")
+
+from sqlalchemy import func, insert, select, update  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Funcion, Pelicula, Sala, Reserva, ResumenVentaDiaria, MarcaResumen  # noqa: E402
+from app.services.resumenes_service import VENTAS, FACTURACION, actualizar_resumenes  # noqa: E402
+
+fallas = 0
+
+
+def vender(db, id_funcion, fecha: datetime):
+    db.execute(insert(Reserva), [{
+        "id_reserva": uuid.uuid4(), "cantidad_asientos": 1, "id_funcion": id_funcion,
+        "total": 10, "fecha_reserva": fecha
+    }])
+    db.commit()
+
+
+def reservas_de_hoy(db) -> int:
+    return db.execute(
+        select(func.coalesce(func.sum(ResumenVentaDiaria.reservas), 0))
+        .where(ResumenVentaDiaria.dia == datetime.utcnow().date())
+    ).scalar()
+
+
+def verificar(descripcion, obtenido, esperado):
+    global fallas
+    ok = obtenido == esperado
+    fallas += not ok
+    print(f"{descripcion:<55}{obtenido:>4}{'' if ok else f'  <-- FALLA (esperado {esperado})'}")
+
+
+def main():
+    Base.metadata.create_all(engine)
+    ahora = datetime.utcnow()
+    ids = {k: uuid.uuid4() for k in ("pelicula", "sala", "funcion")}
+    with engine.begin() as conn:
+        conn.execute(insert(Pelicula), [{"id_pelicula": ids["pelicula"], "titulo": "Película"}])
+        conn.execute(insert(Sala), [{"id_sala": ids["sala"], "nombre": "Sala"}])
+        conn.execute(insert(Funcion), [{
+            "id_funcion": ids["funcion"], "fecha_hora": ahora, "precio": 10,
+            "id_pelicula": ids["pelicula"], "id_sala": ids["sala"]
+        }])
+
+    with SessionLocal() as db:
+        # Otro proceso creó la marca de ventas entre medio: no debe fallar
+        db.execute(insert(MarcaResumen), [{"nombre": VENTAS}])
+        db.commit()
+        vender(db, ids["funcion"], ahora)
+        vender(db, ids["funcion"], ahora + timedelta(days=365))
+        actualizar_resumenes(db)
+        verificar("reservas de hoy tras la primera actualización", reservas_de_hoy(db), 1)
+        marca = db.execute(select(MarcaResumen.hasta).where(MarcaResumen.nombre == VENTAS)).scalar()
+        verificar("marca no posterior a ahora", int(marca <= datetime.utcnow()), 1)
+
+        vender(db, ids["funcion"], datetime.utcnow())
+        actualizar_resumenes(db)
+        verificar("venta de hoy posterior a una reserva futura", reservas_de_hoy(db), 2)
+
+        # Marca adelantada por una versión anterior
+        db.execute(
+            update(MarcaResumen).where(MarcaResumen.nombre == VENTAS)
+            .values(hasta=ahora + timedelta(days=365))
+        )
+        db.commit()
+        vender(db, ids["funcion"], datetime.utcnow())
+        actualizar_resumenes(db)
+        verificar("venta de hoy con una marca ya guardada en el futuro", reservas_de_hoy(db), 3)
+
+        resultado = actualizar_resumenes(db)
+        verificar("sin ventas nuevas: resúmenes cambiados", sum(r["cambios"] for r in resultado.values()), 0)
+        vender(db, ids["funcion"], datetime.utcnow())
+        resultado = actualizar_resumenes(db)
+        verificar("con una venta nueva: ventas cambiadas", int(resultado[VENTAS]["cambios"]), 1)
+        verificar("con una venta nueva: facturación cambiada", int(resultado[FACTURACION]["cambios"]), 0)
+        resultado = actualizar_resumenes(db, minimo_entre=timedelta(minutes=5))
+        verificar("recién actualizados: resúmenes recalculados", len(resultado), 0)
+
+    Base.metadata.drop_all(engine)
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
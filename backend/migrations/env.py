@@ -0,0 +1,50 @@
+"""
+Entorno de Alembic.
+
+Usa la misma DATABASE_URL que la aplicación y los modelos de app.models
+como metadata, para que `alembic revision --autogenerate` compare contra ellos.
+"""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.config import settings
+from app.database import Base
+from app import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Genera el SQL sin conectarse (alembic upgrade --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplica las migraciones con una conexión propia, sin pool"""
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
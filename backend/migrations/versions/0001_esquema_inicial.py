@@ -0,0 +1,100 @@
+"""Esquema inicial (tablas existentes en Supabase)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+En una base de datos que ya tiene estas tablas no se ejecuta: se marca con
+`alembic stamp 0001` y se continúa con `alembic upgrade head`.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "usuario",
+        sa.Column("id_usuario", UUID(as_uuid=True), primary_key=True),
+        sa.Column("nombre", sa.Text(), nullable=False),
+        sa.Column("correo", sa.Text(), nullable=True),
+        sa.Column("password", sa.Text(), nullable=True),
+        sa.Column("rol", sa.Text(), nullable=True),
+    )
+    op.create_table(
+        "pelicula",
+        sa.Column("id_pelicula", UUID(as_uuid=True), primary_key=True),
+        sa.Column("titulo", sa.Text(), nullable=False),
+        sa.Column("genero", sa.Text(), nullable=True),
+        sa.Column("descripcion", sa.Text(), nullable=True),
+        sa.Column("clasificacion", sa.Text(), nullable=True),
+        sa.Column("duracion", sa.Text(), nullable=True),
+        sa.Column("image_url", sa.Text(), nullable=True),
+    )
+    op.create_table(
+        "sala",
+        sa.Column("id_sala", UUID(as_uuid=True), primary_key=True),
+        sa.Column("nombre", sa.Text(), nullable=False),
+        sa.Column("capacidad", sa.Numeric(10, 2), nullable=True),
+        sa.Column("tipo", sa.Text(), nullable=True),
+        sa.Column("estado", sa.Text(), nullable=True),
+        sa.Column("filas", sa.Integer(), nullable=True),
+        sa.Column("columnas", sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        "funcion",
+        sa.Column("id_funcion", UUID(as_uuid=True), primary_key=True),
+        sa.Column("fecha_hora", sa.DateTime(), nullable=False),
+        sa.Column("precio", sa.Numeric(10, 2), nullable=True),
+        sa.Column("id_pelicula", UUID(as_uuid=True), sa.ForeignKey("pelicula.id_pelicula"), nullable=True),
+        sa.Column("id_sala", UUID(as_uuid=True), sa.ForeignKey("sala.id_sala"), nullable=True),
+    )
+    op.create_table(
+        "asiento",
+        sa.Column("id_asiento", UUID(as_uuid=True), primary_key=True),
+        sa.Column("numero", sa.Text(), nullable=False),
+        sa.Column("estado", sa.Text(), nullable=True),
+        sa.Column("id_sala", UUID(as_uuid=True), sa.ForeignKey("sala.id_sala"), nullable=True),
+    )
+    op.create_table(
+        "reserva",
+        sa.Column("id_reserva", UUID(as_uuid=True), primary_key=True),
+        sa.Column("cantidad_asientos", sa.Numeric(10, 2), nullable=False),
+        sa.Column("estado", sa.Text(), nullable=True),
+        sa.Column("id_funcion", UUID(as_uuid=True), sa.ForeignKey("funcion.id_funcion"), nullable=True),
+        sa.Column("id_usuario", UUID(as_uuid=True), sa.ForeignKey("usuario.id_usuario"), nullable=True),
+        sa.Column("total", sa.Numeric(10, 2), nullable=True),
+        sa.Column("fecha_reserva", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "reserva_asiento",
+        sa.Column("id_reserva", UUID(as_uuid=True), sa.ForeignKey("reserva.id_reserva"), primary_key=True),
+        sa.Column("id_asiento", UUID(as_uuid=True), sa.ForeignKey("asiento.id_asiento"), primary_key=True),
+    )
+    op.create_table(
+        "factura",
+        sa.Column("id_factura", UUID(as_uuid=True), primary_key=True),
+        sa.Column("fecha_emision", sa.DateTime(), nullable=False),
+        sa.Column("total", sa.Numeric(10, 2), nullable=True),
+        sa.Column("metodo_pago", sa.Text(), nullable=True),
+        sa.Column("id_reserva", UUID(as_uuid=True), sa.ForeignKey("reserva.id_reserva"), nullable=True),
+    )
+    op.create_table(
+        "incidencia",
+        sa.Column("id_incidencia", UUID(as_uuid=True), primary_key=True),
+        sa.Column("fecha_generacion", sa.DateTime(), nullable=False),
+        sa.Column("id_usuario", UUID(as_uuid=True), sa.ForeignKey("usuario.id_usuario"), nullable=True),
+    )
+
+
+def downgrade():
+    for tabla in (
+        "incidencia", "factura", "reserva_asiento", "reserva",
+        "asiento", "funcion", "sala", "pelicula", "usuario"
+    ):
+        op.drop_table(tabla)
@@ -0,0 +1,36 @@
+"""Tabla de retenciones temporales de asientos
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Antes se creaba al arrancar la aplicación (checkfirst); si ya existe se
+marca con `alembic stamp 0002`.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "retencion_asiento",
+        sa.Column("id_funcion", UUID(as_uuid=True), sa.ForeignKey("funcion.id_funcion"), primary_key=True),
+        sa.Column("id_asiento", UUID(as_uuid=True), sa.ForeignKey("asiento.id_asiento"), primary_key=True),
+        sa.Column("id_retencion", UUID(as_uuid=True), nullable=False),
+        sa.Column("id_usuario", UUID(as_uuid=True), sa.ForeignKey("usuario.id_usuario"), nullable=True),
+        sa.Column("expira_en", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_retencion_asiento_id_retencion", "retencion_asiento", ["id_retencion"])
+    op.create_index("ix_retencion_asiento_expira_en", "retencion_asiento", ["expira_en"])
+
+
+def downgrade():
+    op.drop_index("ix_retencion_asiento_expira_en", table_name="retencion_asiento")
+    op.drop_index("ix_retencion_asiento_id_retencion", table_name="retencion_asiento")
+    op.drop_table("retencion_asiento")
@@ -0,0 +1,49 @@
+"""Índices para las búsquedas por clave foránea y por correo
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+- funcion.id_pelicula: funciones de una película.
+- asiento.id_sala: mapa de asientos de una sala.
+- reserva (id_funcion, id_reserva): recorre función → reservas solo con el
+  índice; también cubre los filtros por id_funcion.
+- reserva_asiento (id_asiento, id_reserva): la PK empieza por id_reserva,
+  así que asiento → reservas necesitaba su propio índice.
+- usuario.correo único: el login busca por correo. Si hay correos repetidos
+  la migración falla; hay que limpiarlos antes.
+
+En PostgreSQL se crean con CONCURRENTLY para no bloquear escrituras; eso
+no puede ir dentro de una transacción, por eso el autocommit_block.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDICES = (
+    ("ix_funcion_id_pelicula", "funcion", ["id_pelicula"], False),
+    ("ix_asiento_id_sala", "asiento", ["id_sala"], False),
+    ("ix_reserva_id_funcion_id_reserva", "reserva", ["id_funcion", "id_reserva"], False),
+    ("ix_reserva_asiento_id_asiento_id_reserva", "reserva_asiento", ["id_asiento", "id_reserva"], False),
+    ("ix_usuario_correo", "usuario", ["correo"], True),
+)
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas, unico in INDICES:
+            op.create_index(
+                nombre, tabla, columnas,
+                unique=unico,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _, _ in reversed(INDICES):
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,60 @@
+"""Tablas de resumen diario para los reportes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Incluye índices por fecha en reserva y factura para que la actualización
+incremental (desde la marca de agua) no recorra las tablas completas.
+
+Se llenan con `python -m app.maintenance reconstruir-resumenes` o solas con
+la tarea periódica de la aplicación.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_reserva_fecha_reserva", "reserva", ["fecha_reserva"])
+    op.create_index("ix_factura_fecha_emision", "factura", ["fecha_emision"])
+    op.create_table(
+        "resumen_venta_diaria",
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("id_funcion", UUID(as_uuid=True), primary_key=True),
+        sa.Column("id_pelicula", UUID(as_uuid=True), nullable=True),
+        sa.Column("id_sala", UUID(as_uuid=True), nullable=True),
+        sa.Column("reservas", sa.Integer(), nullable=False),
+        sa.Column("asientos", sa.Integer(), nullable=False),
+        sa.Column("ingresos", sa.Numeric(12, 2), nullable=False),
+    )
+    op.create_index("ix_resumen_venta_diaria_id_pelicula", "resumen_venta_diaria", ["id_pelicula"])
+    op.create_index("ix_resumen_venta_diaria_id_sala", "resumen_venta_diaria", ["id_sala"])
+    op.create_table(
+        "resumen_facturacion_diaria",
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("metodo_pago", sa.Text(), primary_key=True),
+        sa.Column("facturas", sa.Integer(), nullable=False),
+        sa.Column("ingresos", sa.Numeric(12, 2), nullable=False),
+    )
+    op.create_table(
+        "marca_resumen",
+        sa.Column("nombre", sa.Text(), primary_key=True),
+        sa.Column("hasta", sa.DateTime(), nullable=True),
+        sa.Column("actualizado_en", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("marca_resumen")
+    op.drop_table("resumen_facturacion_diaria")
+    op.drop_index("ix_resumen_venta_diaria_id_sala", table_name="resumen_venta_diaria")
+    op.drop_index("ix_resumen_venta_diaria_id_pelicula", table_name="resumen_venta_diaria")
+    op.drop_table("resumen_venta_diaria")
+    op.drop_index("ix_factura_fecha_emision", table_name="factura")
+    op.drop_index("ix_reserva_fecha_reserva", table_name="reserva")
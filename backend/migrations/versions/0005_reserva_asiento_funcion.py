@@ -0,0 +1,49 @@
+"""Un asiento reservado una sola vez por función
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+- reserva_asiento.id_funcion: copia de la función de la reserva, llenada
+  desde reserva.
+- UNIQUE (id_funcion, id_asiento) en reserva_asiento: dos reservas no
+  pueden tener el mismo asiento en la misma función, escriba quien escriba.
+- FK (id_reserva, id_funcion) → reserva (id_reserva, id_funcion): la copia
+  no puede quedar distinta de la reserva, así que una reserva con asientos
+  no puede cambiar de función. Necesita UNIQUE (id_reserva, id_funcion) en
+  reserva.
+
+Si ya hay asientos reservados dos veces en una función la migración falla;
+hay que limpiarlos antes.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("reserva_asiento", sa.Column("id_funcion", UUID(as_uuid=True), nullable=True))
+    op.execute(
+        "UPDATE reserva_asiento SET id_funcion = "
+        "(SELECT reserva.id_funcion FROM reserva WHERE reserva.id_reserva = reserva_asiento.id_reserva)"
+    )
+    op.create_unique_constraint(
+        "uq_reserva_asiento_id_funcion_id_asiento", "reserva_asiento", ["id_funcion", "id_asiento"]
+    )
+    op.create_unique_constraint("uq_reserva_id_reserva_id_funcion", "reserva", ["id_reserva", "id_funcion"])
+    op.create_foreign_key(
+        "fk_reserva_asiento_reserva_funcion", "reserva_asiento", "reserva",
+        ["id_reserva", "id_funcion"], ["id_reserva", "id_funcion"]
+    )
+
+
+def downgrade():
+    op.drop_constraint("fk_reserva_asiento_reserva_funcion", "reserva_asiento", type_="foreignkey")
+    op.drop_constraint("uq_reserva_id_reserva_id_funcion", "reserva", type_="unique")
+    op.drop_constraint("uq_reserva_asiento_id_funcion_id_asiento", "reserva_asiento", type_="unique")
+    op.drop_column("reserva_asiento", "id_funcion")